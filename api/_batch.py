@@ -0,0 +1,66 @@
+"""
+Batch generation: one example document against many job descriptions
+
+Results are yielded as events in completion order, so callers can stream
+them back (NDJSON) or write them out as each generation finishes:
+    {"type": "result", "index": 0, "job": "acme.pdf", "document": "cover_letter", "text": "...",
+     "match_score": 72, "cache_hit": false, "usage": {"input_tokens": 1800, "cached_input_tokens": 1500, ...}}
+    {"type": "error", "index": 1, "job": "globex.txt", "document": "cover_letter", "error": "..."}
+    {"type": "done", "total": 2, "failed": 1}
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from ._matching import match_scores
+except ImportError:
+    from _matching import match_scores
+
+# Configuration
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+BATCH_MAX_JOBS = int(os.getenv('BATCH_MAX_JOBS', '50'))
+
+
+def run_batch(example_text, jobs, generate, ai_provider, document='cover_letter',
+              concurrency=BATCH_CONCURRENCY):
+    """Generate one document per job description, yielding events as they finish.
+
+    jobs is a list of ``(name, job_description)`` pairs and generate is
+    called as ``generate(example_text, job_description, ai_provider,
+    cancelled=event)``, returning ``(text, metadata)``; metadata is merged
+    into the result event. The example text is shared by every job, so it is extracted once
+    by the caller and passed in here. Provider rate limits are applied by
+    the router, per provider and model, across every caller in the process.
+    Each result carries the example's match_score for its job, computed for
+    the whole batch at once before any generation starts. When the caller
+    stops reading, such as a client that disconnected, jobs not yet started
+    are dropped and the event passed to in-flight calls is set.
+    """
+    scores = [match['score'] for match in match_scores(example_text, [job for _, job in jobs])]
+    failed = 0
+    cancelled = threading.Event()
+    # Not a with block: its exit would wait for every queued job to run
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs))))
+    try:
+        futures = {
+            executor.submit(generate, example_text, job_description, ai_provider, cancelled=cancelled): (index, name)
+            for index, (name, job_description) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            index, name = futures[future]
+            try:
+                text, metadata = future.result()
+                event = {'type': 'result', 'index': index, 'job': name, 'document': document,
+                         'text': text, 'match_score': scores[index], **metadata}
+            except Exception as e:
+                failed += 1
+                event = {'type': 'error', 'index': index, 'job': name,
+                         'document': document, 'error': str(e)}
+            yield event
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    yield {'type': 'done', 'total': len(jobs), 'failed': failed}
@@ -0,0 +1,304 @@
+"""
+Generation cache for AI outputs
+
+Keys are content hashes of the normalized inputs, the prompt template version,
+the provider and the model, so regenerating from identical inputs is served
+without a new LLM call.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Configuration
+CACHE_BACKEND = os.getenv('GENERATION_CACHE', 'memory')  # 'memory', 'sqlite', 'tiered' or 'off'
+CACHE_PATH = os.getenv(
+    'GENERATION_CACHE_PATH',
+    os.path.join(tempfile.gettempdir(), 'cover_letter_cache.sqlite3')
+)
+CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', '86400'))
+CACHE_SIZE = int(os.getenv('GENERATION_CACHE_SIZE', '256'))
+
+
+def normalize_text(text):
+    """Normalize whitespace so cosmetic differences map to the same key"""
+    lines = [' '.join(line.split()) for line in text.strip().splitlines()]
+    return '\n'.join(lines)
+
+
+def make_cache_key(kind, example_text, job_description, provider, model, template_version):
+    """Build a content-addressed key for one generation"""
+    payload = json.dumps([
+        kind,
+        normalize_text(example_text),
+        normalize_text(job_description),
+        provider,
+        model,
+        template_version,
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BaseCache(ABC):
+    """Common hit/miss accounting shared by all cache backends"""
+
+    name = 'base'
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached entry dict for key, or None"""
+
+    @abstractmethod
+    def set(self, key, value, elapsed):
+        """Store value along with the time it took to produce it"""
+
+    def record(self, hit, saved_seconds=0.0):
+        with self._stats_lock:
+            if hit:
+                self._hits += 1
+                self._saved_seconds += saved_seconds
+            else:
+                self._misses += 1
+
+    def stats(self):
+        with self._stats_lock:
+            total = self._hits + self._misses
+            return {
+                'backend': self.name,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0.0,
+                'saved_seconds': round(self._saved_seconds, 3),
+            }
+
+    def get_or_generate(self, key, producer):
+        """Return ``(value, hit)``, calling producer() only on a miss"""
+        entry = self.get(key)
+        if entry is not None:
+            self.record(True, entry['elapsed'])
+            return entry['value'], True
+
+        start = time.perf_counter()
+        value = producer()
+        elapsed = time.perf_counter() - start
+        self.set(key, value, elapsed)
+        self.record(False)
+        return value, False
+
+    def get_or_stream(self, key, stream_factory):
+        """Yield text chunks, replaying a cached value as a single chunk.
+
+        On a miss, chunks from stream_factory() are passed through as they
+        arrive and the joined text is stored once the stream completes.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            self.record(True, entry['elapsed'])
+            yield entry['value']
+            return
+
+        start = time.perf_counter()
+        chunks = []
+        for chunk in stream_factory():
+            chunks.append(chunk)
+            yield chunk
+        self.set(key, ''.join(chunks), time.perf_counter() - start)
+        self.record(False)
+
+
+class NullCache(BaseCache):
+    """Cache that never stores anything"""
+
+    name = 'off'
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, elapsed):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache with a per-entry TTL"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, elapsed):
+        with self._lock:
+            self._entries[key] = {
+                'value': value,
+                'elapsed': elapsed,
+                'expires': time.time() + self.ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCache(BaseCache):
+    """On-disk cache that survives process restarts.
+
+    Hit/miss counters are persisted alongside the entries so they can be
+    read from any process sharing the same file.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS generations ('
+                'key TEXT PRIMARY KEY, value TEXT, elapsed REAL, expires REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS stats ('
+                'name TEXT PRIMARY KEY, value REAL)'
+            )
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT value, elapsed, expires FROM generations WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] < time.time():
+                conn.execute('DELETE FROM generations WHERE key = ?', (key,))
+                return None
+            return {'value': row[0], 'elapsed': row[1], 'expires': row[2]}
+
+    def set(self, key, value, elapsed):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO generations (key, value, elapsed, expires) '
+                'VALUES (?, ?, ?, ?)',
+                (key, value, elapsed, now + self.ttl)
+            )
+            # Entries nobody reads again would otherwise stay in the file forever
+            conn.execute('DELETE FROM generations WHERE expires < ?', (now,))
+
+    def record(self, hit, saved_seconds=0.0):
+        super().record(hit, saved_seconds)
+        updates = [('hits', 1), ('saved_seconds', saved_seconds)] if hit else [('misses', 1)]
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO stats (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                updates
+            )
+
+    def stats(self):
+        with self._connect() as conn:
+            rows = dict(conn.execute('SELECT name, value FROM stats').fetchall())
+        hits = int(rows.get('hits', 0))
+        misses = int(rows.get('misses', 0))
+        total = hits + misses
+        return {
+            'backend': self.name,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'saved_seconds': round(rows.get('saved_seconds', 0.0), 3),
+        }
+
+
+class TieredCache(BaseCache):
+    """Memory LRU in front of the on-disk store"""
+
+    name = 'tiered'
+
+    def __init__(self, memory=None, disk=None):
+        super().__init__()
+        self.memory = memory or MemoryCache()
+        self.disk = disk or SQLiteCache()
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry['value'], entry['elapsed'])
+        return entry
+
+    def set(self, key, value, elapsed):
+        self.memory.set(key, value, elapsed)
+        self.disk.set(key, value, elapsed)
+
+    def record(self, hit, saved_seconds=0.0):
+        super().record(hit, saved_seconds)
+        self.disk.record(hit, saved_seconds)
+
+    def stats(self):
+        stats = self.disk.stats()
+        stats['backend'] = self.name
+        return stats
+
+
+_BACKENDS = {
+    'off': NullCache,
+    'memory': MemoryCache,
+    'sqlite': SQLiteCache,
+    'tiered': TieredCache,
+}
+
+_generation_cache = None
+_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache():
+    """Return the process-wide generation cache, creating it on first use"""
+    global _generation_cache
+    if _generation_cache is None:
+        with _generation_cache_lock:
+            if _generation_cache is None:
+                backend = _BACKENDS.get(CACHE_BACKEND)
+                if backend is None:
+                    raise Exception(f"Unknown GENERATION_CACHE backend: {CACHE_BACKEND}")
+                _generation_cache = backend()
+    return _generation_cache
@@ -0,0 +1,87 @@
+"""
+Shared LLM provider clients
+
+Clients are created lazily on first use and reused for the life of the
+process, so warm serverless invocations and Flask requests keep their HTTP
+keep-alive connections and TLS sessions.
+"""
+
+import os
+import threading
+
+# Configuration
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', '10'))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv('LLM_KEEPALIVE_EXPIRY', '30'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '0'))  # SDK retries; the router retries with backoff itself
+
+_API_KEY_VARS = {
+    'anthropic': 'ANTHROPIC_API_KEY',
+    'openai': 'OPENAI_API_KEY',
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class RequestCancelled(Exception):
+    """Raised by a provider call that was abandoned through its cancel event"""
+
+
+def _client_options(sdk):
+    """Constructor options shared by both SDKs: pool limits, timeouts, retries"""
+    import httpx
+
+    timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    return {
+        'timeout': timeout,
+        'max_retries': LLM_MAX_RETRIES,
+        'http_client': sdk.DefaultHttpxClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        ),
+    }
+
+
+def _create_client(provider, api_key):
+    if provider == 'anthropic':
+        import anthropic
+
+        return anthropic.Anthropic(api_key=api_key, **_client_options(anthropic))
+    if provider == 'openai':
+        import openai
+
+        return openai.OpenAI(api_key=api_key, **_client_options(openai))
+    raise Exception(f"Unknown AI provider: {provider}")
+
+
+def get_client(provider):
+    """Return the shared client for provider, or None if it has no API key"""
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+
+    api_key = os.getenv(_API_KEY_VARS.get(provider, ''), '')
+    if not api_key:
+        return None
+
+    with _clients_lock:
+        client = _clients.get(provider)
+        if client is None:
+            client = _create_client(provider, api_key)
+            _clients[provider] = client
+    return client
+
+
+def close_clients():
+    """Close pooled connections and forget all clients"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,78 @@
+"""
+DOCX templates for document downloads
+
+Each named template is built into a base document once per process, with
+margins set and the font defined on the Normal paragraph style. Downloads load
+a copy of that base and append plain paragraphs, which pick the style up as
+the document default, so no formatting is applied run by run. python-docx is
+imported on first use, not when the module loads.
+"""
+
+import io
+import threading
+
+DEFAULT_TEMPLATE = 'classic'
+
+# name -> font, size (pt), margin (inches) and space after each paragraph (pt)
+DOCX_TEMPLATES = {
+    'classic': {'font': 'Arial', 'size': 11, 'margin': 1.0, 'space_after': None},
+    'modern': {'font': 'Calibri', 'size': 11, 'margin': 0.9, 'space_after': 6},
+    'compact': {'font': 'Arial', 'size': 10, 'margin': 0.6, 'space_after': 2},
+}
+
+_base_documents = {}
+_base_lock = threading.Lock()
+
+
+def _build_base(template):
+    """Build the empty base document for a template, serialized to bytes"""
+    from docx import Document
+    from docx.shared import Inches, Pt
+
+    doc = Document()
+
+    for section in doc.sections:
+        section.top_margin = Inches(template['margin'])
+        section.bottom_margin = Inches(template['margin'])
+        section.left_margin = Inches(template['margin'])
+        section.right_margin = Inches(template['margin'])
+
+    # Normal is the default for paragraphs without a style of their own, and
+    # naming a style per paragraph costs a scan of the style table each time
+    style = doc.styles['Normal']
+    style.font.name = template['font']
+    style.font.size = Pt(template['size'])
+    if template['space_after'] is not None:
+        style.paragraph_format.space_after = Pt(template['space_after'])
+
+    base = io.BytesIO()
+    doc.save(base)
+    return base.getvalue()
+
+
+def get_base_document(name=DEFAULT_TEMPLATE):
+    """Return a fresh Document copied from the cached base for template name"""
+    from docx import Document
+
+    if name not in DOCX_TEMPLATES:
+        raise ValueError(f"Unknown template: {name}")
+    base = _base_documents.get(name)
+    if base is None:
+        with _base_lock:
+            base = _base_documents.get(name)
+            if base is None:
+                base = _base_documents[name] = _build_base(DOCX_TEMPLATES[name])
+    return Document(io.BytesIO(base))
+
+
+def render_docx(text, template=DEFAULT_TEMPLATE):
+    """Render text into a DOCX from a named template, one paragraph per line"""
+    doc = get_base_document(template)
+    for line in text.split('\n'):
+        # Blank lines become empty paragraphs in the same style
+        doc.add_paragraph(line if line.strip() else '')
+
+    docx_bytes = io.BytesIO()
+    doc.save(docx_bytes)
+    docx_bytes.seek(0)
+    return docx_bytes
@@ -0,0 +1,139 @@
+"""
+Text extraction engine for uploaded documents
+
+PDF, DOCX and TXT uploads are turned into plain text here. Large PDFs are
+split into page ranges that are extracted on a process pool, and every
+extraction is cached by the SHA-256 of the uploaded bytes so the same file
+is never parsed twice by one process. PyPDF2 and python-docx are imported
+by the functions that parse those formats, so importing this module stays
+cheap.
+"""
+
+import hashlib
+import io
+import os
+import threading
+
+try:
+    from ._cache import MemoryCache
+    from ._metrics import record_payload, span
+except ImportError:
+    from _cache import MemoryCache
+    from _metrics import record_payload, span
+
+# Configuration
+PDF_PARALLEL_PAGES = int(os.getenv('PDF_PARALLEL_PAGES', '8'))  # Page count at which the pool is used
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', str(min(4, os.cpu_count() or 1))))
+EXTRACTION_CACHE_SIZE = int(os.getenv('EXTRACTION_CACHE_SIZE', '64'))
+EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', '3600'))
+
+extraction_cache = MemoryCache(max_entries=EXTRACTION_CACHE_SIZE, ttl=EXTRACTION_CACHE_TTL)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Return the shared process pool, or None where processes are unavailable"""
+    global _pool
+    if _pool is None and PDF_WORKERS > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+                except (OSError, NotImplementedError):
+                    # Some serverless sandboxes have no semaphores or /dev/shm
+                    return None
+    return _pool
+
+
+def _extract_page_range(pdf_bytes, start, stop):
+    """Extract the text of pages [start, stop) from a PDF"""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return [pdf_reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+def _page_ranges(page_count, parts):
+    """Split page_count pages into at most parts contiguous ranges"""
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf_pages(pdf_bytes):
+    """Return the text of every page, in order"""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(pdf_reader.pages)
+
+    pool = _get_pool() if page_count >= PDF_PARALLEL_PAGES else None
+    if pool is not None:
+        ranges = _page_ranges(page_count, PDF_WORKERS)
+        try:
+            futures = [pool.submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+            return [text for future in futures for text in future.result()]
+        except (OSError, RuntimeError):
+            # Pool broken or shut down, fall through to single-process extraction
+            pass
+
+    return [page.extract_text() or '' for page in pdf_reader.pages]
+
+
+def extract_pdf_text(pdf_bytes):
+    """Extract text from PDF bytes, joining pages in a single pass"""
+    return '\n'.join(extract_pdf_pages(pdf_bytes)).strip()
+
+
+def cached_extraction(file_data, kind, extractor):
+    """Run extractor(file_data) once per distinct upload.
+
+    The key is the SHA-256 of the raw bytes plus the document kind, so the
+    same resume uploaded again is served without re-parsing.
+    """
+    record_payload(f'upload_{kind}', len(file_data))
+    with span(f'extract_{kind}'):
+        key = kind + ':' + hashlib.sha256(file_data).hexdigest()
+        return extraction_cache.get_or_generate(key, lambda: extractor(file_data))[0]
+
+
+def extract_text_from_pdf(file_stream):
+    """Extract text from PDF file"""
+    try:
+        return extract_pdf_text(file_stream.read())
+    except Exception as e:
+        raise Exception(f"Error reading PDF: {str(e)}")
+
+
+def extract_text_from_docx(file_stream):
+    """Extract text from DOCX file"""
+    from docx import Document
+
+    try:
+        doc = Document(file_stream)
+        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        return text.strip()
+    except Exception as e:
+        raise Exception(f"Error reading DOCX: {str(e)}")
+
+
+def extract_text_from_file(file_data, filename):
+    """Extract text from uploaded file bytes based on file type"""
+    filename_lower = filename.lower()
+
+    if filename_lower.endswith('.pdf'):
+        return cached_extraction(
+            file_data, 'pdf', lambda data: extract_text_from_pdf(io.BytesIO(data))
+        )
+    elif filename_lower.endswith(('.doc', '.docx')):
+        return cached_extraction(
+            file_data, 'docx', lambda data: extract_text_from_docx(io.BytesIO(data))
+        )
+    elif filename_lower.endswith('.txt'):
+        record_payload('upload_txt', len(file_data))
+        return file_data.decode('utf-8')
+    else:
+        raise Exception(f"Unsupported file type: {filename}")
@@ -0,0 +1,155 @@
+"""
+Fake LLM provider for offline runs
+
+Answers like a real provider after a configurable delay and fails at
+configurable rates with 5xx errors, 429s or timeouts, so generation,
+failover, rate limiting and hedging can be exercised without network access
+or API keys. Select it with AI_PROVIDER=fake; scripts can install more
+under other names with install_fake_provider.
+"""
+
+import os
+import random
+import threading
+import time
+
+try:
+    from ._clients import RequestCancelled
+except ImportError:
+    from _clients import RequestCancelled
+
+# Configuration
+FAKE_LATENCY = float(os.getenv('FAKE_LATENCY', '0.05'))  # Seconds before the reply
+FAKE_JITTER = float(os.getenv('FAKE_JITTER', '0'))  # Up to this many extra seconds
+FAKE_SLOW_RATE = float(os.getenv('FAKE_SLOW_RATE', '0'))  # Share of calls taking FAKE_SLOW_LATENCY instead
+FAKE_SLOW_LATENCY = float(os.getenv('FAKE_SLOW_LATENCY', '1'))
+FAKE_ERROR_RATE = float(os.getenv('FAKE_ERROR_RATE', '0'))  # Share of calls failing with a 503
+FAKE_TIMEOUT_RATE = float(os.getenv('FAKE_TIMEOUT_RATE', '0'))  # Share of calls timing out
+FAKE_RATE_LIMIT_RATE = float(os.getenv('FAKE_RATE_LIMIT_RATE', '0'))  # Share of calls answered with a 429
+FAKE_RETRY_AFTER = float(os.getenv('FAKE_RETRY_AFTER', '1'))  # Seconds the 429s ask callers to wait
+FAKE_MODEL = os.getenv('FAKE_MODEL', 'fake-1')
+
+
+class FakeServerError(Exception):
+    """A 5xx response from the fake provider"""
+    status_code = 503
+
+
+class FakeTimeout(TimeoutError):
+    """A request to the fake provider that timed out"""
+
+
+class FakeRateLimited(Exception):
+    """A 429 from the fake provider, with the retry-after it asked for"""
+    status_code = 429
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FakeProvider:
+    """Provider stub with the complete/stream interface of the real ones"""
+
+    def __init__(self, name='fake', latency=FAKE_LATENCY, jitter=FAKE_JITTER,
+                 slow_rate=FAKE_SLOW_RATE, slow_latency=FAKE_SLOW_LATENCY,
+                 error_rate=FAKE_ERROR_RATE, timeout_rate=FAKE_TIMEOUT_RATE,
+                 rate_limit_rate=FAKE_RATE_LIMIT_RATE, retry_after=FAKE_RETRY_AFTER,
+                 model=FAKE_MODEL, seed=None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.model = model
+        self.calls = 0
+        self.cancelled_calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt, cancelled):
+        """Wait out the latency, then return the reply text or raise the drawn failure"""
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            if self._random.random() < self.slow_rate:
+                delay = self.slow_latency
+            else:
+                delay = self.latency + self._random.random() * self.jitter
+
+        if cancelled is None:
+            time.sleep(delay)
+        elif cancelled.wait(delay):
+            with self._lock:
+                self.cancelled_calls += 1
+            raise RequestCancelled(f'{self.name} request cancelled')
+
+        if roll < self.timeout_rate:
+            raise FakeTimeout(f'{self.name} timed out')
+        if roll < self.timeout_rate + self.error_rate:
+            raise FakeServerError(f'{self.name} returned 503')
+        if roll < self.timeout_rate + self.error_rate + self.rate_limit_rate:
+            raise FakeRateLimited(f'{self.name} returned 429', self.retry_after)
+
+        prefix, request = prompt
+        if '@@ replace N' in prefix:
+            # A refine prompt: answer with a one-paragraph patch
+            return f"@@ replace 1\nThis paragraph was edited by the offline {self.name} provider ({self.model})."
+        return (
+            "Dear Hiring Manager,\n\n"
+            f"This reply comes from the offline {self.name} provider ({self.model}) "
+            f"for a {len(request)}-character request.\n\n"
+            "Sincerely,\n[Your Name]"
+        )
+
+    def _usage(self, prompt, text):
+        prefix, request = prompt
+        return {
+            'input_tokens': (len(prefix) + len(request)) // 4,
+            'output_tokens': len(text) // 4,
+            'cached_input_tokens': 0,
+            'cache_write_tokens': 0,
+        }
+
+    def complete(self, prompt, system_prompt, cancelled=None):
+        """Return ``(text, usage)`` like complete_with_ai"""
+        text = self._respond(prompt, cancelled)
+        return text, self._usage(prompt, text)
+
+    def stream(self, prompt, system_prompt, cancelled=None):
+        """Yield the reply word by word once the latency has passed"""
+        words = self._respond(prompt, cancelled).split(' ')
+        for index, word in enumerate(words):
+            if cancelled is not None and cancelled.is_set():
+                raise RequestCancelled(f'{self.name} request cancelled')
+            yield word if index == len(words) - 1 else word + ' '
+
+
+_fake_providers = {}
+_fake_lock = threading.Lock()
+
+
+def install_fake_provider(name='fake', **options):
+    """Register a FakeProvider under name, replacing any earlier one, and return it"""
+    provider = FakeProvider(name, **options)
+    with _fake_lock:
+        _fake_providers[name] = provider
+    return provider
+
+
+def get_fake_provider(name):
+    """Return the fake provider registered as name, or None.
+
+    'fake' is always available, configured from the FAKE_* settings.
+    """
+    provider = _fake_providers.get(name)
+    if provider is None and name == 'fake':
+        with _fake_lock:
+            provider = _fake_providers.get(name)
+            if provider is None:
+                provider = _fake_providers[name] = FakeProvider(name)
+    return provider
@@ -0,0 +1,241 @@
+"""
+Offline drafts of cover letters and resumes
+
+Used in place of a provider when no API key is configured, and streamed as
+an instant preview while a provider call runs. Nothing here leaves the
+process: a draft is filled in from the parse of the job description in
+_parsing and the keyword scoring in _matching, and takes a few
+milliseconds.
+
+A cover letter keeps the example's greeting, sign-off and voice. The
+opening names the new role and company, the example's paragraphs most
+relevant to the posting are kept in their original order, and one
+paragraph names the posting's top requirements and the keywords the
+example already covers. A resume keeps every line of the example, with the
+bullets under each job and the items of each skills list reordered so the
+ones the posting asks for come first.
+"""
+
+import os
+import re
+
+try:
+    from ._matching import bullet_runs, match_score, score_passages, terms
+    from ._parsing import parse_document
+    from ._refine import split_paragraphs
+except ImportError:
+    from _matching import bullet_runs, match_score, score_passages, terms
+    from _parsing import parse_document
+    from _refine import split_paragraphs
+
+# Configuration
+STREAM_PREVIEW = os.getenv('STREAM_PREVIEW', '1').lower() in ('1', 'true', 'yes')  # Stream an offline draft before the provider's text
+
+# Example paragraphs kept between the opening and the closing of a letter
+LETTER_BODY_PARAGRAPHS = 2
+# Posting requirements and covered keywords named in a letter
+LETTER_REQUIREMENTS = 2
+LETTER_KEYWORDS = 4
+
+_GREETING_RE = re.compile(r'^\s*(dear|to whom|hello|hi)\b', re.IGNORECASE)
+_GENERIC_GREETING_RE = re.compile(r'hiring|recruit|whom|sir|madam', re.IGNORECASE)
+_SIGN_OFF_RE = re.compile(
+    r'^\s*(sincerely|best|regards|kind regards|best regards|warm regards|warmly|yours|respectfully|'
+    r'thank you|thanks|cheers)\b[^.!?]*$', re.IGNORECASE
+)
+_SKILL_PREFIX_RE = re.compile(r'^\s*(?:[\-*•·–▪◦]\s+)?(?:[^:,]{1,40}:\s*)?')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=["\'(]?[A-Z0-9])')
+# Opening sentences about the job the example was written for
+_APPLYING_RE = re.compile(
+    r'\b(apply|applying|application|interest in|interested in|excited|position|role|opening|vacancy)\b',
+    re.IGNORECASE
+)
+_CLOSING_REMARK_RE = re.compile(
+    r'\b(thank you|look forward|welcome the (chance|opportunity)|discuss|hearing from you)\b', re.IGNORECASE
+)
+# The role and company an example letter was written for, so kept text can name the new ones
+_OLD_ROLE_RE = re.compile(
+    r'\b(?:for|as) (?:the|a|an|your) ([\w&/\- ]{3,60}?) (?:position|role|opening|job)\b', re.IGNORECASE
+)
+_NAME = r'[A-Z][\w&\-]*(?: (?:[A-Z][\w&\-]*|&|of))*'
+_OLD_COMPANY_RE = re.compile(rf'\b(?i:position|role|opening|job|team) (?:at|with) ({_NAME})|\b(?i:join|joining) ({_NAME})')
+
+COVER_LETTER_NOTE = ('NOTE: Drafted offline from your example. '
+                     'Configure ANTHROPIC_API_KEY or OPENAI_API_KEY for AI-generated cover letters.')
+RESUME_NOTE = ('NOTE: Reordered offline for this job. '
+               'Configure ANTHROPIC_API_KEY or OPENAI_API_KEY for AI-tailored resumes.')
+
+
+def _sentences(paragraph):
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT_RE.split(' '.join(paragraph.split())) if sentence.strip()]
+
+
+def _join_words(words):
+    """'a', 'a and b', 'a, b and c'"""
+    if len(words) < 2:
+        return ''.join(words)
+    return f"{', '.join(words[:-1])} and {words[-1]}"
+
+
+def _phrase(item, job_description, skills):
+    """A requirement or responsibility as it reads mid-sentence.
+
+    Only an ordinary capitalized leading word is lowercased. Acronyms, words
+    with inner capitals, the posting's skills and any word the posting also
+    capitalizes mid-sentence, such as 'Kafka', keep the posting's spelling.
+    """
+    item = item.strip().rstrip('.;,:')
+    first = item.split(None, 1)[0] if item else ''
+    if not re.fullmatch(r'[A-Z][a-z]+', first) or first.lower() in skills:
+        return item
+    if re.search(rf'[a-z,;]\s+{re.escape(first)}\b', job_description):
+        return item
+    return first.lower() + item[len(first):]
+
+
+def _letter_parts(example_text):
+    """``(greeting, body_paragraphs, sign_off)`` of an example letter; greeting and sign_off may be None"""
+    lines = example_text.strip().splitlines()
+    greeting = sign_off = None
+    if lines and _GREETING_RE.match(lines[0]) and len(lines[0].split()) <= 8:
+        greeting = lines.pop(0).strip()
+    filled = [row for row, line in enumerate(lines) if line.strip()]
+    for row in filled[-4:]:
+        if _SIGN_OFF_RE.match(lines[row]) and len(lines[row].split()) <= 4:
+            sign_off = '\n'.join(line.strip() for line in lines[row:] if line.strip())
+            lines = lines[:row]
+            break
+    return greeting, split_paragraphs('\n'.join(lines)), sign_off
+
+
+def _old_target(opening):
+    """The role and company named in the example's opening paragraph, where it names them"""
+    role = _OLD_ROLE_RE.search(opening)
+    company = _OLD_COMPANY_RE.search(opening)
+    return (
+        role.group(1).strip() if role else None,
+        company.group(1) or company.group(2) if company else None,
+    )
+
+
+def _retarget(text, old, new):
+    if not old or not new:
+        return text
+    return re.sub(rf'(?<!\w){re.escape(old)}(?!\w)', new, text)
+
+
+def _spelling(term, text):
+    """term as the example spells it, so 'postgres' shows as 'Postgres'"""
+    found = re.search(rf'(?<!\w){re.escape(term)}', text, re.IGNORECASE)
+    return found.group(0) if found else term
+
+
+def _requirements_paragraph(example_text, job_description, record):
+    sentences = []
+    items, lead = record['requirements'], 'Your posting asks for'
+    if not items:
+        items, lead = record['responsibilities'], 'You are looking for someone to'
+    if items:
+        names = {skill.lower() for skill in record['skills']}
+        scores = score_passages(items, example_text)
+        # The requirements the example speaks to most, in the posting's order
+        ranked = sorted(range(len(items)), key=lambda index: -scores[index])[:LETTER_REQUIREMENTS]
+        sentences.append(f"{lead} {_join_words([_phrase(items[index], job_description, names) for index in sorted(ranked)])}.")
+
+    # Only the posting's skills, not words of its title or boilerplate
+    skills = {term for skill in record['skills'] for term in terms(skill)}
+    matched = match_score(example_text, job_description)['matched']
+    keywords = [word for word in matched if set(terms(word)) & skills][:LETTER_KEYWORDS]
+    if keywords:
+        sentences.append(f"My experience includes {_join_words([_spelling(word, example_text) for word in keywords])}.")
+    return ' '.join(sentences)
+
+
+def draft_cover_letter(example_text, job_description):
+    """Fill a cover letter for job_description from the example letter"""
+    record = parse_document(job_description)
+    role, company = record['role'], record['company']
+    greeting, body, sign_off = _letter_parts(example_text)
+    old_role, old_company = _old_target(body[0]) if body else (None, None)
+
+    def retarget(text):
+        return _retarget(_retarget(text, old_company, company or 'your company'), old_role, role)
+
+    target = f'the {role} position' if role else 'this position'
+    opening = [f"I am writing to apply for {target}{f' at {company}' if company else ''}."]
+    if body:
+        kept = [retarget(sentence) for sentence in _sentences(body[0]) if not _APPLYING_RE.search(sentence)]
+        # A letter without paragraph breaks keeps all of it here
+        opening += kept[:2] if len(body) > 1 else kept
+
+    middle = body[1:]
+    closing = None
+    if middle and _CLOSING_REMARK_RE.search(middle[-1]):
+        closing = middle.pop()
+    if len(middle) > LETTER_BODY_PARAGRAPHS:
+        scores = score_passages(middle, job_description)
+        kept = sorted(range(len(middle)), key=lambda index: -scores[index])[:LETTER_BODY_PARAGRAPHS]
+        # Paragraphs that share nothing with the posting go when others do
+        if any(scores[index] > 0 for index in kept):
+            kept = [index for index in kept if scores[index] > 0]
+        middle = [middle[index] for index in sorted(kept)]
+
+    paragraphs = [
+        greeting if greeting and _GENERIC_GREETING_RE.search(greeting) else 'Dear Hiring Manager,',
+        ' '.join(opening),
+    ]
+    paragraphs += [retarget(paragraph) for paragraph in middle]
+    requirements = _requirements_paragraph(example_text, job_description, record)
+    if requirements:
+        paragraphs.append(requirements)
+    paragraphs.append(
+        retarget(closing) if closing else
+        f"Thank you for considering my application. I would welcome the chance to discuss how I can "
+        f"contribute to {company or 'your team'}."
+    )
+    paragraphs.append(sign_off or 'Sincerely,\n[Your Name]')
+    return '\n\n'.join(paragraphs)
+
+
+def draft_resume(example_text, job_description):
+    """Reorder the example resume's bullets and skills for job_description; no line is added or dropped"""
+    lines = example_text.strip().splitlines()
+    runs = bullet_runs(lines)
+    rows = [row for run in runs for row in run]
+    scores = dict(zip(rows, score_passages([lines[row] for row in rows], job_description)))
+    reordered = list(lines)
+    for run in runs:
+        for row, source in zip(run, sorted(run, key=lambda r: -scores[r])):
+            reordered[row] = lines[source]
+
+    wanted = set(terms(job_description))
+    skill_lines = {
+        line.strip()
+        for section in parse_document(example_text)['sections'] if section['kind'] == 'skills'
+        for line in section['text'].splitlines()
+    }
+    for row, line in enumerate(reordered):
+        if line.strip() in skill_lines and ',' in line:
+            # Indent, bullet and 'Languages:' style label stay in front
+            prefix = _SKILL_PREFIX_RE.match(line).group(0)
+            items = [item.strip() for item in line[len(prefix):].split(',')]
+            items.sort(key=lambda item: not set(terms(item)) & wanted)
+            reordered[row] = prefix + ', '.join(items)
+    return '\n'.join(reordered)
+
+
+def cover_letter_fallback(example_cover_letter, job_description):
+    """Offline cover letter used when no AI provider is configured"""
+    return f"{draft_cover_letter(example_cover_letter, job_description)}\n\n---\n{COVER_LETTER_NOTE}\n"
+
+
+def resume_fallback(example_resume, job_description):
+    """Offline resume used when no AI provider is configured"""
+    return f"{draft_resume(example_resume, job_description)}\n\n---\n{RESUME_NOTE}\n"
+
+
+# kind -> offline draft, without the fallback's note
+DRAFTS = {
+    'cover_letter': draft_cover_letter,
+    'resume': draft_resume,
+}
@@ -0,0 +1,321 @@
+"""
+Document generation on top of the prompt templates, provider layer and cache
+
+generate_document and stream_generation are the single path both the Flask
+server and the serverless functions use to produce a cover letter or resume.
+Provider calls go through the router, which fails over between providers,
+and identical calls already in flight are joined instead of repeated.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from ._cache import get_generation_cache, make_cache_key
+    from ._fallback import DRAFTS, STREAM_PREVIEW
+    from ._limits import Overloaded
+    from ._matching import RESUME_TOP_BULLETS, select_top_bullets
+    from ._metrics import record_payload, span
+    from ._parsing import STRUCTURED_JOB_DESCRIPTION, structure_job_description
+    from ._prompts import DOCUMENTS, PROMPT_TEMPLATE_VERSION, REFINE_SYSTEM_PROMPT, build_refine_prompt
+    from ._providers import configured_model
+    from ._refine import PatchError, apply_patch, number_paragraphs, parse_patch, split_paragraphs
+    from ._router import get_router
+    from ._single_flight import get_single_flight
+    from ._token_budget import fit_prompt
+except ImportError:
+    from _cache import get_generation_cache, make_cache_key
+    from _fallback import DRAFTS, STREAM_PREVIEW
+    from _limits import Overloaded
+    from _matching import RESUME_TOP_BULLETS, select_top_bullets
+    from _metrics import record_payload, span
+    from _parsing import STRUCTURED_JOB_DESCRIPTION, structure_job_description
+    from _prompts import DOCUMENTS, PROMPT_TEMPLATE_VERSION, REFINE_SYSTEM_PROMPT, build_refine_prompt
+    from _providers import configured_model
+    from _refine import PatchError, apply_patch, number_paragraphs, parse_patch, split_paragraphs
+    from _router import get_router
+    from _single_flight import get_single_flight
+    from _token_budget import fit_prompt
+
+# Rewrites the job description into its compact structured form before trimming
+_JOB_STRUCTURE = structure_job_description if STRUCTURED_JOB_DESCRIPTION else None
+
+
+def _generation_key(kind, example_text, job_description, ai_provider, model):
+    return make_cache_key(
+        kind,
+        example_text,
+        job_description,
+        ai_provider,
+        model,
+        PROMPT_TEMPLATE_VERSION
+    )
+
+
+def _timed_prompt(kind, example_text, job_description):
+    """Fit the inputs to the token budget and build the prompt inside the 'prompt' span.
+
+    The job description is sent in its structured form from _parsing, and a
+    resume keeps only its RESUME_TOP_BULLETS most relevant bullets per entry
+    when that is set. Returns ``(prompt, example_text, job_description,
+    token_report)`` with the trimmed inputs, which also key the generation
+    cache.
+    """
+    build_prompt, system_prompt, _ = DOCUMENTS[kind]
+    with span('prompt'):
+        if kind == 'resume' and RESUME_TOP_BULLETS:
+            example_text = select_top_bullets(example_text, job_description)
+        example_text, job_description, token_report = fit_prompt(
+            build_prompt, system_prompt, example_text, job_description, structure=_JOB_STRUCTURE
+        )
+        prompt = build_prompt(example_text, job_description)
+    record_payload('prompt', sum(len(part.encode('utf-8')) for part in prompt))
+    return prompt, example_text, job_description, token_report
+
+
+def generate_document(kind, example_text, job_description, ai_provider='anthropic', cancelled=None):
+    """Generate a document ('cover_letter' or 'resume'), returning ``(text, metadata)``.
+
+    metadata holds ``cache_hit``, ``usage``, the provider token counts
+    including cached prompt tokens, ``prompt_tokens``, the estimated
+    prompt size before and after trimming to the token budget, and
+    ``coalesced``, True when the text came from an identical request that
+    was already in flight. usage is empty when nothing was sent to a
+    provider for this request (generation cache hit, coalesced request or
+    offline fallback), and prompt_tokens is empty for the fallback. Setting
+    the threading.Event passed as cancelled abandons the provider call.
+    """
+    _, system_prompt, fallback = DOCUMENTS[kind]
+    model = configured_model(ai_provider)
+    if model is None:
+        return fallback(example_text, job_description), {
+            'cache_hit': False, 'usage': {}, 'prompt_tokens': {}, 'coalesced': False
+        }
+
+    prompt, example_text, job_description, token_report = _timed_prompt(kind, example_text, job_description)
+    key = _generation_key(kind, example_text, job_description, ai_provider, model)
+    usage = {}
+    coalesced = False
+
+    def call_provider():
+        with span('llm'):
+            text, call_usage = get_router().complete(prompt, system_prompt, ai_provider, cancelled=cancelled)
+        usage.update(call_usage)
+        return text
+
+    def produce():
+        nonlocal coalesced
+        text, coalesced = get_single_flight().do(key, call_provider)
+        return text
+
+    try:
+        text, cache_hit = get_generation_cache().get_or_generate(key, produce)
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise Exception(f"Error generating {kind.replace('_', ' ')}: {str(e)}")
+    return text, {'cache_hit': cache_hit, 'usage': usage, 'prompt_tokens': token_report, 'coalesced': coalesced}
+
+
+def generate_documents_concurrently(examples, job_description, ai_provider='anthropic'):
+    """Generate several documents for one job at the same time.
+
+    examples maps document kind to its example text. Returns a
+    ``(results, errors)`` pair of dicts keyed by kind, so one failed
+    generation does not discard the others. When none succeeded and the
+    rate limiter shed any of them, Overloaded is raised instead. Each
+    result is the ``(text, metadata)`` pair from generate_document.
+    """
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+        futures = {
+            # Each thread runs in a copy of the caller's context, so its spans
+            # are added to the timings of the request that started it
+            kind: executor.submit(
+                contextvars.copy_context().run,
+                generate_document, kind, example, job_description, ai_provider
+            )
+            for kind, example in examples.items()
+        }
+        overloaded = None
+        for kind, future in futures.items():
+            try:
+                results[kind] = future.result()
+            except Overloaded as e:
+                errors[kind] = str(e)
+                overloaded = e
+            except Exception as e:
+                errors[kind] = str(e)
+
+    if overloaded is not None and not results:
+        raise overloaded
+    return results, errors
+
+
+def generate_document_cached(kind, example_text, job_description, ai_provider='anthropic'):
+    """Generate a document, returning ``(text, cache_hit)``"""
+    text, metadata = generate_document(kind, example_text, job_description, ai_provider)
+    return text, metadata['cache_hit']
+
+
+def _apply_reply(paragraphs, reply):
+    """``(text, changed, mode)`` of the document a refine reply describes.
+
+    A reply without edit blocks is the whole rewritten document; anything
+    else must be a patch that applies to paragraphs, or PatchError is raised.
+    """
+    edits = parse_patch(reply)
+    if edits is None:
+        return reply.strip(), list(range(1, len(paragraphs) + 1)), 'rewrite'
+    text, changed = apply_patch(paragraphs, edits)
+    return text, changed, 'patch'
+
+
+def refine_document(kind, draft, instruction='', job_description='', ai_provider='anthropic'):
+    """Edit a finished draft, returning ``(text, metadata)``.
+
+    Only the paragraphs the model changes come back from the provider, as a
+    paragraph patch applied to the draft here. metadata holds
+    ``cache_hit``, ``usage``, ``prompt_tokens``, ``coalesced``, ``changed``
+    (the draft paragraph numbers that were edited) and ``mode``: 'patch',
+    or 'rewrite' when the model sent the whole document back instead. Raises
+    ValueError when no provider is configured, the draft is empty or the
+    draft alone is over the prompt token budget, and PatchError when the
+    model's edits do not fit the draft. The draft is never trimmed, since
+    the patch numbers its paragraphs; only the job description is.
+    """
+    model = configured_model(ai_provider)
+    if model is None:
+        raise ValueError('Refining needs an AI provider; configure ANTHROPIC_API_KEY or OPENAI_API_KEY')
+    paragraphs = split_paragraphs(draft)
+    if not paragraphs:
+        raise ValueError('The draft is empty')
+
+    def build_prompt(numbered_draft, job_description):
+        return build_refine_prompt(kind.replace('_', ' '), numbered_draft, instruction, job_description)
+
+    with span('prompt'):
+        numbered_draft, job_description, token_report = fit_prompt(
+            build_prompt, REFINE_SYSTEM_PROMPT, number_paragraphs(paragraphs), job_description,
+            structure=_JOB_STRUCTURE if job_description else None, keep_example=True
+        )
+        if 0 < token_report['budget'] < token_report['after']:
+            raise ValueError(
+                f"The draft is too long to refine: about {token_report['after']} prompt tokens, "
+                f"over the {token_report['budget']} token budget"
+            )
+        prompt = build_prompt(numbered_draft, job_description)
+    record_payload('prompt', sum(len(part.encode('utf-8')) for part in prompt))
+    key = make_cache_key(
+        f'refine_{kind}',
+        draft,
+        f'{instruction}\0{job_description}',
+        ai_provider,
+        model,
+        PROMPT_TEMPLATE_VERSION
+    )
+    usage = {}
+    coalesced = False
+
+    def call_provider():
+        with span('llm'):
+            reply, call_usage = get_router().complete(prompt, REFINE_SYSTEM_PROMPT, ai_provider)
+        usage.update(call_usage)
+        # A reply that is neither a rewrite nor a patch that fits raises here,
+        # so it is never cached
+        _apply_reply(paragraphs, reply)
+        return reply
+
+    def produce():
+        nonlocal coalesced
+        reply, coalesced = get_single_flight().do(key, call_provider)
+        return reply
+
+    try:
+        reply, cache_hit = get_generation_cache().get_or_generate(key, produce)
+    except (Overloaded, PatchError):
+        raise
+    except Exception as e:
+        raise Exception(f"Error refining {kind.replace('_', ' ')}: {str(e)}")
+
+    text, changed, mode = _apply_reply(paragraphs, reply)
+    return text, {
+        'cache_hit': cache_hit,
+        'usage': usage,
+        'prompt_tokens': token_report,
+        'changed': changed,
+        'mode': mode,
+        'coalesced': coalesced
+    }
+
+
+def stream_generation(kind, example_text, job_description, ai_provider, fallback=None):
+    """Yield a generated document ('cover_letter' or 'resume') in chunks.
+
+    Goes through the generation cache like the non-streaming path. When no
+    provider is configured, fallback() (by default the offline draft)
+    is called and its result is yielded in one piece.
+    """
+    _, system_prompt, default_fallback = DOCUMENTS[kind]
+    model = configured_model(ai_provider)
+    if model is None:
+        if fallback is None:
+            yield default_fallback(example_text, job_description)
+        else:
+            yield fallback()
+        return
+
+    prompt, example_text, job_description, _ = _timed_prompt(kind, example_text, job_description)
+    key = _generation_key(kind, example_text, job_description, ai_provider, model)
+    try:
+        with span('llm_stream'):
+            yield from get_generation_cache().get_or_stream(
+                key,
+                lambda: get_router().stream(prompt, system_prompt, ai_provider)
+            )
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise Exception(f"Error generating {kind.replace('_', ' ')}: {str(e)}")
+
+
+def preview_document(kind, example_text, job_description, ai_provider):
+    """Offline draft to show while the provider generates, or None.
+
+    None when STREAM_PREVIEW is off, and when no provider is configured,
+    since the offline fallback is then the document itself.
+    """
+    if not STREAM_PREVIEW or configured_model(ai_provider) is None:
+        return None
+    with span('preview'):
+        return DRAFTS[kind](example_text, job_description)
+
+
+def stream_cover_letter_with_ai(example_cover_letter, job_description, ai_provider='anthropic'):
+    """Yield the adapted cover letter in chunks"""
+    return stream_generation('cover_letter', example_cover_letter, job_description, ai_provider)
+
+
+def generate_cover_letter_with_ai(example_cover_letter, job_description, ai_provider='anthropic'):
+    """Use AI to generate adapted cover letter"""
+    return generate_cover_letter_cached(example_cover_letter, job_description, ai_provider)[0]
+
+
+def generate_cover_letter_cached(example_cover_letter, job_description, ai_provider='anthropic'):
+    """Generate a cover letter through the generation cache.
+
+    Returns ``(cover_letter, cache_hit)``. The offline fallback is cheap and
+    is never cached.
+    """
+    return generate_document_cached('cover_letter', example_cover_letter, job_description, ai_provider)
+
+
+def generate_resume_with_ai(example_resume, job_description, ai_provider='anthropic'):
+    """Use AI to generate adapted resume"""
+    return generate_resume_cached(example_resume, job_description, ai_provider)[0]
+
+
+def generate_resume_cached(example_resume, job_description, ai_provider='anthropic'):
+    """Generate a resume through the generation cache, returning ``(resume, cache_hit)``"""
+    return generate_document_cached('resume', example_resume, job_description, ai_provider)
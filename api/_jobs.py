@@ -0,0 +1,316 @@
+"""
+Background job queue for long generations
+
+Submitting a job returns its id at once; a pool of worker threads runs the
+generation and renders the requested formats, then writes the result to
+SQLite. Clients poll for it by id or receive it at a callback URL.
+"""
+
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Configuration
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', '100'))  # Jobs waiting for a worker
+JOB_STORE_PATH = os.getenv(
+    'JOB_STORE_PATH',
+    os.path.join(tempfile.gettempdir(), 'cover_letter_jobs.sqlite3')
+)
+JOB_TTL = int(os.getenv('JOB_TTL', '86400'))  # Seconds finished jobs are kept
+JOB_CALLBACK_TIMEOUT = float(os.getenv('JOB_CALLBACK_TIMEOUT', '10'))
+JOB_CALLBACK_HOSTS = frozenset(  # Callback hosts allowed even when they resolve to private addresses
+    host.strip().lower() for host in os.getenv('JOB_CALLBACK_HOSTS', '').split(',') if host.strip()
+)
+JOB_METRICS_WINDOW = 500  # Recent jobs the wait and run percentiles are taken over
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    """Raised by submit when JOB_MAX_QUEUED jobs are already waiting"""
+
+
+def validate_callback_url(url):
+    """Raise ValueError unless url is an absolute http(s) URL on a public host.
+
+    The host is resolved and every address it resolves to must be globally
+    routable, so a callback cannot reach loopback, private, link-local or
+    reserved addresses such as a cloud metadata service. Hosts listed in
+    JOB_CALLBACK_HOSTS skip the address check. Called at submit time and
+    again right before the callback is sent, since DNS can change between
+    the two.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError('callback_url must be an http or https URL')
+    host = parsed.hostname.lower()
+    if host in JOB_CALLBACK_HOSTS:
+        return
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError):
+        raise ValueError('callback_url host does not resolve')
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if getattr(ip, 'ipv4_mapped', None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError('callback_url must not point at a private, loopback or reserved address')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Refuse redirects, which could send the callback to a host that was never checked"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f'callback redirected to {newurl}', headers, fp)
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class JobStore:
+    """SQLite store for job status, results and rendered files"""
+
+    def __init__(self, path=JOB_STORE_PATH, ttl=JOB_TTL):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, kind TEXT, status TEXT, result TEXT, error TEXT, '
+                'callback_url TEXT, callback_error TEXT, '
+                'created REAL, started REAL, finished REAL, expires REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS job_files ('
+                'job_id TEXT, format TEXT, data BLOB, PRIMARY KEY (job_id, format))'
+            )
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job_id, kind, callback_url=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, status, callback_url, created, expires) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, callback_url, now, now + self.ttl)
+            )
+
+    def mark_running(self, job_id):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, started = ? WHERE id = ?',
+                (RUNNING, time.time(), job_id)
+            )
+
+    def finish(self, job_id, result, files):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO job_files (job_id, format, data) VALUES (?, ?, ?)',
+                [(job_id, file_format, data) for file_format, data in files.items()]
+            )
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, finished = ?, expires = ? WHERE id = ?',
+                (DONE, json.dumps(result), now, now + self.ttl, job_id)
+            )
+
+    def fail(self, job_id, error):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished = ?, expires = ? WHERE id = ?',
+                (FAILED, error, now, now + self.ttl, job_id)
+            )
+
+    def set_callback_error(self, job_id, error):
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET callback_error = ? WHERE id = ?', (error, job_id))
+
+    def get(self, job_id):
+        """Return the job as a dict, or None if it does not exist or has expired"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT kind, status, result, error, callback_error, created, started, finished, expires '
+                'FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+            if row is None or row[8] < time.time():
+                return None
+            formats = [name for (name,) in conn.execute(
+                'SELECT format FROM job_files WHERE job_id = ? ORDER BY format', (job_id,)
+            )]
+        kind, status, result, error, callback_error, created, started, finished, _ = row
+        job = {'id': job_id, 'kind': kind, 'status': status, 'created': created,
+               'started': started, 'finished': finished, 'formats': formats}
+        if result is not None:
+            job['result'] = json.loads(result)
+        if error is not None:
+            job['error'] = error
+        if callback_error is not None:
+            job['callback_error'] = callback_error
+        return job
+
+    def get_file(self, job_id, file_format):
+        """Return the rendered bytes for one format, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT data FROM job_files JOIN jobs ON jobs.id = job_files.job_id '
+                'WHERE job_id = ? AND format = ? AND expires >= ?',
+                (job_id, file_format, time.time())
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM job_files WHERE job_id IN (SELECT id FROM jobs WHERE expires < ?)',
+                (time.time(),)
+            )
+            conn.execute('DELETE FROM jobs WHERE expires < ?', (time.time(),))
+
+
+def _percentiles(samples):
+    if not samples:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    return {
+        'mean': round(sum(ordered) / len(ordered), 3),
+        'p50': round(ordered[len(ordered) // 2], 3),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+class JobQueue:
+    """Thread pool that runs jobs and records them in a JobStore.
+
+    runner is called as ``runner(kind, payload)`` on a worker thread and
+    returns ``(result, files)``: a JSON-serializable dict and a mapping of
+    format name to rendered bytes. Payloads stay in memory and are never
+    written to the store.
+    """
+
+    def __init__(self, runner, store=None, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED):
+        self.runner = runner
+        self.store = store or JobStore()
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=JOB_METRICS_WINDOW)
+        self._run_times = deque(maxlen=JOB_METRICS_WINDOW)
+
+    def submit(self, kind, payload, callback_url=None):
+        """Queue a job and return its id without waiting for it to run"""
+        if callback_url:
+            validate_callback_url(callback_url)
+        with self._lock:
+            if self._queued >= self.max_queued:
+                raise QueueFull(f'{self._queued} jobs are already waiting')
+            self._queued += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.purge_expired()
+            self.store.create(job_id, kind, callback_url)
+            self._executor.submit(self._run, job_id, kind, payload, callback_url, time.monotonic())
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, kind, payload, callback_url, enqueued):
+        started = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started - enqueued)
+
+        failed = False
+        try:
+            self.store.mark_running(job_id)
+            result, files = self.runner(kind, payload)
+            self.store.finish(job_id, result, files)
+        except Exception as e:
+            failed = True
+            self.store.fail(job_id, str(e))
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run_times.append(time.monotonic() - started)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+        if callback_url:
+            self._send_callback(job_id, callback_url)
+
+    def _send_callback(self, job_id, callback_url):
+        """POST the finished job to its callback URL; failures are stored on the job"""
+        try:
+            validate_callback_url(callback_url)
+            request = urllib.request.Request(
+                callback_url,
+                data=json.dumps(self.store.get(job_id)).encode('utf-8'),
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with _callback_opener.open(request, timeout=JOB_CALLBACK_TIMEOUT):
+                pass
+        except Exception as e:
+            self.store.set_callback_error(job_id, str(e))
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def get_file(self, job_id, file_format):
+        return self.store.get_file(job_id, file_format)
+
+    def stats(self):
+        """Queue depth, throughput counters and wait/run time percentiles in seconds"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'depth': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'wait_seconds': _percentiles(self._wait_times),
+                'run_seconds': _percentiles(self._run_times),
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,235 @@
+"""
+Rate limits and concurrency caps in front of provider calls
+
+Each provider/model gets a ProviderLimiter: token buckets for requests and
+tokens per minute, a cap on calls in flight and a bound on how many callers
+may queue for it. A call that would wait longer than LIMIT_MAX_WAIT, or
+arrives when the queue is full, is shed at once with Overloaded, which the
+endpoints answer with 503 and Retry-After instead of piling more work onto
+a provider that is already throttling us. A 429 from the provider pauses
+its limiter for the retry-after period, so every caller backs off together.
+"""
+
+import email.utils
+import os
+import random
+import threading
+import time
+
+try:
+    from ._token_budget import estimate_tokens
+except ImportError:
+    from _token_budget import estimate_tokens
+
+# Configuration
+PROVIDER_RPM = int(os.getenv('PROVIDER_RPM', '50'))  # Requests per minute per provider/model; 0 for no limit
+PROVIDER_TPM = int(os.getenv('PROVIDER_TPM', '40000'))  # Tokens per minute per provider/model; 0 for no limit
+PROVIDER_CONCURRENCY = int(os.getenv('PROVIDER_CONCURRENCY', '8'))  # Calls in flight per provider/model
+LIMIT_MAX_WAIT = float(os.getenv('LIMIT_MAX_WAIT', '10'))  # Seconds a call may queue before it is shed
+LIMIT_MAX_QUEUED = int(os.getenv('LIMIT_MAX_QUEUED', '32'))  # Callers waiting per provider/model
+LLM_RETRIES = int(os.getenv('LLM_RETRIES', '2'))  # Retries when no other provider is left to fail over to
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '20'))
+
+# Reserved per call for the reply before its size is known; settled against usage afterwards
+EXPECTED_OUTPUT_TOKENS = 500
+
+
+class Overloaded(Exception):
+    """A call shed because its provider's local queue is saturated"""
+
+    status_code = 503
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_rate_limited(error):
+    """True for a 429 response from a provider"""
+    return getattr(error, 'status_code', None) == 429
+
+
+def retry_after_seconds(error):
+    """Seconds the provider asked us to wait, from retry-after(-ms) headers, or None"""
+    value = getattr(error, 'retry_after', None)
+    if value is not None:
+        return float(value)
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            moment = email.utils.parsedate_to_datetime(value)
+            return max(0.0, moment.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, error=None):
+    """Seconds to wait before retry number attempt (from 0).
+
+    The provider's retry-after wins when it sent one, with a little jitter so
+    waiting callers do not all return at once; otherwise full-jitter
+    exponential backoff capped at LLM_BACKOFF_MAX.
+    """
+    requested = retry_after_seconds(error) if error is not None else None
+    if requested is not None:
+        return requested * random.uniform(1.0, 1.2)
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def estimate_call_tokens(prompt, system_prompt):
+    """Tokens to reserve for a ``(prefix, request)`` prompt and its reply"""
+    return estimate_tokens(system_prompt) + sum(estimate_tokens(part) for part in prompt) + EXPECTED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Budget of per_minute units refilled continuously.
+
+    Reservations may take the balance below zero; the caller then waits
+    until the refill has covered its share, so callers are served in the
+    order they reserved.
+    """
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount from the bucket and return the seconds until it is covered"""
+        if self.per_minute <= 0:
+            return 0.0
+        amount = min(amount, self.per_minute)  # A single call larger than the budget still runs
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, amount):
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.per_minute, self._tokens + amount)
+
+
+class ProviderLimiter:
+    """Request and token budgets plus a concurrency cap for one provider/model"""
+
+    def __init__(self, rpm=PROVIDER_RPM, tpm=PROVIDER_TPM, concurrency=PROVIDER_CONCURRENCY,
+                 max_wait=LIMIT_MAX_WAIT, max_queued=LIMIT_MAX_QUEUED):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_wait = max_wait
+        self.max_queued = max_queued
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.delayed = 0
+        self.shed = 0
+        self.rate_limited = 0
+
+    def _shed(self, retry_after):
+        with self._lock:
+            self.shed += 1
+        return Overloaded('AI provider is busy; try again shortly', max(1, round(retry_after)))
+
+    def acquire(self, tokens):
+        """Wait for budget and a free slot, or raise Overloaded.
+
+        Returns the number of tokens reserved; pass it to release().
+        """
+        with self._lock:
+            if self.waiting >= self.max_queued:
+                self.shed += 1
+                raise Overloaded('AI provider queue is full; try again shortly', max(1, round(self.max_wait)))
+            self.waiting += 1
+        try:
+            started = time.monotonic()
+            paused = max(0.0, self._paused_until - started)
+            delay = max(paused, self.requests.reserve(1), self.tokens.reserve(tokens))
+            if delay > self.max_wait:
+                self.requests.refund(1)
+                self.tokens.refund(tokens)
+                raise self._shed(delay)
+            if delay > 0:
+                with self._lock:
+                    self.delayed += 1
+                time.sleep(delay)
+            remaining = self.max_wait - (time.monotonic() - started)
+            if not self._slots.acquire(timeout=max(0.0, remaining)):
+                self.requests.refund(1)
+                self.tokens.refund(tokens)
+                raise self._shed(self.max_wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+        return tokens
+
+    def release(self, reserved, usage=None):
+        """Free the slot and settle the token reservation against actual usage"""
+        if usage:
+            used = usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+            if used < reserved:
+                self.tokens.refund(reserved - used)
+            elif used > reserved:
+                self.tokens.reserve(used - reserved)
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def pause(self, seconds):
+        """Hold back every new call for seconds, after the provider answered 429"""
+        with self._lock:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'delayed': self.delayed,
+                'shed': self.shed,
+                'rate_limited': self.rate_limited,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider, model):
+    """Return the process-wide limiter for provider/model"""
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(key, ProviderLimiter())
+    return limiter
+
+
+def limiter_stats():
+    """Limiter counters per provider/model, keyed 'provider/model'"""
+    with _limiters_lock:
+        items = list(_limiters.items())
+    return {f'{provider}/{model}': limiter.snapshot() for (provider, model), limiter in items}
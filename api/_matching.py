@@ -0,0 +1,334 @@
+"""
+Local keyword scoring of resumes and letters against job descriptions
+
+Everything here runs in process, with no provider call:
+
+- score_passages ranks resume bullets or letter paragraphs against one job
+  description with BM25, so the prompt can keep the most relevant ones.
+- match_scores rates one resume against many job descriptions at once: the
+  share of each posting's keywords, weighted by how often the posting uses
+  them, that appear anywhere in the resume. The score is 0-100 and does not
+  depend on which other postings are in the batch.
+
+Job descriptions are scored from their parse in _parsing, without company
+background, benefits and legal sections, so those do not count as missing
+keywords. One document is scored in plain Python, which is what every
+generate request needs; NumPy is imported only to score a batch of
+postings, so serving a generation never pays for loading it.
+"""
+
+import functools
+import math
+import os
+import re
+from collections import Counter
+
+try:
+    from ._cache import MemoryCache
+    from ._metrics import span
+    from ._parsing import PARSE_CACHE_TTL, document_hash, parse_document
+    from ._refine import split_paragraphs
+    from ._token_budget import remove_boilerplate
+except ImportError:
+    from _cache import MemoryCache
+    from _metrics import span
+    from _parsing import PARSE_CACHE_TTL, document_hash, parse_document
+    from _refine import split_paragraphs
+    from _token_budget import remove_boilerplate
+
+# Configuration
+RESUME_TOP_BULLETS = int(os.getenv('RESUME_TOP_BULLETS', '0'))  # Bullets kept per resume entry; 0 keeps all
+MATCH_MAX_JOBS = int(os.getenv('MATCH_MAX_JOBS', '500'))
+
+# BM25 term saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Matched and missing keywords reported with each score
+MATCH_TERMS = 8
+# Job description sections that say nothing about the work itself
+_UNSCORED_KINDS = frozenset(('company', 'benefits', 'legal'))
+
+# Keyword counts per job description, so a posting is tokenized once however
+# many resumes are scored against it
+keyword_cache = MemoryCache(max_entries=max(1024, 2 * MATCH_MAX_JOBS), ttl=PARSE_CACHE_TTL)
+
+_TERM_RE = re.compile(r'[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*')
+_BULLET_LINE_RE = re.compile(r'^\s*(?:[\-*•·–▪◦]|\d{1,2}[.)])\s+')
+
+# Common words, and words every posting uses that say nothing about the job
+_STOPWORDS = frozenset('''
+a about above across after all also an and any are as at be been being both but by can could do does
+each etc for from had has have how i if in into is it its just may me more most must my no not of on
+one or other our out over own per same should so some such than that the their them then there these
+they this those through to too under up us very was we were what when where which while who will with
+within without would you your yours every many well get make need needs help want
+ability able applicant applicants candidate candidates career careers company day description duties environment excellent
+experience ideal including job join looking new opportunity plus position preferred prior
+qualifications required requirement requirements responsibilities responsibility role seeking skill
+skills strong team teams understanding work working year years
+'''.split())
+
+
+@functools.lru_cache(maxsize=65536)
+def _stem(term):
+    """Fold simple plurals so 'pipelines' matches 'pipeline'"""
+    if len(term) > 4 and term.endswith('ies'):
+        return term[:-3] + 'y'
+    if len(term) > 3 and term.endswith('s') and not term.endswith(('ss', 'us', 'is')):
+        return term[:-1]
+    return term
+
+
+def terms(text):
+    """Keyword terms of text: lowercased, plural-folded, without stopwords"""
+    found = []
+    for term in _TERM_RE.findall(text.lower()):
+        term = term.rstrip('.-')
+        if len(term) > 1 and term not in _STOPWORDS:
+            found.append(_stem(term))
+    return found
+
+
+def job_keywords(job_description):
+    """``(counts, surface)`` for a job description: keyword counts and the
+    first spelling seen of each keyword, for display. Cached per document hash.
+    """
+    def index():
+        record = parse_document(job_description)
+        text = remove_boilerplate('\n\n'.join([record['role'] or ''] + [
+            section['text'] for section in record['sections'] if section['kind'] not in _UNSCORED_KINDS
+        ]))
+        # The employer's name is not a keyword a resume should carry
+        employer = set(terms(record['company'] or ''))
+        counts = Counter()
+        surface = {}
+        for word in _TERM_RE.findall(text.lower()):
+            word = word.rstrip('.-')
+            if len(word) > 1 and word not in _STOPWORDS:
+                term = _stem(word)
+                if term not in employer:
+                    counts[term] += 1
+                    surface.setdefault(term, word)
+        return counts, surface
+
+    return keyword_cache.get_or_generate(document_hash(job_description), index)[0]
+
+
+def _count_matrix(counters, vocabulary):
+    """Rows of term counts over vocabulary (term -> column)"""
+    import numpy as np
+
+    counts = np.zeros((len(counters), len(vocabulary)), dtype=np.float32)
+    rows = []
+    columns = []
+    values = []
+    for row, counter in enumerate(counters):
+        for term, count in counter.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+                values.append(count)
+    counts[rows, columns] = values
+    return counts
+
+
+def _term_weight(count):
+    """1 + log(count), so repeated keywords count more but do not dominate"""
+    return 1.0 + math.log(count)
+
+
+def _query_weights(counts):
+    """_term_weight of each count in a NumPy array, 0 where a term is absent"""
+    import numpy as np
+
+    weights = np.zeros_like(counts)
+    present = counts > 0
+    weights[present] = 1.0 + np.log(counts[present])
+    return weights
+
+
+def score_passages(passages, job_description):
+    """BM25 score of each passage against the job description, as a list of floats.
+
+    Document frequencies come from the passages themselves, so a term that
+    appears in every bullet counts for little. The passages of one document
+    are few, so this runs without NumPy.
+    """
+    if not passages:
+        return []
+    query = job_keywords(job_description)[0]
+    if not query:
+        return [0.0] * len(passages)
+
+    passage_terms = [terms(passage) for passage in passages]
+    counts = [Counter(term for term in term_list if term in query) for term_list in passage_terms]
+    lengths = [max(1, len(term_list)) for term_list in passage_terms]
+    average = sum(lengths) / len(lengths)
+    df = Counter(term for counter in counts for term in counter)
+    idf = {term: math.log(1.0 + (len(passages) - found + 0.5) / (found + 0.5)) for term, found in df.items()}
+
+    scores = []
+    for counter, length in zip(counts, lengths):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+        scores.append(round(sum(
+            tf * (BM25_K1 + 1) / (tf + norm) * idf[term] * _term_weight(query[term])
+            for term, tf in counter.items()
+        ), 4))
+    return scores
+
+
+def example_passages(example_text):
+    """The bullets of a resume, or the paragraphs of a letter without bullets"""
+    bullets = [line.strip() for line in example_text.splitlines() if _BULLET_LINE_RE.match(line)]
+    return bullets if bullets else split_paragraphs(example_text)
+
+
+def rank_passages(example_text, job_description):
+    """Passages of the example as ``{'text', 'score'}`` dicts, most relevant first"""
+    passages = example_passages(example_text)
+    scores = score_passages(passages, job_description)
+    ranked = [{'text': text, 'score': score} for text, score in zip(passages, scores)]
+    return sorted(ranked, key=lambda passage: -passage['score'])
+
+
+def bullet_runs(lines):
+    """Row numbers of each run of consecutive bullet lines, in order"""
+    runs = []
+    for row, line in enumerate(lines):
+        if _BULLET_LINE_RE.match(line):
+            if runs and runs[-1][-1] == row - 1:
+                runs[-1].append(row)
+            else:
+                runs.append([row])
+    return runs
+
+
+def select_top_bullets(example_text, job_description, limit=None):
+    """Keep the limit most relevant bullets of each run of bullets in a resume.
+
+    Runs are consecutive bullet lines, usually the achievements under one
+    job; kept bullets stay in their original order and all other lines are
+    untouched. A limit of 0 returns the text as it is.
+    """
+    limit = RESUME_TOP_BULLETS if limit is None else limit
+    lines = example_text.splitlines()
+    bullet_rows = [row for row, line in enumerate(lines) if _BULLET_LINE_RE.match(line)]
+    if limit <= 0 or len(bullet_rows) <= limit:
+        return example_text
+
+    scores = dict(zip(bullet_rows, score_passages([lines[row] for row in bullet_rows], job_description)))
+    dropped = set()
+    for run in bullet_runs(lines):
+        if len(run) > limit:
+            kept = sorted(run, key=lambda r: -scores[r])[:limit]
+            dropped.update(set(run) - set(kept))
+    return '\n'.join(line for row, line in enumerate(lines) if row not in dropped)
+
+
+def match_scores(example_text, job_descriptions):
+    """Rate one resume or letter against many job descriptions at once.
+
+    Returns one dict per job description, in order: ``score`` (0-100, the
+    weighted share of the posting's keywords found in the example),
+    ``matched`` and ``missing``, the posting's heaviest keywords that the
+    example does and does not contain.
+    """
+    if not job_descriptions:
+        return []
+    with span('match'):
+        if len(job_descriptions) == 1:
+            return [_match_one(example_text, job_descriptions[0])]
+        return _match_scores(example_text, job_descriptions)
+
+
+def _match_one(example_text, job_description):
+    """match_scores for a single posting in plain Python"""
+    counts, surface = job_keywords(job_description)
+    if not counts:
+        return {'score': 0, 'matched': [], 'missing': []}
+    present = set(terms(example_text))
+    weights = {term: _term_weight(count) for term, count in counts.items()}
+    total = sum(weights.values())
+    # Heaviest terms first; ties keep the order the posting used them in
+    ranked = sorted(weights, key=lambda term: -weights[term])
+    return {
+        'score': int(round(sum(weight for term, weight in weights.items() if term in present) / total * 100)),
+        'matched': [surface[term] for term in ranked if term in present][:MATCH_TERMS],
+        'missing': [surface[term] for term in ranked if term not in present][:MATCH_TERMS],
+    }
+
+
+def _match_scores(example_text, job_descriptions):
+    import numpy as np
+
+    indexed = [job_keywords(job) for job in job_descriptions]
+    vocabulary = {}
+    names = []
+    for counts, surface in indexed:
+        for term in counts:
+            if term not in vocabulary:
+                vocabulary[term] = len(names)
+                names.append(surface[term])
+    if not vocabulary:
+        return [{'score': 0, 'matched': [], 'missing': []} for _ in job_descriptions]
+    names = np.array(names)
+
+    weights = _query_weights(_count_matrix([counts for counts, _ in indexed], vocabulary))
+    present = np.zeros(len(vocabulary), dtype=np.float32)
+    for term in set(terms(example_text)):
+        column = vocabulary.get(term)
+        if column is not None:
+            present[column] = 1.0
+
+    totals = weights.sum(axis=1)
+    scores = np.divide(weights @ present, totals, out=np.zeros_like(totals), where=totals > 0)
+
+    # Heaviest terms first; ties keep the order the posting used them in
+    order = np.argsort(-weights, axis=1, kind='stable')
+    results = []
+    for row, score in enumerate(scores):
+        ranked = order[row][:np.count_nonzero(weights[row])]
+        found = present[ranked] > 0
+        results.append({
+            'score': int(round(float(score) * 100)),
+            'matched': names[ranked[found]][:MATCH_TERMS].tolist(),
+            'missing': names[ranked[~found]][:MATCH_TERMS].tolist(),
+        })
+    return results
+
+
+def match_score(example_text, job_description):
+    """Rate one resume or letter against one job description; see match_scores"""
+    return match_scores(example_text, [job_description])[0]
+
+
+def rank_jobs(example_text, jobs):
+    """Score one resume or letter against ``(name, job_description)`` pairs.
+
+    Returns the match_scores results with their ``index`` and ``name``,
+    best match first.
+    """
+    results = [
+        {'index': index, 'name': name, **match}
+        for index, ((name, _), match) in enumerate(zip(jobs, match_scores(example_text, [job for _, job in jobs])))
+    ]
+    return sorted(results, key=lambda result: -result['score'])
+
+
+def read_jobs(items):
+    """``(name, text)`` pairs from a JSON list of strings or ``{name, text}`` objects; raises ValueError"""
+    if not isinstance(items, list):
+        raise ValueError('jobs must be a list')
+    jobs = []
+    for number, item in enumerate(items, 1):
+        if isinstance(item, str):
+            name, text = f'job_{number}', item
+        elif isinstance(item, dict):
+            name, text = str(item.get('name') or f'job_{number}'), item.get('text')
+        else:
+            text = None
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f'Job {number} has no text')
+        jobs.append((name, text))
+    return jobs
@@ -0,0 +1,241 @@
+"""
+Request timing instrumentation
+
+Stages of a request (multipart parsing, text extraction, prompt building,
+the provider call, rendering) run inside span(), which records the duration
+in a histogram and adds it to the timings of the request in progress. The
+Flask server exposes the histograms and counters in the Prometheus text
+format at /metrics; both adapters send the per-request breakdown as a
+Server-Timing header, and the serverless functions log it as one JSON line.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Configuration
+TIMING_LOGS = os.getenv('TIMING_LOGS', '1') == '1'  # Structured timing log line per serverless request
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labels, values)} {_format_value(value)}'
+                for values, value in items]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def collect(self):
+        with self._lock:
+            items = sorted((values, list(series)) for values, series in self._series.items())
+        lines = []
+        bucket_labels = self.labels + ('le',)
+        for values, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_labels, values + (bound,))} {count}')
+            count = series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{_format_labels(bucket_labels, values + ("+Inf",))} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, values)} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, values)} {count}')
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    'cover_letter_stage_seconds', 'Time spent in each request stage', ('stage',)
+)
+REQUEST_SECONDS = Histogram(
+    'cover_letter_request_seconds', 'Time to answer a request', ('endpoint', 'method', 'status')
+)
+PAYLOAD_BYTES = Histogram(
+    'cover_letter_payload_bytes', 'Size of request bodies, uploads, prompts and rendered files',
+    ('kind',), BYTES_BUCKETS
+)
+TOKENS = Counter(
+    'cover_letter_tokens_total', 'Provider tokens by provider, model and type', ('provider', 'model', 'type')
+)
+
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, PAYLOAD_BYTES, TOKENS]
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestTimings:
+    """Stage durations of one request, summed per stage in the order first seen.
+
+    Stages that run in parallel (both documents of /generate-both) are
+    summed too, so together they can exceed the total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value, ending with the total so far"""
+        with self._lock:
+            stages = list(self.stages.items())
+        stages.append(('total', self.elapsed()))
+        return ', '.join(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in stages)
+
+    def as_dict(self):
+        with self._lock:
+            return {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()}
+
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request():
+    """Begin timing a request in the current context; returns (timings, reset token)"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(stage, seconds)
+
+
+def record_payload(kind, size):
+    PAYLOAD_BYTES.observe(size, kind)
+
+
+def record_tokens(provider, model, usage):
+    """Count the tokens in a provider usage dict"""
+    for key, name in (('input_tokens', 'input'), ('output_tokens', 'output'),
+                      ('cached_input_tokens', 'cached_input'), ('cache_write_tokens', 'cache_write')):
+        if usage.get(key):
+            TOKENS.inc(usage[key], provider, model, name)
+
+
+class InstrumentedHandler:
+    """Mixin for the serverless BaseHTTPRequestHandler classes.
+
+    Times each request, adds a Server-Timing header to every response and
+    writes one JSON timing line to stdout when the request is done. List it
+    before BaseHTTPRequestHandler in the bases.
+    """
+
+    def handle_one_request(self):
+        self._timings, token = start_request()
+        self._status = None
+        try:
+            super().handle_one_request()
+        finally:
+            end_request(token)
+        if self._status is not None:
+            self._log_timings()
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def end_headers(self):
+        timings = getattr(self, '_timings', None)
+        if timings is not None:
+            self.send_header('Server-Timing', timings.server_timing())
+            self.send_header('Timing-Allow-Origin', '*')
+        super().end_headers()
+
+    def _log_timings(self):
+        endpoint = self.path.split('?', 1)[0]
+        seconds = self._timings.elapsed()
+        REQUEST_SECONDS.observe(seconds, endpoint, self.command, str(self._status))
+        if TIMING_LOGS:
+            print(json.dumps({
+                'event': 'request_timing',
+                'endpoint': endpoint,
+                'method': self.command,
+                'status': self._status,
+                'duration_ms': round(seconds * 1000, 1),
+                'stages_ms': self._timings.as_dict(),
+            }), file=sys.stdout, flush=True)
@@ -0,0 +1,178 @@
+"""
+Streaming multipart/form-data parser for serverless handlers
+
+Replaces cgi.FieldStorage: the body is read from the socket in fixed-size
+chunks, each part is held in memory once, and size limits are enforced while
+reading so oversized uploads are rejected before the whole body arrives.
+"""
+
+import os
+from email.message import Message
+
+try:
+    from ._metrics import record_payload, span
+except ImportError:
+    from _metrics import record_payload, span
+
+# Configuration
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(20 * 1024 * 1024)))  # Whole request body
+MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', str(10 * 1024 * 1024)))  # Each uploaded file
+MAX_FIELD_SIZE = int(os.getenv('MAX_FIELD_SIZE', str(1024 * 1024)))  # Each text field
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartError(Exception):
+    """Malformed or oversized upload; status is the HTTP code to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Part:
+    """One form part; filename is None for plain text fields.
+
+    data is the bytearray the part was read into, handed on without a copy.
+    """
+
+    def __init__(self, name, filename, data):
+        self.name = name
+        self.filename = filename
+        self.data = data
+
+
+class MultipartForm:
+    """Parsed form with the subset of the FieldStorage API the handlers use"""
+
+    def __init__(self, parts):
+        self._parts = {}
+        for part in parts:
+            self._parts.setdefault(part.name, []).append(part)
+
+    def __contains__(self, name):
+        return name in self._parts
+
+    def __getitem__(self, name):
+        return self._parts[name][0]
+
+    def getlist(self, name):
+        """Return every part sent under name, in request order"""
+        return list(self._parts.get(name, []))
+
+    def getvalue(self, name, default=None):
+        if name not in self._parts:
+            return default
+        part = self._parts[name][0]
+        if part.filename is not None:
+            return part.data
+        return part.data.decode('utf-8')
+
+
+def _header_param(header_name, value, param):
+    message = Message()
+    message[header_name] = value
+    return message.get_param(param, header=header_name)
+
+
+def _parse_part_headers(raw_headers):
+    """Return (name, filename) from a part's header block"""
+    name = filename = None
+    for line in raw_headers.decode('utf-8', 'replace').split('\r\n'):
+        header, _, value = line.partition(':')
+        if header.strip().lower() == 'content-disposition':
+            name = _header_param('Content-Disposition', value.strip(), 'name')
+            filename = _header_param('Content-Disposition', value.strip(), 'filename')
+    if name is None:
+        raise MultipartError('Form part without a name')
+    return name, filename
+
+
+class _BodyReader:
+    """Reads at most content_length bytes from the socket, in chunks"""
+
+    def __init__(self, rfile, content_length):
+        self.rfile = rfile
+        self.remaining = content_length
+
+    def read(self):
+        if self.remaining <= 0:
+            return b''
+        chunk = self.rfile.read(min(CHUNK_SIZE, self.remaining))
+        if not chunk:
+            raise MultipartError('Upload ended early')
+        self.remaining -= len(chunk)
+        return chunk
+
+
+@span('parse')
+def parse_multipart(rfile, headers, max_upload_size=MAX_UPLOAD_SIZE,
+                    max_file_size=MAX_FILE_SIZE, max_field_size=MAX_FIELD_SIZE):
+    """Parse a multipart/form-data request body from rfile"""
+    boundary = _header_param('Content-Type', headers.get('Content-Type', ''), 'boundary')
+    if not boundary:
+        raise MultipartError('Missing multipart boundary')
+
+    try:
+        content_length = int(headers.get('Content-Length', ''))
+    except ValueError:
+        raise MultipartError('Content-Length is required', 411)
+    if content_length > max_upload_size:
+        raise MultipartError(f'Upload exceeds {max_upload_size} bytes', 413)
+    record_payload('request', content_length)
+
+    reader = _BodyReader(rfile, content_length)
+    delimiter = b'--' + boundary.encode('latin-1')
+    separator = b'\r\n' + delimiter
+    buffer = bytearray()
+
+    def fill(needle):
+        """Read until needle is in the buffer and return its index"""
+        while True:
+            index = buffer.find(needle)
+            if index != -1:
+                return index
+            chunk = reader.read()
+            if not chunk:
+                raise MultipartError('Malformed multipart body')
+            buffer.extend(chunk)
+
+    # Skip the preamble up to the first delimiter
+    index = fill(delimiter)
+    del buffer[:index + len(delimiter)]
+
+    parts = []
+    while True:
+        while len(buffer) < 2:
+            chunk = reader.read()
+            if not chunk:
+                raise MultipartError('Malformed multipart body')
+            buffer.extend(chunk)
+        if buffer[:2] == b'--':
+            break
+
+        index = fill(b'\r\n\r\n')
+        name, filename = _parse_part_headers(bytes(buffer[2:index]))
+        del buffer[:index + 4]
+
+        limit = max_file_size if filename is not None else max_field_size
+        data = bytearray()
+        while True:
+            index = buffer.find(separator)
+            # Without a separator, keep a tail that could hold the start of one
+            cut = index if index != -1 else max(len(buffer) - len(separator) + 1, 0)
+            with memoryview(buffer) as view:
+                data += view[:cut]
+            del buffer[:cut + (len(separator) if index != -1 else 0)]
+            if len(data) > limit:
+                raise MultipartError(f'Field {name} exceeds {limit} bytes', 413)
+            if index != -1:
+                break
+            chunk = reader.read()
+            if not chunk:
+                raise MultipartError('Malformed multipart body')
+            buffer.extend(chunk)
+
+        parts.append(Part(name, filename, data))
+
+    return MultipartForm(parts)
@@ -0,0 +1,297 @@
+"""
+Structured parse of resumes and job descriptions
+
+parse_document turns extracted text into a record of its sections, bullet
+items, skills, dates, requirements, responsibilities, company and role.
+Records are cached by a hash of the normalized text, so a resume is parsed
+once however many jobs it is tailored to, and a job description once for
+both the cover letter and the resume generated from it.
+
+structure_job_description renders the parse of a job description back into
+the compact text the prompts send: the role and company first, then the
+posting's opening lines and the sections that describe the work, with
+company background cut to its opening paragraph and benefits, legal and
+application sections left out.
+"""
+
+import hashlib
+import os
+import re
+
+try:
+    from ._cache import MemoryCache, normalize_text
+    from ._token_budget import split_sections, truncate_to_tokens
+except ImportError:
+    from _cache import MemoryCache, normalize_text
+    from _token_budget import split_sections, truncate_to_tokens
+
+# Configuration
+STRUCTURED_JOB_DESCRIPTION = os.getenv('STRUCTURED_JOB_DESCRIPTION', '1').lower() in ('1', 'true', 'yes')
+PARSE_CACHE_SIZE = int(os.getenv('PARSE_CACHE_SIZE', '256'))  # Parsed documents kept per process
+PARSE_CACHE_TTL = int(os.getenv('PARSE_CACHE_TTL', '3600'))
+
+# Company background kept in the structured job description
+COMPANY_SUMMARY_TOKENS = 80
+
+parse_cache = MemoryCache(max_entries=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL)
+
+# Section kinds by heading topic, first match wins; 'about the role' must win
+# over 'about'. A heading is classified only when all of it is made of topics,
+# each after optional words such as 'Key' or 'Technical', so 'Senior Privacy
+# Engineer' or 'Developer Tools Lead' is not a legal or skills heading.
+_SECTION_TOPICS = (
+    ('responsibilities', r'responsibilit(y|ies)|what you.?ll do|what you will do|duties|day.to.day|role|impact|'
+                         r'about the (job|position|role)|you will'),
+    ('requirements', r'requirements?|qualifications?|must.haves?( skills)?|nice.to.haves?( skills)?|preferred|'
+                     r'what you.?ll (bring|need)|what you (bring|need)|(what |who )?(we.?re |we are )?looking for|'
+                     r'who you are|you have|about you'),
+    ('skills', r'skills?|technolog(y|ies)|tools|tech stack|competenc(y|ies)|expertise'),
+    ('experience', r'experience|employment( history)?|work history|career history|professional background'),
+    ('education', r'education|academics?( background)?|degrees?|certifications?|training'),
+    ('projects', r'projects|publications|portfolio'),
+    ('summary', r'summary|profile|objective|about me'),
+    ('benefits', r'benefits|perks|what we offer|compensation|salary|pay( range)?'),
+    ('legal', r'equal (employment )?opportunity( employer)?|eeo( statement)?|diversity|inclusion|legal( notice)?|'
+              r'disclaimer|privacy( notice| policy)?|(reasonable )?accommodations?|how to apply|'
+              r'application process|references'),
+    ('company', r'about .+|who we are|culture|mission|values|team|company( overview)?'),
+)
+_HEADING_QUALIFIER = (
+    r'key|core|main|primary|essential|general|additional|other|your|our|the|job|position|technical|'
+    r'professional|work|relevant|required|minimum|basic|preferred|desired|bonus|soft|selected|recent|'
+    r'employee|company|career'
+)
+_SECTION_KINDS = tuple(
+    (kind, re.compile(rf'(?:(?:{_HEADING_QUALIFIER})\s+)*(?:{topics})', re.IGNORECASE))
+    for kind, topics in _SECTION_TOPICS
+)
+# 'Skills & Tools', 'Requirements and Qualifications', 'What You'll Do at Acme'
+_HEADING_SPLIT_RE = re.compile(r'\s*(?:,|&|/|\+|\band\b|\bor\b)\s*', re.IGNORECASE)
+_HEADING_AT_RE = re.compile(r'\s+at\s+\S.*$', re.IGNORECASE)
+# Entries under these sections, such as one heading per job held, stay in the section
+_NESTING_KINDS = frozenset(('experience', 'education', 'projects'))
+# Job description sections left out of the prompt
+_OMITTED_JOB_KINDS = frozenset(('benefits', 'legal'))
+
+_BULLET_RE = re.compile(r'^\s*(?:[\-*•·–▪◦]|\d{1,2}[.)])\s+')
+_LABEL_RE = re.compile(r'^\s*(job title|title|position|role|company|employer|organi[sz]ation)\s*:\s*(.+)$',
+                       re.IGNORECASE)
+_AT_COMPANY_RE = re.compile(r'\bat ([A-Z][\w&.\-]*(?: (?:[A-Z][\w&.\-]*|&|of))*)')
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_DATE_RE = re.compile(
+    rf'\b(?:{_MONTH}\s+)?(?:19|20)\d{{2}}(?:\s*(?:-|–|—|to)\s*(?:(?:{_MONTH}\s+)?(?:19|20)\d{{2}}|present|current|now))?',
+    re.IGNORECASE
+)
+_ENTRY_SPLIT_RE = re.compile(r',|\s+at\s+|\s+[-–|@]\s+')
+_SKILL_SPLIT_RE = re.compile(r'\s*(?:[,;|/•·]|\band\b)\s*')
+_TECH_TERM_RE = re.compile(
+    r'\b(?:[A-Z][a-z]+[A-Z]\w*|[A-Z]{2,}s?|\w+(?:\+\+|#)|\w+\.(?:js|net|io)|'
+    r'(?i:python|java|golang|rust|ruby|php|swift|kotlin|scala|typescript|javascript|sql|postgres(?:ql)?|mysql|'
+    r'mongodb|redis|kafka|spark|hadoop|airflow|docker|kubernetes|terraform|ansible|linux|aws|azure|gcp|'
+    r'react|angular|vue|django|flask|fastapi|spring|rails|node|graphql|rest|grpc|git|excel|tableau|'
+    r'figma|salesforce|jira|agile|scrum|machine learning|deep learning|pytorch|tensorflow|pandas|numpy))\b'
+)
+
+
+def document_hash(text):
+    """SHA-256 of the normalized text, the key a parse is cached under"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def _topic_kind(topic):
+    for kind, pattern in _SECTION_KINDS:
+        if pattern.fullmatch(topic):
+            return kind
+    return None
+
+
+def _heading_kind(heading):
+    """Kind of a heading made only of section topics, from its first topic; None otherwise"""
+    name = _HEADING_AT_RE.sub('', heading.strip().rstrip(':').strip())
+    kinds = [_topic_kind(topic) for topic in _HEADING_SPLIT_RE.split(name)]
+    if not kinds or None in kinds:
+        return None
+    return kinds[0]
+
+
+def _section_kind(heading, previous_kind):
+    kind = _heading_kind(heading) if heading else None
+    if kind:
+        return kind
+    if previous_kind in _NESTING_KINDS:
+        return previous_kind
+    return 'other'
+
+
+def _items(lines):
+    """Bullet items of a section, or its short lines when it has no bullets"""
+    bullets = [_BULLET_RE.sub('', line).strip() for line in lines if _BULLET_RE.match(line)]
+    if bullets:
+        return bullets
+    return [line.strip() for line in lines if line.strip() and len(line.split()) <= 12]
+
+
+def _skills(sections, text):
+    """Skills listed in skills sections, else technical terms found anywhere"""
+    skills = []
+    for section in sections:
+        if section['kind'] == 'skills':
+            for item in section['items']:
+                # 'Languages: Python, Go' lists its skills after the label
+                item = item.split(':', 1)[-1]
+                skills += [skill.strip(' .') for skill in _SKILL_SPLIT_RE.split(item) if 1 < len(skill.strip(' .')) <= 40]
+    if not skills:
+        skills = [match.group(0) for match in _TECH_TERM_RE.finditer(text)]
+    seen = set()
+    unique = []
+    for skill in skills:
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            unique.append(skill)
+    return unique
+
+
+def _split_entry(heading):
+    """``(role, organization)`` from an entry heading like 'Senior Engineer, Globex (2020 - Present)'"""
+    heading = _DATE_RE.sub('', re.sub(r'\([^)]*\)', '', heading))
+    parts = [part.strip(' -–|') for part in _ENTRY_SPLIT_RE.split(heading) if part.strip(' -–|')]
+    if not parts:
+        return None, None
+    return parts[0], (parts[1] if len(parts) > 1 else None)
+
+
+def _role_and_company(sections, lines):
+    """The role and company a job description is for, or a resume's most recent ones"""
+    role = company = None
+    for line in lines[:40]:
+        match = _LABEL_RE.match(line)
+        if match:
+            label, value = match.group(1).lower(), match.group(2).strip()
+            if label in ('company', 'employer', 'organization', 'organisation'):
+                company = company or value
+            else:
+                role = role or value
+    for section in sections:
+        # The first entry under a resume's experience heading is the current job
+        if section['kind'] == 'experience' and section['heading'] and _heading_kind(section['heading']) != 'experience':
+            entry_role, entry_company = _split_entry(section['heading'])
+            return role or entry_role, company or entry_company
+    first = next((line.strip() for line in lines if line.strip()), '')
+    if role is None and first and len(first.split()) <= 8 and first[-1] not in '.!?':
+        role = first.rstrip(':')
+    if company is None:
+        for section in sections:
+            heading = section['heading'] or ''
+            if section['kind'] == 'company' and re.match(r'^about\s+(?!us\b|the\b|you\b)', heading, re.IGNORECASE):
+                company = heading.split(None, 1)[1].rstrip(':').strip()
+                break
+    if company is None:
+        # Line by line, so a name at the end of a line does not run into the next
+        match = next(filter(None, (_AT_COMPANY_RE.search(line) for line in lines[:10])), None)
+        if match:
+            company = match.group(1).rstrip('.')
+    return role, company
+
+
+def _parse(text):
+    lines = text.splitlines()
+    sections = []
+    previous_kind = None
+    for heading, section_lines in split_sections(text):
+        kind = _section_kind(heading, previous_kind)
+        body = section_lines[1:] if heading else section_lines
+        sections.append({
+            'heading': heading.rstrip(':') if heading else None,
+            'kind': kind,
+            'text': '\n'.join(body).strip(),
+            'items': _items(body),
+        })
+        previous_kind = kind
+
+    def items_of(kind):
+        return [item for section in sections if section['kind'] == kind for item in section['items']]
+
+    role, company = _role_and_company(sections, lines)
+    return {
+        'sections': sections,
+        'skills': _skills(sections, text),
+        'dates': [match.group(0) for match in _DATE_RE.finditer(text)],
+        'requirements': items_of('requirements'),
+        'responsibilities': items_of('responsibilities'),
+        'company': company,
+        'role': role,
+    }
+
+
+def parse_document(text):
+    """Return the structured record for text, parsing it only on a cache miss.
+
+    The record holds ``sections`` (each with ``heading``, ``kind``, ``text``
+    and ``items``), ``skills``, ``dates``, ``requirements``,
+    ``responsibilities``, ``company`` and ``role``; company and role are
+    None when the text does not name them. Records are shared between
+    callers and must not be modified.
+    """
+    record, _ = parse_cache.get_or_generate(document_hash(text), lambda: _parse(text))
+    return record
+
+
+def _line_key(line):
+    return ' '.join(_BULLET_RE.sub('', line).lower().split())
+
+
+def structure_job_description(text):
+    """Compact prompt text for a job description, built from its parse"""
+    record = parse_document(text)
+    parts = []
+    header = []
+    if record['role']:
+        header.append(f"Role: {record['role']}")
+    if record['company']:
+        header.append(f"Company: {record['company']}")
+    if header:
+        parts.append('\n'.join(header))
+
+    # One block per kind, in order of first appearance, so a heading repeated
+    # on every page of the posting is sent once. A page header or footer that
+    # split_sections took for a heading continues the section before it. The
+    # first section, the title and opening lines, is always kept whole.
+    blocks = {}
+    seen = {_line_key(record['role'])} if record['role'] else set()
+    previous = None
+    for index, section in enumerate(record['sections']):
+        heading, kind = section['heading'], section['kind']
+        repeated = kind == 'other' and heading is not None and _line_key(heading) in seen
+        if heading:
+            seen.add(_line_key(heading))
+        if repeated and previous is not None:
+            block = previous
+        elif index and (kind in _OMITTED_JOB_KINDS or (repeated and previous is None)):
+            previous = None
+            continue
+        else:
+            key = kind if kind != 'other' and index else ('other', index)
+            block = blocks.get(key)
+            if block is None:
+                block = blocks[key] = {'heading': None if repeated else heading, 'lines': []}
+        previous = block
+
+        if kind == 'company' and index:
+            if block['lines']:
+                continue
+            body = truncate_to_tokens(section['text'].split('\n\n')[0], COMPANY_SUMMARY_TOKENS)
+        else:
+            body = section['text']
+        for line in body.splitlines():
+            key_line = _line_key(line)
+            if key_line and key_line in seen:
+                continue
+            seen.add(key_line)
+            if key_line or (block['lines'] and block['lines'][-1]):
+                block['lines'].append(line.rstrip())
+
+    for block in blocks.values():
+        body = '\n'.join(block['lines']).strip()
+        if body:
+            parts.append(f"{block['heading']}:\n{body}" if block['heading'] else body)
+    return '\n\n'.join(parts) if parts else text
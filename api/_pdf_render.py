@@ -0,0 +1,139 @@
+"""
+PDF rendering for document downloads
+
+Paragraph styles are built once per layout and TrueType fonts are registered
+once per process. Text is escaped for ReportLab's paragraph markup, so lines
+containing "&" or "<" render as written instead of failing to parse.
+
+ReportLab is imported on first render rather than at module load, so
+endpoints that only validate options or serve other formats never pay for it.
+"""
+
+import io
+import os
+import threading
+from xml.sax.saxutils import escape
+
+# Configuration
+PDF_FONT_PATH = os.getenv('PDF_FONT_PATH', '/usr/share/fonts/truetype/crosextra')  # os.pathsep separated
+
+DEFAULT_LAYOUT = 'classic'
+DEFAULT_PAGE_SIZE = 'letter'
+
+# Width and height in points, as reportlab.lib.pagesizes defines them
+PAGE_SIZES = {'letter': (612.0, 792.0), 'a4': (595.2755905511812, 841.8897637795277)}
+
+# TrueType fonts a layout may ask for, by file name on PDF_FONT_PATH
+TRUETYPE_FONTS = {
+    'Carlito': 'Carlito-Regular.ttf',  # Metric-compatible with Calibri
+}
+
+# name -> fonts (first one available wins), size and leading (pt),
+# margin (pt) and space after each paragraph (pt)
+PDF_LAYOUTS = {
+    'classic': {'fonts': ('Helvetica',), 'size': 11, 'leading': 14, 'margin': 72, 'space_after': 12},
+    'modern': {'fonts': ('Carlito', 'Helvetica'), 'size': 11, 'leading': 15, 'margin': 65, 'space_after': 8},
+    'compact': {'fonts': ('Helvetica',), 'size': 10, 'leading': 12, 'margin': 43, 'space_after': 6},
+}
+
+BLANK_LINE_HEIGHT = 0.2 * 72  # 0.2 inch in points
+
+_fonts = {}
+_styles = {}
+_lock = threading.Lock()
+
+
+def _find_font_file(filename):
+    for directory in PDF_FONT_PATH.split(os.pathsep):
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def register_font(name):
+    """Make font name available to ReportLab, returning False if it cannot be.
+
+    The 14 standard PDF fonts need no registration; TrueType fonts are
+    loaded from PDF_FONT_PATH on first use and remembered for the process.
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if name in pdfmetrics.standardFonts:
+        return True
+    if name not in _fonts:
+        with _lock:
+            if name not in _fonts:
+                path = _find_font_file(TRUETYPE_FONTS.get(name, name + '.ttf'))
+                if path is not None:
+                    pdfmetrics.registerFont(TTFont(name, path))
+                _fonts[name] = path is not None
+    return _fonts[name]
+
+
+def get_paragraph_style(name=DEFAULT_LAYOUT):
+    """Return the cached body ParagraphStyle for layout name"""
+    if name not in PDF_LAYOUTS:
+        raise ValueError(f"Unknown layout: {name}")
+    style = _styles.get(name)
+    if style is None:
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+        layout = PDF_LAYOUTS[name]
+        font = next((font for font in layout['fonts'] if register_font(font)), 'Helvetica')
+        style = ParagraphStyle(
+            f'Body-{name}',
+            parent=getSampleStyleSheet()['Normal'],
+            fontName=font,
+            fontSize=layout['size'],
+            leading=layout['leading'],
+            spaceAfter=layout['space_after']
+        )
+        _styles[name] = style
+    return style
+
+
+def build_story(text, style):
+    """Turn text into flowables in one pass: a Paragraph per line, a Spacer per run of blank lines.
+
+    Lines are kept as separate single-fragment Paragraphs because ReportLab
+    breaks those on its fast path; joining a block with <br/> measured slower.
+    """
+    from reportlab.platypus import Paragraph, Spacer
+
+    story = []
+    blank_lines = 0
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            blank_lines += 1
+            continue
+        if blank_lines:
+            story.append(Spacer(1, BLANK_LINE_HEIGHT * blank_lines))
+            blank_lines = 0
+        story.append(Paragraph(escape(line), style))
+    return story
+
+
+def render_pdf(text, layout=DEFAULT_LAYOUT, page_size=DEFAULT_PAGE_SIZE):
+    """Render text into a PDF with a named layout on letter or A4 paper"""
+    if page_size not in PAGE_SIZES:
+        raise ValueError(f"Unknown page size: {page_size}")
+    from reportlab.platypus import SimpleDocTemplate
+
+    style = get_paragraph_style(layout)
+    margin = PDF_LAYOUTS[layout]['margin']
+
+    pdf_bytes = io.BytesIO()
+    doc = SimpleDocTemplate(
+        pdf_bytes,
+        pagesize=PAGE_SIZES[page_size],
+        rightMargin=margin,
+        leftMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin
+    )
+    doc.build(build_story(text, style))
+    pdf_bytes.seek(0)
+    return pdf_bytes
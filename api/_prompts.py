@@ -0,0 +1,113 @@
+"""
+Prompt templates for document generation
+
+Every prompt is split into a stable prefix (instructions and the example
+document) and a per-request tail (the job description), so providers can
+cache the prefix across jobs. The offline fallbacks used when no provider
+is configured come from _fallback.
+"""
+
+try:
+    from ._fallback import cover_letter_fallback, resume_fallback
+except ImportError:
+    from _fallback import cover_letter_fallback, resume_fallback
+
+# Bump whenever the prompt text changes so cached generations are not reused
+PROMPT_TEMPLATE_VERSION = '2'
+
+
+def build_cover_letter_prompt(example_cover_letter, job_description):
+    """Build the prompt for adapting a cover letter.
+
+    Returns ``(prefix, request)``. The prefix holds the instructions and the
+    example and is identical for every job, so providers can cache it; only
+    the request carries the job description.
+    """
+    prefix = f"""You are a professional career advisor. You need to adapt an existing cover letter for a new job opportunity.
+
+When given a new job description, create a new cover letter for the new job that:
+1. Maintains the tone and style of the example cover letter
+2. Highlights relevant skills and experiences that match the new job requirements
+3. Customizes the content to address the specific role and company
+4. Keeps the same general structure and format
+5. Is professional, compelling, and tailored to the new position
+
+Please output ONLY the new cover letter text, without any preamble or explanation.
+
+EXAMPLE COVER LETTER:
+{example_cover_letter}"""
+
+    request = f"""NEW JOB DESCRIPTION:
+{job_description}
+
+Please create the new cover letter for this job."""
+
+    return prefix, request
+
+
+def build_resume_prompt(example_resume, job_description):
+    """Build the prompt for adapting a resume as ``(prefix, request)``"""
+    prefix = f"""You are a professional career advisor. You need to adapt an existing resume for a new job opportunity.
+
+When given a new job description, create a new resume for the new job that:
+1. Maintains the same professional format and structure
+2. Highlights relevant skills and experiences that match the job requirements
+3. Reorders or emphasizes experiences that are most relevant to this position
+4. Customizes the professional summary or objective to address the specific role
+5. Includes relevant keywords from the job description
+6. Keeps all information truthful and accurate (no fabrication)
+
+Please output ONLY the new resume text, without any preamble or explanation.
+
+EXAMPLE RESUME:
+{example_resume}"""
+
+    request = f"""NEW JOB DESCRIPTION:
+{job_description}
+
+Please create the new resume for this job."""
+
+    return prefix, request
+
+
+def build_refine_prompt(document_name, numbered_draft, instruction, job_description=''):
+    """Build the prompt for editing a finished draft as ``(prefix, request)``.
+
+    The draft is given with numbered paragraphs and the model answers only
+    with the paragraphs it changes, in the patch format _refine parses.
+    """
+    prefix = f"""You are a professional career advisor. You are editing a {document_name} that is already written.
+
+The current {document_name} is below, split into numbered paragraphs. Change only what the request calls for and leave every other paragraph exactly as it is.
+
+Reply ONLY with the edits, one block per edit, using the paragraph numbers of the current text:
+@@ replace N
+<new text of paragraph N>
+@@ insert after N
+<new paragraph to add after paragraph N; use 0 to add it at the start>
+@@ delete N
+
+Do not repeat unchanged paragraphs. If nothing needs to change, reply with the single line: @@ none
+
+CURRENT {document_name.upper()}:
+{numbered_draft}"""
+
+    parts = []
+    if instruction:
+        parts.append(f"REQUESTED CHANGE:\n{instruction}")
+    if job_description:
+        parts.append(f"UPDATED JOB DESCRIPTION (tailor the {document_name} to this job):\n{job_description}")
+    parts.append("Please reply with the edit blocks.")
+    return prefix, '\n\n'.join(parts)
+
+
+COVER_LETTER_SYSTEM_PROMPT = "You are a professional career advisor helping to write cover letters."
+RESUME_SYSTEM_PROMPT = "You are a professional career advisor helping to tailor resumes."
+
+REFINE_SYSTEM_PROMPT = "You are a professional career advisor making targeted edits to a finished document."
+
+# kind -> (prompt builder, system prompt, offline fallback)
+DOCUMENTS = {
+    'cover_letter': (build_cover_letter_prompt, COVER_LETTER_SYSTEM_PROMPT, cover_letter_fallback),
+    'resume': (build_resume_prompt, RESUME_SYSTEM_PROMPT, resume_fallback),
+}
@@ -0,0 +1,175 @@
+"""
+AI provider layer
+
+Builds provider requests from a ``(prefix, request)`` prompt, calls Anthropic
+or OpenAI through the shared clients (or an offline fake provider) and
+normalizes token usage. The model for each provider is configured in one
+place for the server and the serverless functions.
+"""
+
+import os
+
+try:
+    from ._clients import RequestCancelled, get_client
+    from ._fake_provider import get_fake_provider
+except ImportError:
+    from _clients import RequestCancelled, get_client
+    from _fake_provider import get_fake_provider
+
+# Configuration
+AI_PROVIDER = os.getenv('AI_PROVIDER', 'anthropic')  # 'anthropic', 'openai' or 'fake'
+ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+ANTHROPIC_MODEL = os.getenv('ANTHROPIC_MODEL', 'claude-3-haiku-20240307')
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+MAX_OUTPUT_TOKENS = 2000
+
+
+def configured_model(ai_provider):
+    """Return the model used for ai_provider, or None if it has no API key"""
+    fake = get_fake_provider(ai_provider)
+    if fake is not None:
+        return fake.model
+    if ai_provider == 'anthropic' and ANTHROPIC_API_KEY:
+        return ANTHROPIC_MODEL
+    if ai_provider == 'openai' and OPENAI_API_KEY:
+        return OPENAI_MODEL
+    return None
+
+
+def _anthropic_request(prompt):
+    """Message layout with the stable prefix marked for prompt caching"""
+    prefix, request = prompt
+    return {
+        'model': ANTHROPIC_MODEL,
+        'max_tokens': MAX_OUTPUT_TOKENS,
+        'system': [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+        ],
+        'messages': [
+            {"role": "user", "content": request}
+        ],
+    }
+
+
+def _openai_request(prompt, system_prompt):
+    """Message layout with the stable prefix first, for automatic prompt caching"""
+    prefix, request = prompt
+    return {
+        'model': OPENAI_MODEL,
+        'max_tokens': MAX_OUTPUT_TOKENS,
+        'messages': [
+            {"role": "system", "content": f"{system_prompt}\n\n{prefix}"},
+            {"role": "user", "content": request}
+        ],
+    }
+
+
+def _anthropic_usage(usage):
+    return {
+        'input_tokens': usage.input_tokens,
+        'output_tokens': usage.output_tokens,
+        'cached_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+        'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+    }
+
+
+def _openai_usage(usage):
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'input_tokens': usage.prompt_tokens,
+        'output_tokens': usage.completion_tokens,
+        'cached_input_tokens': getattr(details, 'cached_tokens', 0) or 0,
+        'cache_write_tokens': 0,
+    }
+
+
+def _anthropic_cancellable(client, prompt, cancelled):
+    """Complete over a stream so the request can be dropped once cancelled is set"""
+    with client.beta.prompt_caching.messages.stream(**_anthropic_request(prompt)) as stream:
+        for _ in stream:
+            if cancelled.is_set():
+                raise RequestCancelled('anthropic request cancelled')
+        message = stream.get_final_message()
+    return message.content[0].text, _anthropic_usage(message.usage)
+
+
+def _openai_cancellable(client, prompt, system_prompt, cancelled):
+    """Complete over a stream so the request can be dropped once cancelled is set"""
+    response = client.chat.completions.create(
+        **_openai_request(prompt, system_prompt),
+        stream=True,
+        stream_options={'include_usage': True}
+    )
+    parts = []
+    usage = {}
+    try:
+        for chunk in response:
+            if cancelled.is_set():
+                raise RequestCancelled('openai request cancelled')
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            if chunk.usage:
+                usage = _openai_usage(chunk.usage)
+    finally:
+        response.close()
+    return ''.join(parts), usage
+
+
+def complete_with_ai(prompt, system_prompt, ai_provider='anthropic', cancelled=None):
+    """Return ``(text, usage)`` for a ``(prefix, request)`` prompt.
+
+    usage reports input, output and cached prompt token counts. When a
+    threading.Event is passed as cancelled, the reply is read as a stream
+    and the call raises RequestCancelled at the next chunk after the event
+    is set, closing the connection instead of waiting for the full reply.
+    """
+    fake = get_fake_provider(ai_provider)
+    if fake is not None:
+        return fake.complete(prompt, system_prompt, cancelled)
+
+    client = get_client(ai_provider)
+    if ai_provider == 'anthropic' and client:
+        if cancelled is not None:
+            return _anthropic_cancellable(client, prompt, cancelled)
+        message = client.beta.prompt_caching.messages.create(**_anthropic_request(prompt))
+        return message.content[0].text, _anthropic_usage(message.usage)
+
+    elif ai_provider == 'openai' and client:
+        if cancelled is not None:
+            return _openai_cancellable(client, prompt, system_prompt, cancelled)
+        response = client.chat.completions.create(**_openai_request(prompt, system_prompt))
+        return response.choices[0].message.content, _openai_usage(response.usage)
+
+    else:
+        raise Exception(f"AI provider not configured: {ai_provider}")
+
+
+def stream_ai_completion(prompt, system_prompt, ai_provider='anthropic'):
+    """Yield completion text chunks from the configured provider as they arrive"""
+    fake = get_fake_provider(ai_provider)
+    if fake is not None:
+        yield from fake.stream(prompt, system_prompt)
+        return
+
+    client = get_client(ai_provider)
+    if ai_provider == 'anthropic' and client:
+        with client.beta.prompt_caching.messages.stream(**_anthropic_request(prompt)) as stream:
+            for text in stream.text_stream:
+                yield text
+
+    elif ai_provider == 'openai' and client:
+        response = client.chat.completions.create(
+            **_openai_request(prompt, system_prompt),
+            stream=True
+        )
+        # Closing the generator early (client gone) must close the HTTP stream too
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+    else:
+        raise Exception(f"AI provider not configured: {ai_provider}")
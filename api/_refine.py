@@ -0,0 +1,100 @@
+"""
+Paragraph patches for refining a finished draft
+
+The refine prompt shows the model the draft with numbered paragraphs and
+asks only for the paragraphs it changes:
+
+    @@ replace 2
+    New text of the second paragraph.
+    @@ insert after 3
+    A paragraph added after the third.
+    @@ delete 4
+
+Numbers always refer to the draft as sent, so blocks can be applied in any
+order. The document is rebuilt locally from the draft and the patch.
+"""
+
+import re
+
+_BLOCK_RE = re.compile(r'^@@\s*(replace|insert after|delete|none)\s*(\d+)?\s*$', re.IGNORECASE)
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+
+class PatchError(ValueError):
+    """A reply that cannot be applied as a paragraph patch"""
+
+
+def split_paragraphs(text):
+    """Split text into paragraphs at blank lines"""
+    return [paragraph.strip() for paragraph in _PARAGRAPH_BREAK_RE.split(text.strip()) if paragraph.strip()]
+
+
+def number_paragraphs(paragraphs):
+    """Render paragraphs as ``[1] ...`` blocks for the refine prompt"""
+    return '\n\n'.join(f'[{number}] {paragraph}' for number, paragraph in enumerate(paragraphs, start=1))
+
+
+def parse_patch(reply):
+    """Parse a reply into ``(operation, number, text)`` edits.
+
+    Text before the first edit block, such as 'Here are the edits:', is
+    ignored. Returns None when the reply holds no ``@@`` lines at all,
+    which callers treat as a complete rewritten document. Raises PatchError
+    for blocks that are malformed and for ``@@`` lines that are not edit
+    blocks.
+    """
+    edits = []
+    current = None
+    saw_block = False
+    for line in reply.strip().splitlines():
+        match = _BLOCK_RE.match(line.strip())
+        if match:
+            saw_block = True
+            operation = match.group(1).lower()
+            if operation == 'none':
+                current = None
+                continue
+            if match.group(2) is None:
+                raise PatchError(f'Edit block without a paragraph number: {line.strip()}')
+            current = [operation, int(match.group(2)), []]
+            edits.append(current)
+        elif line.lstrip().startswith('@@'):
+            raise PatchError(f'Unknown edit block: {line.strip()}')
+        elif current is not None:
+            current[2].append(line)
+    if not saw_block:
+        return None
+    return [(operation, number, '\n'.join(lines).strip()) for operation, number, lines in edits]
+
+
+def apply_patch(paragraphs, edits):
+    """Rebuild the document from its paragraphs and parsed edits.
+
+    Returns ``(text, changed)`` where changed lists the numbers of the
+    draft paragraphs that were replaced, deleted or followed by an
+    insertion (0 for an insertion at the start).
+    """
+    replaced = {}
+    deleted = set()
+    inserted = {}
+    for operation, number, text in edits:
+        low = 0 if operation == 'insert after' else 1
+        if not low <= number <= len(paragraphs):
+            raise PatchError(f'Edit refers to paragraph {number}, but the draft has {len(paragraphs)}')
+        if operation == 'replace':
+            if not text:
+                raise PatchError(f'Replacement for paragraph {number} is empty')
+            replaced[number] = text
+        elif operation == 'delete':
+            deleted.add(number)
+        elif text:
+            inserted.setdefault(number, []).append(text)
+
+    result = list(inserted.get(0, []))
+    for number, paragraph in enumerate(paragraphs, start=1):
+        if number not in deleted:
+            result.append(replaced.get(number, paragraph))
+        result.extend(inserted.get(number, []))
+
+    changed = sorted(set(replaced) | deleted | set(inserted))
+    return '\n\n'.join(result), changed
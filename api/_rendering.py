@@ -0,0 +1,154 @@
+"""
+Rendering of generated text into downloadable files
+
+One entry point for TXT, DOCX and PDF output, used by the download endpoints
+and the background job workers. Rendered files are cached by a hash of the
+text and the options that shape the output, so downloading the same letter
+again, or in a format render_all already produced, costs no new render.
+"""
+
+import hashlib
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from ._cache import MemoryCache
+    from ._docx_templates import DEFAULT_TEMPLATE, DOCX_TEMPLATES, render_docx
+    from ._metrics import record_payload, span
+    from ._pdf_render import DEFAULT_PAGE_SIZE, PAGE_SIZES, render_pdf
+except ImportError:
+    from _cache import MemoryCache
+    from _docx_templates import DEFAULT_TEMPLATE, DOCX_TEMPLATES, render_docx
+    from _metrics import record_payload, span
+    from _pdf_render import DEFAULT_PAGE_SIZE, PAGE_SIZES, render_pdf
+
+# Configuration
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '128'))  # Rendered files kept per process
+RENDER_CACHE_TTL = int(os.getenv('RENDER_CACHE_TTL', '3600'))
+
+MIMETYPES = {
+    'txt': 'text/plain',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+}
+
+TEMPLATES = DOCX_TEMPLATES  # The PDF layouts use the same names
+
+render_cache = MemoryCache(max_entries=RENDER_CACHE_SIZE, ttl=RENDER_CACHE_TTL)
+
+_UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def generate_docx(text, template=DEFAULT_TEMPLATE):
+    """Generate DOCX document from text using a named template"""
+    return render_docx(text, template)
+
+
+def generate_pdf(text, template=DEFAULT_TEMPLATE, page_size=DEFAULT_PAGE_SIZE):
+    """Generate PDF document from text using a named layout"""
+    return render_pdf(text, template, page_size)
+
+
+def validate_render_options(template, page_size):
+    """Return an error message for an unknown template or page size, else None"""
+    if template not in TEMPLATES:
+        return f'Unknown template: {template}'
+    if page_size not in PAGE_SIZES:
+        return f'Unknown page size: {page_size}'
+    return None
+
+
+def render_id(text, file_format, template=DEFAULT_TEMPLATE, page_size=DEFAULT_PAGE_SIZE):
+    """Content address of one rendered file: SHA-256 of the text and the options that affect it"""
+    if file_format == 'txt':
+        template = page_size = None
+    elif file_format == 'docx':
+        page_size = None  # Word lays DOCX pages out on the reader's paper
+    digest = hashlib.sha256()
+    for option in (file_format, template, page_size):
+        digest.update(f'{option}\0'.encode('utf-8'))
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _render(text, file_format, template, page_size):
+    if file_format == 'txt':
+        return text.encode('utf-8')
+    if file_format == 'docx':
+        return generate_docx(text, template).getvalue()
+    return generate_pdf(text, template, page_size).getvalue()
+
+
+def _cache_key(key, file_format):
+    # The format is part of the cache key so a render is only served under its own format
+    return f'{file_format}/{key}'
+
+
+def render_cached(text, file_format, template=DEFAULT_TEMPLATE, page_size=DEFAULT_PAGE_SIZE):
+    """Render through the cache, returning ``(render_id, data, cache_hit)``"""
+    if file_format not in MIMETYPES:
+        raise ValueError(f'Unsupported format: {file_format}')
+
+    def produce():
+        with span(f'render_{file_format}'):
+            data = _render(text, file_format, template, page_size)
+        record_payload(f'render_{file_format}', len(data))
+        return data
+
+    key = render_id(text, file_format, template, page_size)
+    data, cache_hit = render_cache.get_or_generate(_cache_key(key, file_format), produce)
+    return key, data, cache_hit
+
+
+def render_document(text, file_format, template=DEFAULT_TEMPLATE, page_size=DEFAULT_PAGE_SIZE):
+    """Render text as 'txt', 'docx' or 'pdf' bytes"""
+    return render_cached(text, file_format, template, page_size)[1]
+
+
+def render_all(text, formats=tuple(MIMETYPES), template=DEFAULT_TEMPLATE, page_size=DEFAULT_PAGE_SIZE):
+    """Render text in several formats at once.
+
+    Returns a dict of format to ``(render_id, data, cache_hit)``. Formats that
+    are not cached yet are rendered on their own threads.
+    """
+    for file_format in formats:
+        if file_format not in MIMETYPES:
+            raise ValueError(f'Unsupported format: {file_format}')
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = {
+            file_format: executor.submit(render_cached, text, file_format, template, page_size)
+            for file_format in formats
+        }
+        return {file_format: future.result() for file_format, future in futures.items()}
+
+
+def get_rendered(key, file_format):
+    """Return the cached bytes for a render_id in file_format, or None when not cached in that format"""
+    entry = render_cache.get(_cache_key(key, file_format))
+    return entry['value'] if entry else None
+
+
+def download_basename(name, default='cover_letter'):
+    """A user-supplied file name made safe for Content-Disposition and ZIP entries.
+
+    Anything but ASCII letters, digits, '.', '_' and '-' becomes '_', so no
+    quote, line break, path separator or non-latin-1 character gets through.
+    """
+    basename = _UNSAFE_NAME_RE.sub('_', str(name or ''))[:100].strip('.')
+    return basename or default
+
+
+def build_zip(files, basename):
+    """Pack ``{format: data}`` into a ZIP with one basename.<format> entry each.
+
+    DOCX and PDF are compressed already, so only text is deflated.
+    """
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for file_format, data in files.items():
+            compression = zipfile.ZIP_DEFLATED if file_format == 'txt' else zipfile.ZIP_STORED
+            zf.writestr(f'{basename}.{file_format}', data, compress_type=compression)
+    return archive.getvalue()
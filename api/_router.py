@@ -0,0 +1,454 @@
+"""
+Latency-aware routing across AI providers
+
+Every call is recorded against its provider/model in a rolling window of
+latencies and outcomes. A request goes to the requested provider first and
+fails over to the next configured one on timeouts, connection failures and
+5xx responses; a provider whose recent error rate is too high is tried last
+until it has gone a cooldown period without failing. With hedging on, a
+completion that runs past the provider's p95 latency gets a second request
+to the next provider, and whichever loses is cancelled. Every call first
+passes its provider/model's limiter (see _limits); the last provider left
+is retried with backoff.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    from ._clients import RequestCancelled
+    from ._limits import (
+        LLM_RETRIES,
+        Overloaded,
+        backoff_delay,
+        estimate_call_tokens,
+        get_limiter,
+        is_rate_limited,
+        retry_after_seconds
+    )
+    from ._metrics import record_tokens
+    from ._providers import complete_with_ai, configured_model, stream_ai_completion
+except ImportError:
+    from _clients import RequestCancelled
+    from _limits import (
+        LLM_RETRIES,
+        Overloaded,
+        backoff_delay,
+        estimate_call_tokens,
+        get_limiter,
+        is_rate_limited,
+        retry_after_seconds
+    )
+    from _metrics import record_tokens
+    from _providers import complete_with_ai, configured_model, stream_ai_completion
+
+# Configuration
+AI_PROVIDER_ORDER = [  # Failover order after the requested provider
+    name.strip() for name in os.getenv('AI_PROVIDER_ORDER', 'anthropic,openai').split(',') if name.strip()
+]
+AI_FAILOVER = os.getenv('AI_FAILOVER', '1') == '1'
+AI_HEDGE = os.getenv('AI_HEDGE', '0') == '1'
+AI_HEDGE_MIN_SAMPLES = int(os.getenv('AI_HEDGE_MIN_SAMPLES', '20'))  # Latencies needed before hedging
+AI_STATS_WINDOW = int(os.getenv('AI_STATS_WINDOW', '100'))  # Recent calls kept per provider/model
+AI_UNHEALTHY_ERROR_RATE = float(os.getenv('AI_UNHEALTHY_ERROR_RATE', '0.5'))
+AI_UNHEALTHY_COOLDOWN = float(os.getenv('AI_UNHEALTHY_COOLDOWN', '30'))  # Seconds a failing provider is tried last
+AI_HEDGE_WORKERS = 32
+# How often a hedged race checks the caller's cancel event
+CANCEL_POLL_SECONDS = 0.1
+
+_TIMEOUT_ERRORS = {'APITimeoutError', 'TimeoutException'}
+_CONNECTION_ERRORS = {'APIConnectionError', 'TransportError'}
+
+
+def _error_names(error):
+    return {cls.__name__ for cls in type(error).__mro__}
+
+
+def is_timeout(error):
+    """True for a request that timed out, whichever SDK raised it"""
+    return isinstance(error, TimeoutError) or bool(_error_names(error) & _TIMEOUT_ERRORS)
+
+
+def is_retryable(error):
+    """True for timeouts, connection failures, 429s and 5xx responses.
+
+    These are failures of the provider rather than of the request, so another
+    provider may well succeed where this one did not.
+    """
+    if is_timeout(error) or isinstance(error, ConnectionError):
+        return True
+    if _error_names(error) & _CONNECTION_ERRORS:
+        return True
+    status = getattr(error, 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _failed(errors):
+    """The exception to raise once every route has failed.
+
+    When every route was busy (shed locally or answered 429), callers get
+    Overloaded so they can answer 503 with Retry-After.
+    """
+    if errors and all(isinstance(error, Overloaded) or is_rate_limited(error) for _, error in errors):
+        retry_after = max(retry_after_seconds(error) or 1 for _, error in errors)
+        return Overloaded('AI providers are busy; try again shortly', max(1, round(retry_after)))
+    return Exception(f"All AI providers failed: {'; '.join(f'{name}: {error}' for name, error in errors)}")
+
+
+class ProviderStats:
+    """Rolling latency and error record for one provider/model"""
+
+    def __init__(self, window=AI_STATS_WINDOW):
+        self._latencies = deque(maxlen=window)  # Seconds per successful completion
+        self._failures = deque(maxlen=window)  # True for each failed call, False for each success
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.last_failure = None
+
+    def record_success(self, seconds=None):
+        """Record a successful call; seconds is None for streams, whose length varies"""
+        with self._lock:
+            self.requests += 1
+            self._failures.append(False)
+            if seconds is not None:
+                self._latencies.append(seconds)
+
+    def record_failure(self, timeout=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.timeouts += int(timeout)
+            self._failures.append(True)
+            self.last_failure = time.monotonic()
+
+    def record_cancelled(self):
+        with self._lock:
+            self.requests += 1
+            self.cancelled += 1
+
+    def record_hedge(self):
+        with self._lock:
+            self.hedges += 1
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def error_rate(self):
+        with self._lock:
+            return sum(self._failures) / len(self._failures) if self._failures else 0.0
+
+    def unhealthy(self, error_rate, cooldown):
+        """True while the error rate is at least error_rate and the last failure is recent"""
+        return (
+            self.last_failure is not None
+            and time.monotonic() - self.last_failure < cooldown
+            and self.error_rate() >= error_rate
+        )
+
+    def latency(self, fraction, min_samples=1):
+        """Latency percentile in seconds, or None with fewer than min_samples recorded"""
+        with self._lock:
+            if len(self._latencies) < max(1, min_samples):
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def snapshot(self):
+        p50 = self.latency(0.50)
+        p95 = self.latency(0.95)
+        with self._lock:
+            counters = {
+                'requests': self.requests,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'cancelled': self.cancelled,
+            }
+        counters.update({
+            'error_rate': round(self.error_rate(), 3),
+            'p50_ms': None if p50 is None else round(p50 * 1000, 1),
+            'p95_ms': None if p95 is None else round(p95 * 1000, 1),
+        })
+        return counters
+
+
+class ProviderRouter:
+    """Sends completions to the healthiest configured provider, failing over and hedging.
+
+    complete, stream and model_for default to the provider layer and can be
+    replaced, e.g. to route between fake providers offline.
+    """
+
+    def __init__(self, order=None, failover=AI_FAILOVER, hedge=AI_HEDGE,
+                 hedge_min_samples=AI_HEDGE_MIN_SAMPLES, window=AI_STATS_WINDOW,
+                 unhealthy_error_rate=AI_UNHEALTHY_ERROR_RATE, unhealthy_cooldown=AI_UNHEALTHY_COOLDOWN,
+                 complete=complete_with_ai, stream=stream_ai_completion, model_for=configured_model):
+        self.order = list(AI_PROVIDER_ORDER if order is None else order)
+        self.failover = failover
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.unhealthy_cooldown = unhealthy_cooldown
+        self._complete = complete
+        self._stream = stream
+        self._model_for = model_for
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def stats_for(self, provider, model):
+        key = (provider, model)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, ProviderStats(self.window))
+        return stats
+
+    def candidates(self, ai_provider):
+        """Configured (provider, model) routes to try, requested provider first, unhealthy ones last"""
+        names = [ai_provider]
+        if self.failover:
+            names += [name for name in self.order if name != ai_provider]
+        routes = [(name, self._model_for(name)) for name in names]
+        routes = [route for route in routes if route[1] is not None]
+        unhealthy = [
+            route for route in routes
+            if self.stats_for(*route).unhealthy(self.unhealthy_error_rate, self.unhealthy_cooldown)
+        ]
+        return [route for route in routes if route not in unhealthy] + unhealthy
+
+    def _record_error(self, route, limiter, error):
+        """Count a failed call; a 429 pauses the route's limiter instead of marking it unhealthy"""
+        if is_rate_limited(error):
+            limiter.pause(backoff_delay(0, error))
+        elif is_retryable(error):
+            self.stats_for(*route).record_failure(is_timeout(error))
+
+    def _attempt(self, route, prompt, system_prompt, cancelled=None):
+        if cancelled is not None and cancelled.is_set():
+            raise RequestCancelled(f'{route[0]} request cancelled')
+        limiter = get_limiter(*route)
+        reserved = limiter.acquire(estimate_call_tokens(prompt, system_prompt))
+        stats = self.stats_for(*route)
+        started = time.monotonic()
+        usage = None
+        try:
+            text, usage = self._complete(prompt, system_prompt, route[0], cancelled=cancelled)
+        except RequestCancelled:
+            stats.record_cancelled()
+            raise
+        except Exception as e:
+            self._record_error(route, limiter, e)
+            raise
+        finally:
+            limiter.release(reserved, usage)
+        stats.record_success(time.monotonic() - started)
+        record_tokens(route[0], route[1], usage)
+        return text, usage
+
+    def _attempt_with_retries(self, route, prompt, system_prompt, retries, cancelled=None):
+        """_attempt, retried with backoff on provider failures; calls shed locally are not retried"""
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(route, prompt, system_prompt, cancelled)
+            except Overloaded:
+                raise
+            except Exception as e:
+                if attempt >= retries or not is_retryable(e):
+                    raise
+                if not is_rate_limited(e):
+                    # After a 429 the limiter is paused, so acquiring again waits out retry-after
+                    time.sleep(backoff_delay(attempt, e))
+                attempt += 1
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=AI_HEDGE_WORKERS, thread_name_prefix='hedge')
+        return self._executor
+
+    def _hedged(self, primary, backup, delay, prompt, system_prompt, cancelled=None):
+        """Race primary against backup, starting backup after delay or when primary fails.
+
+        Each attempt has its own cancel event, set when it loses. The
+        caller's cancelled event cannot wake wait(), so it is checked every
+        CANCEL_POLL_SECONDS and cancels both attempts once set.
+        """
+        executor = self._get_executor()
+        routes = {}
+        cancels = {}
+
+        def start(route):
+            cancels[route] = cancelled = threading.Event()
+            future = executor.submit(self._attempt, route, prompt, system_prompt, cancelled)
+            routes[future] = route
+            return future
+
+        pending = {start(primary)}
+        hedge_at = time.monotonic() + delay
+        backup_started = False
+        racing = False
+        last_error = None
+        while pending:
+            timeout = None if backup_started else max(0.0, hedge_at - time.monotonic())
+            if cancelled is not None:
+                timeout = CANCEL_POLL_SECONDS if timeout is None else min(timeout, CANCEL_POLL_SECONDS)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled.is_set():
+                for other in pending:
+                    cancels[routes[other]].set()
+                raise RequestCancelled(f'{primary[0]} request cancelled')
+            if not done:
+                if backup_started or time.monotonic() < hedge_at:
+                    continue
+                # Primary is past its p95: hedge with the backup
+                self.stats_for(*primary).record_hedge()
+                pending.add(start(backup))
+                backup_started = racing = True
+                continue
+
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    for loser in pending:
+                        cancels[routes[loser]].set()
+                    if racing:
+                        self.stats_for(*routes[future]).record_hedge_win()
+                    return future.result()
+                if not is_retryable(error):
+                    for other in pending:
+                        cancels[routes[other]].set()
+                    raise error
+                last_error = error
+
+            if not backup_started:
+                # Primary failed before the threshold: fail over at once
+                pending.add(start(backup))
+                backup_started = True
+        raise last_error
+
+    def complete(self, prompt, system_prompt, ai_provider, cancelled=None):
+        """Return ``(text, usage)`` from the first provider that answers, like complete_with_ai.
+
+        Setting the threading.Event passed as cancelled abandons the call
+        with RequestCancelled.
+        """
+        routes = self.candidates(ai_provider)
+        if not routes:
+            raise Exception(f"AI provider not configured: {ai_provider}")
+
+        errors = []
+        index = 0
+        while index < len(routes):
+            route = routes[index]
+            backup = routes[index + 1] if self.hedge and index + 1 < len(routes) else None
+            delay = self.stats_for(*route).latency(0.95, self.hedge_min_samples) if backup else None
+            try:
+                if delay is None:
+                    # Retry only when there is no other provider left to fail over to
+                    retries = LLM_RETRIES if index == len(routes) - 1 else 0
+                    return self._attempt_with_retries(route, prompt, system_prompt, retries, cancelled)
+                return self._hedged(route, backup, delay, prompt, system_prompt, cancelled)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                errors.append((route[0], e))
+            index += 1 if delay is None else 2
+        raise _failed(errors)
+
+    def stream(self, prompt, system_prompt, ai_provider):
+        """Yield text chunks like stream_ai_completion.
+
+        Fails over, or retries the last provider, only until the first chunk
+        arrives; after that the caller has already seen part of the reply
+        and an error is raised as is. Streams are not hedged.
+        """
+        routes = self.candidates(ai_provider)
+        if not routes:
+            raise Exception(f"AI provider not configured: {ai_provider}")
+
+        errors = []
+        for position, route in enumerate(routes):
+            retries = LLM_RETRIES if position == len(routes) - 1 else 0
+            for attempt in range(retries + 1):
+                try:
+                    opened = self._open_stream(route, prompt, system_prompt)
+                except Overloaded as e:
+                    errors.append((route[0], e))
+                    break
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    errors.append((route[0], e))
+                    if attempt < retries and not is_rate_limited(e):
+                        time.sleep(backoff_delay(attempt, e))
+                    continue
+                yield from self._relay(route, *opened)
+                return
+        raise _failed(errors)
+
+    def _open_stream(self, route, prompt, system_prompt):
+        """Start a stream on route and read its first chunk (None for an empty reply).
+
+        Returns ``(limiter, reserved, first, chunks)``; the limiter slot stays
+        held until _relay has drained the stream.
+        """
+        limiter = get_limiter(*route)
+        reserved = limiter.acquire(estimate_call_tokens(prompt, system_prompt))
+        try:
+            chunks = self._stream(prompt, system_prompt, route[0])
+            first = next(chunks, None)
+        except Exception as e:
+            limiter.release(reserved)
+            self._record_error(route, limiter, e)
+            raise
+        return limiter, reserved, first, chunks
+
+    def _relay(self, route, limiter, reserved, first, chunks):
+        try:
+            if first is not None:
+                yield first
+                yield from chunks
+        except Exception as e:
+            self._record_error(route, limiter, e)
+            raise
+        finally:
+            limiter.release(reserved)
+        self.stats_for(*route).record_success()
+
+    def stats(self):
+        """Rolling stats per provider/model, keyed 'provider/model'"""
+        with self._lock:
+            items = list(self._stats.items())
+        return {f'{provider}/{model}': stats.snapshot() for (provider, model), stats in items}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the process-wide router"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ProviderRouter()
+    return _router
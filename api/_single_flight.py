@@ -0,0 +1,250 @@
+"""
+Coalescing of identical in-flight generations
+
+When a user double-clicks Generate or several tabs submit the same inputs,
+the requests share one provider call: the first caller for a key runs it
+and every caller that arrives while it is running waits for its result.
+Threads of one process wait on an event. Worker processes on the same host
+coordinate through a small SQLite table: the leader claims the key with a
+row and writes its result there, and followers in other processes poll for
+it. A claim older than COALESCE_WAIT is treated as abandoned by a worker
+that died, so the next caller takes over. A leader shed by the rate limiter
+gives up its claim instead of recording the error, so followers in other
+processes make their own call and are shed with Overloaded themselves. A
+leader whose caller cancelled its call, such as a batch whose client went
+away, gives up its claim the same way, and every follower makes its own
+call.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    from ._clients import RequestCancelled
+    from ._limits import Overloaded
+except ImportError:
+    from _clients import RequestCancelled
+    from _limits import Overloaded
+
+# Configuration
+COALESCE_MODE = os.getenv('COALESCE_REQUESTS', 'host')  # 'host' (across processes), 'process' or 'off'
+COALESCE_PATH = os.getenv(
+    'COALESCE_PATH',
+    os.path.join(tempfile.gettempdir(), 'cover_letter_flights.sqlite3')
+)
+COALESCE_WAIT = float(os.getenv('COALESCE_WAIT', '120'))  # Seconds a follower waits before running the call itself
+
+# How often followers in other processes check for the leader's result
+POLL_SECONDS = 0.05
+# Finished rows are kept this long for followers that are between polls
+RESULT_KEEP_SECONDS = 60
+
+
+class _Flight:
+    """One call in progress in this process"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run one call per key at a time within this process.
+
+    do() returns ``(value, shared)``; shared is True for callers that got
+    the result of a call another caller made. An exception raised by the
+    call is raised to every caller that shared it.
+    """
+
+    name = 'process'
+
+    def __init__(self, wait=COALESCE_WAIT):
+        self.wait = wait
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._leaders = 0
+        self._shared = 0
+
+    def _count(self, shared):
+        with self._stats_lock:
+            if shared:
+                self._shared += 1
+            else:
+                self._leaders += 1
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self.wait):
+                self._count(True)
+                if isinstance(flight.error, RequestCancelled):
+                    # The leader's caller went away; this caller still wants the result
+                    self._count(False)
+                    return fn(), False
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value, True
+            # The leader is stuck; run the call rather than wait forever
+            self._count(False)
+            return fn(), False
+
+        try:
+            flight.value, shared = self._lead(key, fn)
+            self._count(shared)
+            return flight.value, shared
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _lead(self, key, fn):
+        """Run the call for this process; returns ``(value, shared)``"""
+        return fn(), False
+
+    def stats(self):
+        with self._stats_lock:
+            return {'mode': self.name, 'calls': self._leaders, 'coalesced': self._shared}
+
+
+class HostSingleFlight(SingleFlight):
+    """Single flight across the worker processes of one host.
+
+    The thread that leads for this process then claims the key in the shared
+    SQLite file. Results cross processes as JSON, and an error crosses as its
+    message only; Overloaded does not cross at all, see the module docstring.
+    """
+
+    name = 'host'
+
+    def __init__(self, path=COALESCE_PATH, wait=COALESCE_WAIT):
+        super().__init__(wait)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS flights ('
+                'key TEXT PRIMARY KEY, token TEXT, started REAL, finished REAL, value TEXT, error TEXT)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _claim(self, conn, key, token):
+        """Claim key unless another live call holds it; returns the holder's row or None"""
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT token, started, finished FROM flights WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and row[2] is None and now - row[1] < self.wait:
+                conn.execute('COMMIT')
+                return row
+            conn.execute(
+                'INSERT OR REPLACE INTO flights (key, token, started, finished, value, error) '
+                'VALUES (?, ?, ?, NULL, NULL, NULL)',
+                (key, token, now)
+            )
+            conn.execute('DELETE FROM flights WHERE finished < ?', (now - RESULT_KEEP_SECONDS,))
+            conn.execute('COMMIT')
+            return None
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _follow(self, conn, key, token):
+        """Wait for the call holding key; returns ``(found, value)``"""
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            row = conn.execute(
+                'SELECT token, finished, value, error FROM flights WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[0] != token:
+                break  # The leader gave up its claim; try to claim the key again
+            if row[1] is not None:
+                if row[3] is not None:
+                    raise Exception(row[3])
+                return True, json.loads(row[2])
+        return False, None
+
+    def _lead(self, key, fn):
+        conn = self._connect()
+        try:
+            token = uuid.uuid4().hex
+            while True:
+                holder = self._claim(conn, key, token)
+                if holder is None:
+                    break
+                found, value = self._follow(conn, key, holder[0])
+                if found:
+                    return value, True
+
+            try:
+                value = fn()
+            except (Overloaded, RequestCancelled):
+                conn.execute('DELETE FROM flights WHERE key = ? AND token = ?', (key, token))
+                raise
+            except Exception as e:
+                conn.execute(
+                    'UPDATE flights SET finished = ?, error = ? WHERE key = ? AND token = ?',
+                    (time.time(), str(e) or type(e).__name__, key, token)
+                )
+                raise
+            except BaseException:
+                conn.execute('DELETE FROM flights WHERE key = ? AND token = ?', (key, token))
+                raise
+            conn.execute(
+                'UPDATE flights SET finished = ?, value = ? WHERE key = ? AND token = ?',
+                (time.time(), json.dumps(value), key, token)
+            )
+            return value, False
+        finally:
+            conn.close()
+
+
+class NoSingleFlight(SingleFlight):
+    """Every caller makes its own call"""
+
+    name = 'off'
+
+    def do(self, key, fn):
+        self._count(False)
+        return fn(), False
+
+
+_MODES = {
+    'off': NoSingleFlight,
+    'process': SingleFlight,
+    'host': HostSingleFlight,
+}
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide single flight group, creating it on first use"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                mode = _MODES.get(COALESCE_MODE)
+                if mode is None:
+                    raise Exception(f"Unknown COALESCE_REQUESTS mode: {COALESCE_MODE}")
+                _single_flight = mode()
+    return _single_flight
@@ -0,0 +1,111 @@
+"""
+Streaming helpers for relaying generated text as NDJSON events
+
+Each event is one JSON object per line:
+    {"type": "match", "document": "cover_letter", "score": 72, "matched": [...], "missing": [...]}
+    {"type": "preview", "document": "cover_letter", "text": "..."}
+    {"type": "delta", "document": "cover_letter", "text": "..."}
+    {"type": "done", "document": "cover_letter"}
+    {"type": "error", "document": "cover_letter", "error": "..."}
+"""
+
+import contextvars
+import json
+import queue
+import threading
+from urllib.parse import parse_qs, urlparse
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+_END = object()
+
+
+def ndjson(event):
+    """Encode one event as an NDJSON line"""
+    return (json.dumps(event) + '\n').encode('utf-8')
+
+
+def match_events(matches):
+    """One match event per document, sent ahead of the generated text"""
+    for document, match in matches.items():
+        yield {'type': 'match', 'document': document, **match}
+
+
+def preview_events(previews):
+    """One preview event per document that has an offline draft to show first"""
+    for document, text in previews.items():
+        if text:
+            yield {'type': 'preview', 'document': document, 'text': text}
+
+
+def document_events(document, chunks):
+    """Turn a stream of text chunks into delta/done/error events"""
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield {'type': 'delta', 'document': document, 'text': chunk}
+        yield {'type': 'done', 'document': document}
+    except Exception as e:
+        yield {'type': 'error', 'document': document, 'error': str(e)}
+
+
+def merge_document_streams(streams):
+    """Interleave several document streams, yielding events as they arrive.
+
+    ``streams`` maps document names to chunk iterators. Each iterator is
+    drained on its own thread, in a copy of the caller's context so its
+    spans count toward the request, and a slow provider does not hold back
+    the others. When the consumer stops reading, each thread closes its
+    iterator at the next chunk, which closes the provider's stream.
+    """
+    events = queue.Queue()
+    stopped = threading.Event()
+
+    def drain(document, chunks):
+        try:
+            for event in document_events(document, chunks):
+                if stopped.is_set():
+                    break
+                events.put(event)
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            events.put(_END)
+
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(drain, document, chunks), daemon=True)
+        for document, chunks in streams.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        remaining = len(threads)
+        while remaining:
+            event = events.get()
+            if event is _END:
+                remaining -= 1
+            else:
+                yield event
+    finally:
+        stopped.set()
+
+
+def wants_stream(path):
+    """True when the request path asks for a streamed response (?stream=1)"""
+    query = parse_qs(urlparse(path).query)
+    return query.get('stream', ['0'])[0].lower() in ('1', 'true', 'yes')
+
+
+def send_ndjson_stream(handler, events):
+    """Write events to a BaseHTTPRequestHandler, flushing after each line"""
+    handler.send_response(200)
+    handler.send_header('Content-Type', NDJSON_CONTENT_TYPE)
+    handler.send_header('Cache-Control', 'no-cache')
+    handler.send_header('X-Accel-Buffering', 'no')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    for event in events:
+        handler.wfile.write(ndjson(event))
+        handler.wfile.flush()
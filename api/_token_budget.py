@@ -0,0 +1,276 @@
+"""
+Token budgeting for oversized prompt inputs
+
+Job descriptions pasted from scanned packets repeat page headers, carry
+benefits and equal-opportunity boilerplate and can run to tens of pages.
+fit_prompt estimates token counts locally, drops boilerplate and
+repeated lines, and when the prompt is still over budget keeps the job
+description sections that matter most for the example document. The
+estimate is a heuristic close to the providers' tokenizers for English
+text; no tokenizer or network access is needed.
+"""
+
+import os
+import re
+
+# Configuration
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '8000'))  # Estimated prompt tokens; 0 turns trimming off
+MIN_JOB_DESCRIPTION_TOKENS = int(os.getenv('MIN_JOB_DESCRIPTION_TOKENS', '1500'))  # Kept before the example is cut
+
+_TOKEN_RE = re.compile(r'[A-Za-z]+|\d+|[^\sA-Za-z\d]')
+_TERM_RE = re.compile(r'[a-z][a-z0-9+#]{2,}')
+_BULLET_RE = re.compile(r'^[\-*•·–]\s*')
+
+# Lines that are noise wherever they appear
+_BOILERPLATE_LINE_RE = re.compile(
+    r'equal (employment )?opportunity|\beeo\b|affirmative action|without regard to|'
+    r'protected veteran|sexual orientation|gender identity|reasonable accommodation|'
+    r'e-verify|background check|pay transparency|privacy (policy|notice)|'
+    r'unsolicited (resumes|applications)|recruit(ment|ing) agenc|^page \d+( of \d+)?$',
+    re.IGNORECASE
+)
+# Sections dropped whole, by heading. The whole heading has to be one of
+# these topics, so 'Senior Privacy Engineer' or 'Compensation Analyst' is not
+_BOILERPLATE_TOPIC = (
+    r'(benefits|perks|what we offer|compensation|salary|pay range|equal (employment )?opportunity'
+    r'( employer)?|eeo( statement)?|diversity( (and|&) inclusion)?|legal( notice)?|disclaimer|'
+    r'privacy( (notice|policy))?|(reasonable )?accommodations?|how to apply|application process)'
+)
+_BOILERPLATE_HEADING_RE = re.compile(
+    rf'^((our|the) )?{_BOILERPLATE_TOPIC}(\s*(,|/|&|and)\s*{_BOILERPLATE_TOPIC})*\s*:?$',
+    re.IGNORECASE
+)
+# Sections ranked first when the job description has to be cut
+_CORE_HEADING_RE = re.compile(
+    r'responsibilit|requirement|qualification|skills|experience|what you|you will|'
+    r'the role|must have|nice to have|preferred|duties|about the job|about the position',
+    re.IGNORECASE
+)
+_COMPANY_HEADING_RE = re.compile(r'about (us|the company)|who we are|culture|mission|values', re.IGNORECASE)
+
+_STOPWORDS = frozenset(
+    'the and for with you our are will your that this from have has not all can who their '
+    'was were been into about more other they them what when which while also such than'.split()
+)
+
+
+def estimate_tokens(text):
+    """Estimate the token count of text without a tokenizer.
+
+    Words count one token per four letters, numbers one per three digits
+    and every punctuation mark as one token.
+    """
+    count = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece[0].isalpha():
+            count += (len(piece) + 3) // 4
+        elif piece[0].isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1
+    return count
+
+
+def _normalize_line(line):
+    return ' '.join(_BULLET_RE.sub('', line.strip()).lower().split())
+
+
+def dedupe_lines(text):
+    """Drop repeated non-blank lines and runs of blank lines, keeping first occurrences"""
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = _normalize_line(line)
+        if not key:
+            if kept and kept[-1].strip():
+                kept.append('')
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(line.rstrip())
+    return '\n'.join(kept).strip()
+
+
+def _is_heading(line, previous):
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60 or len(stripped.split()) > 8:
+        return False
+    if _BULLET_RE.match(stripped) or stripped[-1] in '.,;!?':
+        return False
+    return stripped.endswith(':') or stripped.isupper() or not previous.strip()
+
+
+def split_sections(text):
+    """Split text into ``(heading, lines)`` sections at heading-like lines.
+
+    Lines before the first heading form a section with heading None.
+    """
+    sections = [(None, [])]
+    previous = ''
+    for line in text.splitlines():
+        if _is_heading(line, previous):
+            sections.append((line.strip(), [line]))
+        else:
+            sections[-1][1].append(line)
+        previous = line
+    return [section for section in sections if any(line.strip() for line in section[1])]
+
+
+def _join(sections):
+    return '\n\n'.join('\n'.join(lines).strip() for _, lines in sections).strip()
+
+
+def _first_block_end(lines):
+    """Index just past the first run of non-blank lines after the heading line"""
+    seen_content = False
+    for index, line in enumerate(lines[1:], start=1):
+        if line.strip():
+            seen_content = True
+        elif seen_content:
+            return index
+    return len(lines)
+
+
+def remove_boilerplate(text):
+    """Drop boilerplate sections and lines such as benefits, EEO and legal notices.
+
+    The first section, with the title or the structured Role:/Company:
+    header, is never dropped, and its first line is always kept.
+    """
+    sections = []
+    for index, (heading, lines) in enumerate(split_sections(text)):
+        if index == 0:
+            lines = lines[:1] + [line for line in lines[1:] if not _BOILERPLATE_LINE_RE.search(line.strip())]
+            sections.append((heading, lines))
+            continue
+        if heading and _BOILERPLATE_HEADING_RE.match(heading):
+            # Drop the heading and its first block; anything after the next
+            # blank line may be unrelated text that lost its own heading
+            end = _first_block_end(lines)
+            heading, lines = None, lines[end:]
+        lines = [line for line in lines if not _BOILERPLATE_LINE_RE.search(line.strip())]
+        if any(line.strip() for line in lines):
+            sections.append((heading, lines))
+    return _join(sections)
+
+
+def _terms(text):
+    return {term for term in _TERM_RE.findall(text.lower()) if term not in _STOPWORDS}
+
+
+def _section_score(index, heading, lines, reference_terms):
+    """Relevance of one section: a prior from its heading plus its term overlap with the reference"""
+    if index == 0:
+        return 10.0  # The title and opening lines say what the job is
+    if heading and _CORE_HEADING_RE.search(heading):
+        prior = 2.0
+    elif heading and _COMPANY_HEADING_RE.search(heading):
+        prior = 0.5
+    else:
+        prior = 1.0
+    terms = _terms('\n'.join(lines))
+    overlap = len(terms & reference_terms) / len(terms) if terms else 0.0
+    return prior + 2 * overlap
+
+
+def truncate_to_tokens(text, limit):
+    """Keep whole leading lines of text up to limit estimated tokens"""
+    kept = []
+    used = 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > limit:
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(kept).rstrip()
+
+
+def select_sections(text, limit, reference=''):
+    """Keep the sections of text most relevant to reference within limit tokens.
+
+    Sections are taken in order of relevance until the budget is spent; the
+    first one that does not fit whole is cut at a line boundary. The kept
+    sections are returned in their original order.
+    """
+    sections = split_sections(text)
+    reference_terms = _terms(reference)
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda index: -_section_score(index, sections[index][0], sections[index][1], reference_terms)
+    )
+    chosen = {}
+    remaining = limit
+    for index in ranked:
+        section_text = '\n'.join(sections[index][1]).strip()
+        cost = estimate_tokens(section_text) + 1
+        if cost <= remaining:
+            chosen[index] = section_text
+            remaining -= cost
+        elif remaining > 50:
+            chosen[index] = truncate_to_tokens(section_text, remaining)
+            remaining = 0
+    return '\n\n'.join(chosen[index] for index in sorted(chosen) if chosen[index])
+
+
+def _prompt_tokens(build_prompt, system_prompt, example_text, job_description):
+    return estimate_tokens(system_prompt) + sum(
+        estimate_tokens(part) for part in build_prompt(example_text, job_description)
+    )
+
+
+def fit_prompt(build_prompt, system_prompt, example_text, job_description, budget=None, structure=None,
+               keep_example=False):
+    """Trim the inputs of one prompt to fit budget estimated tokens.
+
+    Returns ``(example_text, job_description, report)``. structure, when
+    given, first rewrites the job description into its compact structured
+    form, even with trimming turned off, and the rewrite is kept only when
+    it is shorter. Nothing else changes while the prompt is within budget.
+    Over budget, the job description loses boilerplate and repeated lines;
+    if the prompt is still too long, its least relevant sections go, and
+    the example document is cut only when the job description would
+    otherwise get less than MIN_JOB_DESCRIPTION_TOKENS. With keep_example
+    the example is never cut, and the prompt can stay over budget. report
+    holds the estimated prompt tokens ``before`` and ``after`` trimming,
+    the ``budget`` and the tokens ``removed`` by each step that changed the
+    size, negative when a step added tokens.
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    before = _prompt_tokens(build_prompt, system_prompt, example_text, job_description)
+    report = {'before': before, 'after': before, 'budget': budget, 'removed': {}}
+    removed = report['removed']
+
+    def step(name, old, new):
+        saved = estimate_tokens(old) - estimate_tokens(new)
+        if saved:
+            removed[name] = saved
+        return new
+
+    if structure is not None:
+        structured = structure(job_description)
+        # The role/company header can outweigh what a short posting loses
+        if estimate_tokens(structured) < estimate_tokens(job_description):
+            job_description = step('structure', job_description, structured)
+    report['after'] = _prompt_tokens(build_prompt, system_prompt, example_text, job_description)
+    if budget <= 0 or report['after'] <= budget:
+        return example_text, job_description, report
+
+    job_description = step('boilerplate', job_description, remove_boilerplate(job_description))
+    job_description = step('duplicates', job_description, dedupe_lines(job_description))
+
+    overhead = _prompt_tokens(build_prompt, system_prompt, '', '')
+    job_floor = min(MIN_JOB_DESCRIPTION_TOKENS, estimate_tokens(job_description))
+    example_limit = max(0, budget - overhead - job_floor)
+    if not keep_example and estimate_tokens(example_text) > example_limit:
+        example_text = step('example', example_text, truncate_to_tokens(example_text, example_limit))
+
+    job_limit = max(0, budget - overhead - estimate_tokens(example_text))
+    if estimate_tokens(job_description) > job_limit:
+        job_description = step(
+            'low_relevance', job_description, select_sections(job_description, job_limit, example_text)
+        )
+
+    report['after'] = _prompt_tokens(build_prompt, system_prompt, example_text, job_description)
+    return example_text, job_description, report
@@ -4,13 +4,25 @@ Download cover letter endpoint
 
 from http.server import BaseHTTPRequestHandler
 import json
-import io
+import os
+import sys
 from datetime import datetime
 from urllib.parse import urlparse
-from _utils import generate_docx, generate_pdf
 
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
 
-class handler(BaseHTTPRequestHandler):
+from _utils import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TEMPLATE,
+    MIMETYPES,
+    render_cached,
+    validate_render_options
+)
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             # Parse request path to get format
@@ -23,41 +35,35 @@ class handler(BaseHTTPRequestHandler):
             data = json.loads(body.decode('utf-8'))
 
             text = data.get('text', '')
+            template = data.get('template') or DEFAULT_TEMPLATE
+            page_size = data.get('page_size') or DEFAULT_PAGE_SIZE
 
             if not text:
                 self.send_error_response('No text provided', 400)
                 return
 
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            if format_type == 'txt':
-                filename = f'cover_letter_{timestamp}.txt'
-                content = text.encode('utf-8')
-                mimetype = 'text/plain'
-
-            elif format_type == 'docx':
-                filename = f'cover_letter_{timestamp}.docx'
-                docx_file = generate_docx(text)
-                content = docx_file.read()
-                mimetype = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-
-            elif format_type == 'pdf':
-                filename = f'cover_letter_{timestamp}.pdf'
-                pdf_file = generate_pdf(text)
-                content = pdf_file.read()
-                mimetype = 'application/pdf'
+            error = validate_render_options(template, page_size)
+            if error:
+                self.send_error_response(error, 400)
+                return
 
-            else:
+            if format_type not in MIMETYPES:
                 self.send_error_response('Unsupported format', 400)
                 return
 
+            # Generate filename with timestamp
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'cover_letter_{timestamp}.{format_type}'
+            _, content, cache_hit = render_cached(text, format_type, template, page_size)
+            mimetype = MIMETYPES[format_type]
+
             # Send file
             self.send_response(200)
             self.send_header('Content-Type', mimetype)
             self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Content-Length', str(len(content)))
+            self.send_header('X-Cache', 'HIT' if cache_hit else 'MISS')
             self.end_headers()
             self.wfile.write(content)
             return
@@ -0,0 +1,114 @@
+"""
+Generate documents for many job descriptions endpoint
+"""
+
+from http.server import BaseHTTPRequestHandler
+import json
+import os
+import sys
+from functools import partial
+
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
+
+from _utils import (
+    AI_PROVIDER,
+    extract_text_from_file,
+    generate_document
+)
+from _batch import BATCH_MAX_JOBS, run_batch
+from _multipart import MultipartError, parse_multipart
+from _streaming import send_ndjson_stream
+from _metrics import InstrumentedHandler
+
+DOCUMENTS = ('cover_letter', 'resume')
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            # Parse multipart form data
+            content_type = self.headers.get('Content-Type', '')
+
+            if 'multipart/form-data' in content_type:
+                form = parse_multipart(self.rfile, self.headers)
+
+                document = form.getvalue('document', 'cover_letter')
+                if document not in DOCUMENTS:
+                    self.send_error_response(f'Unsupported document type: {document}', 400)
+                    return
+
+                # The shared example is extracted once for the whole batch
+                example_text = form.getvalue('example_text', '')
+                if 'example_file' in form:
+                    example_file = form['example_file']
+                    if example_file.filename:
+                        example_text = extract_text_from_file(
+                            example_file.data,
+                            example_file.filename
+                        )
+
+                # Each job description is its own file or text field
+                jobs = []
+                for job_file in form.getlist('job_description_files'):
+                    if job_file.filename:
+                        jobs.append((
+                            job_file.filename,
+                            extract_text_from_file(job_file.data, job_file.filename)
+                        ))
+                for number, part in enumerate(form.getlist('job_description_texts'), 1):
+                    text = part.data.decode('utf-8').strip()
+                    if text:
+                        jobs.append((f'job_description_text_{number}', text))
+
+                # Validate inputs
+                if not example_text.strip() or not jobs:
+                    self.send_error_response(
+                        'An example and at least one job description are required',
+                        400
+                    )
+                    return
+
+                if len(jobs) > BATCH_MAX_JOBS:
+                    self.send_error_response(
+                        f'At most {BATCH_MAX_JOBS} job descriptions per batch',
+                        400
+                    )
+                    return
+
+                ai_provider = AI_PROVIDER
+                send_ndjson_stream(self, run_batch(
+                    example_text.strip(),
+                    jobs,
+                    partial(generate_document, document),
+                    ai_provider,
+                    document=document
+                ))
+                return
+
+            else:
+                self.send_error_response('Invalid content type', 400)
+                return
+
+        except MultipartError as e:
+            self.send_error_response(str(e), e.status)
+            return
+
+        except Exception as e:
+            self.send_error_response(str(e), 500)
+            return
+
+    def send_error_response(self, message, code):
+        response = {'error': message}
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(response).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -3,19 +3,29 @@ Generate both cover letter and resume endpoint
 """
 
 from http.server import BaseHTTPRequestHandler
+from itertools import chain
 import json
 import os
-import cgi
-import io
 import sys
 
 # Add parent directory to path to import _utils
 sys.path.insert(0, os.path.dirname(__file__))
 
-from ._utils import extract_text_from_file
-
-
-class handler(BaseHTTPRequestHandler):
+from _utils import (
+    AI_PROVIDER,
+    extract_text_from_file,
+    generate_documents_concurrently,
+    match_score,
+    preview_document,
+    stream_generation
+)
+from _multipart import MultipartError, parse_multipart
+from _streaming import match_events, merge_document_streams, preview_events, send_ndjson_stream, wants_stream
+from _limits import Overloaded
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             # Parse multipart form data
@@ -23,14 +33,7 @@ class handler(BaseHTTPRequestHandler):
 
             if 'multipart/form-data' in content_type:
                 # Parse form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={
-                        'REQUEST_METHOD': 'POST',
-                        'CONTENT_TYPE': content_type,
-                    }
-                )
+                form = parse_multipart(self.rfile, self.headers)
 
                 # Get text fields
                 cover_letter_text = form.getvalue('cover_letter_text', '')
@@ -42,7 +45,7 @@ class handler(BaseHTTPRequestHandler):
                     cl_file = form['cover_letter_file']
                     if cl_file.filename:
                         cover_letter_text = extract_text_from_file(
-                            cl_file.file.read(),
+                            cl_file.data,
                             cl_file.filename
                         )
 
@@ -50,7 +53,7 @@ class handler(BaseHTTPRequestHandler):
                     resume_file = form['resume_file']
                     if resume_file.filename:
                         resume_text = extract_text_from_file(
-                            resume_file.file.read(),
+                            resume_file.data,
                             resume_file.filename
                         )
 
@@ -58,7 +61,7 @@ class handler(BaseHTTPRequestHandler):
                     job_file = form['job_description_file']
                     if job_file.filename:
                         job_description_text = extract_text_from_file(
-                            job_file.file.read(),
+                            job_file.data,
                             job_file.filename
                         )
 
@@ -70,26 +73,67 @@ class handler(BaseHTTPRequestHandler):
                     )
                     return
 
-                # Generate both documents using AI
-                ai_provider = os.getenv('AI_PROVIDER', 'anthropic')
+                # Generate both documents using AI, concurrently
+                ai_provider = AI_PROVIDER
+                matches = {
+                    'cover_letter': match_score(cover_letter_text, job_description_text),
+                    'resume': match_score(resume_text, job_description_text),
+                }
 
-                new_cover_letter = self.generate_cover_letter_with_ai(
-                    cover_letter_text,
-                    job_description_text,
-                    ai_provider
-                )
+                if wants_stream(self.path):
+                    previews = {
+                        'cover_letter': preview_document(
+                            'cover_letter', cover_letter_text, job_description_text, ai_provider
+                        ),
+                        'resume': preview_document('resume', resume_text, job_description_text, ai_provider),
+                    }
+                    send_ndjson_stream(self, chain(
+                        match_events(matches),
+                        preview_events(previews),
+                        merge_document_streams({
+                            'cover_letter': stream_generation(
+                                'cover_letter',
+                                cover_letter_text,
+                                job_description_text,
+                                ai_provider
+                            ),
+                            'resume': stream_generation(
+                                'resume',
+                                resume_text,
+                                job_description_text,
+                                ai_provider
+                            ),
+                        })
+                    ))
+                    return
 
-                new_resume = self.generate_resume_with_ai(
-                    resume_text,
+                results, errors = generate_documents_concurrently(
+                    {'cover_letter': cover_letter_text, 'resume': resume_text},
                     job_description_text,
                     ai_provider
                 )
 
+                if len(errors) == 2:
+                    self.send_error_response(
+                        f"{errors['cover_letter']}; {errors['resume']}",
+                        500
+                    )
+                    return
+
                 response = {
                     'success': True,
-                    'cover_letter': new_cover_letter,
-                    'resume': new_resume
+                    'cover_letter': results.get('cover_letter', (None, {}))[0],
+                    'resume': results.get('resume', (None, {}))[0],
+                    'match': matches,
+                    'usage': {
+                        name: metadata['usage'] for name, (text, metadata) in results.items()
+                    },
+                    'prompt_tokens': {
+                        name: metadata['prompt_tokens'] for name, (text, metadata) in results.items()
+                    }
                 }
+                if errors:
+                    response['errors'] = errors
 
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
@@ -102,151 +146,25 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response('Invalid content type', 400)
                 return
 
-        except Exception as e:
-            self.send_error_response(str(e), 500)
+        except Overloaded as e:
+            self.send_error_response(str(e), 503, retry_after=e.retry_after)
             return
 
-    def generate_cover_letter_with_ai(self, example_cover_letter, job_description, ai_provider='anthropic'):
-        """Use AI to generate adapted cover letter"""
-
-        # Import AI clients
-        import anthropic
-        import openai
-
-        ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
-        OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
-
-        prompt = f"""You are a professional career advisor. You need to adapt an existing cover letter for a new job opportunity.
-
-EXAMPLE COVER LETTER:
-{example_cover_letter}
-
-NEW JOB DESCRIPTION:
-{job_description}
-
-Please create a new cover letter for the new job that:
-1. Maintains the tone and style of the example cover letter
-2. Highlights relevant skills and experiences that match the new job requirements
-3. Customizes the content to address the specific role and company
-4. Keeps the same general structure and format
-5. Is professional, compelling, and tailored to the new position
-
-Please output ONLY the new cover letter text, without any preamble or explanation."""
-
-        try:
-            if ai_provider == 'anthropic' and ANTHROPIC_API_KEY:
-                client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-                message = client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=2000,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                return message.content[0].text
-
-            elif ai_provider == 'openai' and OPENAI_API_KEY:
-                openai.api_key = OPENAI_API_KEY
-                response = openai.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are a professional career advisor helping to write cover letters."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000
-                )
-                return response.choices[0].message.content
-
-            else:
-                # Fallback: Simple template
-                return f"""Dear Hiring Manager,
-
-I am writing to express my strong interest in the position described in your job posting. Based on my background and experience, I believe I would be an excellent fit for this role.
-
-The requirements outlined in your job description align well with my skills and career goals.
-
-Thank you for considering my application.
-
-Sincerely,
-[Your Name]
-
----
-NOTE: Configure ANTHROPIC_API_KEY or OPENAI_API_KEY for AI-generated content.
-"""
-        except Exception as e:
-            raise Exception(f"Error generating cover letter: {str(e)}")
-
-    def generate_resume_with_ai(self, example_resume, job_description, ai_provider='anthropic'):
-        """Use AI to generate adapted resume"""
-
-        # Import AI clients
-        import anthropic
-        import openai
-
-        ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
-        OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
-
-        prompt = f"""You are a professional career advisor. You need to adapt an existing resume for a new job opportunity.
-
-EXAMPLE RESUME:
-{example_resume}
-
-NEW JOB DESCRIPTION:
-{job_description}
-
-Please create a new resume for the new job that:
-1. Maintains the same professional format and structure
-2. Highlights relevant skills and experiences that match the job requirements
-3. Reorders or emphasizes experiences that are most relevant to this position
-4. Customizes the professional summary or objective to address the specific role
-5. Includes relevant keywords from the job description
-6. Keeps all information truthful and accurate (no fabrication)
-
-Please output ONLY the new resume text, without any preamble or explanation."""
-
-        try:
-            if ai_provider == 'anthropic' and ANTHROPIC_API_KEY:
-                client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-                message = client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=2000,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                return message.content[0].text
-
-            elif ai_provider == 'openai' and OPENAI_API_KEY:
-                openai.api_key = OPENAI_API_KEY
-                response = openai.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are a professional career advisor helping to tailor resumes."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000
-                )
-                return response.choices[0].message.content
-
-            else:
-                # Fallback: Simple template
-                return f"""PROFESSIONAL SUMMARY
-Experienced professional seeking new opportunities.
-
-RELEVANT EXPERIENCE
-{example_resume[:500] if len(example_resume) > 500 else example_resume}
+        except MultipartError as e:
+            self.send_error_response(str(e), e.status)
+            return
 
----
-NOTE: Configure ANTHROPIC_API_KEY or OPENAI_API_KEY for AI-generated content.
-"""
         except Exception as e:
-            raise Exception(f"Error generating resume: {str(e)}")
+            self.send_error_response(str(e), 500)
+            return
 
-    def send_error_response(self, message, code):
+    def send_error_response(self, message, code, retry_after=None):
         response = {'error': message}
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
         self.end_headers()
         self.wfile.write(json.dumps(response).encode())
 
@@ -3,19 +3,29 @@ Generate resume endpoint
 """
 
 from http.server import BaseHTTPRequestHandler
+from itertools import chain
 import json
 import os
-import cgi
-import io
 import sys
 
 # Add parent directory to path to import _utils
 sys.path.insert(0, os.path.dirname(__file__))
 
-from _utils import extract_text_from_file, generate_cover_letter_with_ai
-
-
-class handler(BaseHTTPRequestHandler):
+from _utils import (
+    AI_PROVIDER,
+    extract_text_from_file,
+    generate_document,
+    match_score,
+    preview_document,
+    stream_generation
+)
+from _multipart import MultipartError, parse_multipart
+from _streaming import document_events, match_events, preview_events, send_ndjson_stream, wants_stream
+from _limits import Overloaded
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             # Parse multipart form data
@@ -23,14 +33,7 @@ class handler(BaseHTTPRequestHandler):
 
             if 'multipart/form-data' in content_type:
                 # Parse form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={
-                        'REQUEST_METHOD': 'POST',
-                        'CONTENT_TYPE': content_type,
-                    }
-                )
+                form = parse_multipart(self.rfile, self.headers)
 
                 # Get text fields
                 example_text = form.getvalue('example_text', '')
@@ -41,7 +44,7 @@ class handler(BaseHTTPRequestHandler):
                     example_file = form['example_file']
                     if example_file.filename:
                         example_text = extract_text_from_file(
-                            example_file.file.read(),
+                            example_file.data,
                             example_file.filename
                         )
 
@@ -49,7 +52,7 @@ class handler(BaseHTTPRequestHandler):
                     job_file = form['job_description_file']
                     if job_file.filename:
                         job_description_text = extract_text_from_file(
-                            job_file.file.read(),
+                            job_file.data,
                             job_file.filename
                         )
 
@@ -62,8 +65,25 @@ class handler(BaseHTTPRequestHandler):
                     return
 
                 # Generate new resume using AI
-                ai_provider = os.getenv('AI_PROVIDER', 'anthropic')
-                new_resume = self.generate_resume_with_ai(
+                ai_provider = AI_PROVIDER
+                match = match_score(example_text, job_description_text)
+
+                if wants_stream(self.path):
+                    preview = preview_document('resume', example_text, job_description_text, ai_provider)
+                    send_ndjson_stream(self, chain(
+                        match_events({'resume': match}),
+                        preview_events({'resume': preview}),
+                        document_events('resume', stream_generation(
+                            'resume',
+                            example_text,
+                            job_description_text,
+                            ai_provider
+                        ))
+                    ))
+                    return
+
+                new_resume, metadata = generate_document(
+                    'resume',
                     example_text,
                     job_description_text,
                     ai_provider
@@ -71,12 +91,17 @@ class handler(BaseHTTPRequestHandler):
 
                 response = {
                     'success': True,
-                    'resume': new_resume
+                    'resume': new_resume,
+                    'match': match,
+                    'usage': metadata['usage'],
+                    'prompt_tokens': metadata['prompt_tokens']
                 }
 
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Expose-Headers', 'X-Cache')
+                self.send_header('X-Cache', 'HIT' if metadata['cache_hit'] else 'MISS')
                 self.end_headers()
                 self.wfile.write(json.dumps(response).encode())
                 return
@@ -85,86 +110,25 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response('Invalid content type', 400)
                 return
 
-        except Exception as e:
-            self.send_error_response(str(e), 500)
+        except Overloaded as e:
+            self.send_error_response(str(e), 503, retry_after=e.retry_after)
             return
 
-    def generate_resume_with_ai(self, example_resume, job_description, ai_provider='anthropic'):
-        """Use AI to generate adapted resume"""
-
-        # Import AI clients
-        import anthropic
-        import openai
-
-        ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
-        OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
-
-        prompt = f"""You are a professional career advisor. You need to adapt an existing resume for a new job opportunity.
-
-EXAMPLE RESUME:
-{example_resume}
-
-NEW JOB DESCRIPTION:
-{job_description}
-
-Please create a new resume for the new job that:
-1. Maintains the same professional format and structure
-2. Highlights relevant skills and experiences that match the job requirements
-3. Reorders or emphasizes experiences that are most relevant to this position
-4. Customizes the professional summary or objective to address the specific role
-5. Includes relevant keywords from the job description
-6. Keeps all information truthful and accurate (no fabrication)
-
-Please output ONLY the new resume text, without any preamble or explanation."""
-
-        try:
-            if ai_provider == 'anthropic' and ANTHROPIC_API_KEY:
-                client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-                message = client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=2000,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                return message.content[0].text
-
-            elif ai_provider == 'openai' and OPENAI_API_KEY:
-                openai.api_key = OPENAI_API_KEY
-                response = openai.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are a professional career advisor helping to tailor resumes."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000
-                )
-                return response.choices[0].message.content
-
-            else:
-                # Fallback: Simple template-based generation (no AI)
-                return f"""PROFESSIONAL SUMMARY
-{example_resume.split('.')[0] if '.' in example_resume else 'Experienced professional'} seeking new opportunities in the role described.
-
-RELEVANT EXPERIENCE
-Based on the job requirements, my background includes relevant experience that aligns with the position.
-
-{example_resume.split('EXPERIENCE')[-1] if 'EXPERIENCE' in example_resume.upper() else example_resume[:500]}
-
-SKILLS
-Skills and qualifications matching the job description.
+        except MultipartError as e:
+            self.send_error_response(str(e), e.status)
+            return
 
----
-NOTE: This is a basic template. Configure ANTHROPIC_API_KEY or OPENAI_API_KEY for AI-generated resumes.
-"""
         except Exception as e:
-            raise Exception(f"Error generating resume: {str(e)}")
+            self.send_error_response(str(e), 500)
+            return
 
-    def send_error_response(self, message, code):
+    def send_error_response(self, message, code, retry_after=None):
         response = {'error': message}
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
         self.end_headers()
         self.wfile.write(json.dumps(response).encode())
 
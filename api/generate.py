@@ -3,14 +3,29 @@ Generate cover letter endpoint
 """
 
 from http.server import BaseHTTPRequestHandler
+from itertools import chain
 import json
 import os
-import cgi
-import io
-from ._utils import extract_text_from_file, generate_cover_letter_with_ai
+import sys
 
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
 
-class handler(BaseHTTPRequestHandler):
+from _utils import (
+    AI_PROVIDER,
+    extract_text_from_file,
+    generate_document,
+    match_score,
+    preview_document,
+    stream_cover_letter_with_ai
+)
+from _multipart import MultipartError, parse_multipart
+from _streaming import document_events, match_events, preview_events, send_ndjson_stream, wants_stream
+from _limits import Overloaded
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
     def do_POST(self):
         try:
             # Parse multipart form data
@@ -18,14 +33,7 @@ class handler(BaseHTTPRequestHandler):
 
             if 'multipart/form-data' in content_type:
                 # Parse form data
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={
-                        'REQUEST_METHOD': 'POST',
-                        'CONTENT_TYPE': content_type,
-                    }
-                )
+                form = parse_multipart(self.rfile, self.headers)
 
                 # Get text fields
                 example_text = form.getvalue('example_text', '')
@@ -36,7 +44,7 @@ class handler(BaseHTTPRequestHandler):
                     example_file = form['example_file']
                     if example_file.filename:
                         example_text = extract_text_from_file(
-                            example_file.file.read(),
+                            example_file.data,
                             example_file.filename
                         )
 
@@ -44,7 +52,7 @@ class handler(BaseHTTPRequestHandler):
                     job_file = form['job_description_file']
                     if job_file.filename:
                         job_description_text = extract_text_from_file(
-                            job_file.file.read(),
+                            job_file.data,
                             job_file.filename
                         )
 
@@ -57,8 +65,24 @@ class handler(BaseHTTPRequestHandler):
                     return
 
                 # Generate new cover letter using AI
-                ai_provider = os.getenv('AI_PROVIDER', 'anthropic')
-                new_cover_letter = generate_cover_letter_with_ai(
+                ai_provider = AI_PROVIDER
+                match = match_score(example_text, job_description_text)
+
+                if wants_stream(self.path):
+                    preview = preview_document('cover_letter', example_text, job_description_text, ai_provider)
+                    send_ndjson_stream(self, chain(
+                        match_events({'cover_letter': match}),
+                        preview_events({'cover_letter': preview}),
+                        document_events('cover_letter', stream_cover_letter_with_ai(
+                            example_text,
+                            job_description_text,
+                            ai_provider
+                        ))
+                    ))
+                    return
+
+                new_cover_letter, metadata = generate_document(
+                    'cover_letter',
                     example_text,
                     job_description_text,
                     ai_provider
@@ -66,12 +90,17 @@ class handler(BaseHTTPRequestHandler):
 
                 response = {
                     'success': True,
-                    'cover_letter': new_cover_letter
+                    'cover_letter': new_cover_letter,
+                    'match': match,
+                    'usage': metadata['usage'],
+                    'prompt_tokens': metadata['prompt_tokens']
                 }
 
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Expose-Headers', 'X-Cache')
+                self.send_header('X-Cache', 'HIT' if metadata['cache_hit'] else 'MISS')
                 self.end_headers()
                 self.wfile.write(json.dumps(response).encode())
                 return
@@ -80,15 +109,25 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response('Invalid content type', 400)
                 return
 
+        except Overloaded as e:
+            self.send_error_response(str(e), 503, retry_after=e.retry_after)
+            return
+
+        except MultipartError as e:
+            self.send_error_response(str(e), e.status)
+            return
+
         except Exception as e:
             self.send_error_response(str(e), 500)
             return
 
-    def send_error_response(self, message, code):
+    def send_error_response(self, message, code, retry_after=None):
         response = {'error': message}
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
         self.end_headers()
         self.wfile.write(json.dumps(response).encode())
 
@@ -5,20 +5,28 @@ Health check endpoint
 from http.server import BaseHTTPRequestHandler
 import json
 import os
+import sys
 
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
+
+from _cache import CACHE_BACKEND, get_generation_cache
+from _providers import AI_PROVIDER, configured_model
+from _metrics import InstrumentedHandler
 
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        ai_provider = os.getenv('AI_PROVIDER', 'anthropic')
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY', '')
-        openai_key = os.getenv('OPENAI_API_KEY', '')
 
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
+    def do_GET(self):
         response = {
             'status': 'healthy',
-            'ai_provider': ai_provider,
-            'ai_configured': bool(anthropic_key or openai_key)
+            'ai_provider': AI_PROVIDER,
+            'ai_configured': configured_model(AI_PROVIDER) is not None
         }
 
+        # Only the on-disk backends share counters with the generate functions
+        if CACHE_BACKEND in ('sqlite', 'tiered'):
+            response['cache'] = get_generation_cache().stats()
+
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -0,0 +1,73 @@
+"""
+Match endpoint: score an example against job descriptions without an AI call
+"""
+
+from http.server import BaseHTTPRequestHandler
+import json
+import os
+import sys
+
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
+
+from _utils import (
+    rank_jobs,
+    rank_passages,
+    read_jobs
+)
+from _matching import MATCH_MAX_JOBS
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            # Read request body
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body.decode('utf-8') or '{}')
+
+            example_text = (data.get('example_text') or '').strip()
+            jobs = read_jobs(data.get('jobs') or [])
+
+            if not example_text or not jobs:
+                self.send_error_response('An example and at least one job description are required', 400)
+                return
+
+            if len(jobs) > MATCH_MAX_JOBS:
+                self.send_error_response(f'At most {MATCH_MAX_JOBS} job descriptions per request', 400)
+                return
+
+            response = {'success': True, 'results': rank_jobs(example_text, jobs)}
+            if len(jobs) == 1:
+                response['passages'] = rank_passages(example_text, jobs[0][1])
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps(response).encode())
+            return
+
+        except ValueError as e:
+            self.send_error_response(str(e), 400)
+            return
+
+        except Exception as e:
+            self.send_error_response(str(e), 500)
+            return
+
+    def send_error_response(self, message, code):
+        response = {'error': message}
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(response).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,98 @@
+"""
+Refine endpoint: edit a generated draft paragraph by paragraph
+"""
+
+from http.server import BaseHTTPRequestHandler
+import json
+import os
+import sys
+
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
+
+from _utils import (
+    AI_PROVIDER,
+    DOCUMENTS,
+    refine_document
+)
+from _limits import Overloaded
+from _metrics import InstrumentedHandler
+from _refine import PatchError
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            # Read request body
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body.decode('utf-8'))
+
+            kind = data.get('document') or 'cover_letter'
+            draft = data.get('draft', '')
+            instruction = (data.get('instruction') or '').strip()
+            job_description_text = (data.get('job_description') or '').strip()
+
+            if kind not in DOCUMENTS:
+                self.send_error_response(f'Unknown document: {kind}', 400)
+                return
+
+            if not draft.strip() or not (instruction or job_description_text):
+                self.send_error_response(
+                    'A draft and an instruction or updated job description are required',
+                    400
+                )
+                return
+
+            text, metadata = refine_document(kind, draft, instruction, job_description_text, AI_PROVIDER)
+
+            response = {
+                'success': True,
+                kind: text,
+                'changed': metadata['changed'],
+                'mode': metadata['mode'],
+                'usage': metadata['usage'],
+                'prompt_tokens': metadata['prompt_tokens']
+            }
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'X-Cache')
+            self.send_header('X-Cache', 'HIT' if metadata['cache_hit'] else 'MISS')
+            self.end_headers()
+            self.wfile.write(json.dumps(response).encode())
+            return
+
+        except Overloaded as e:
+            self.send_error_response(str(e), 503, retry_after=e.retry_after)
+            return
+
+        except PatchError as e:
+            self.send_error_response(f'The model returned edits that do not fit the draft: {e}', 502)
+            return
+
+        except ValueError as e:
+            self.send_error_response(str(e), 400)
+            return
+
+        except Exception as e:
+            self.send_error_response(str(e), 500)
+            return
+
+    def send_error_response(self, message, code, retry_after=None):
+        response = {'error': message}
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(json.dumps(response).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,97 @@
+"""
+Render-all endpoint: every requested format of a cover letter in one ZIP
+"""
+
+from http.server import BaseHTTPRequestHandler
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path to import _utils
+sys.path.insert(0, os.path.dirname(__file__))
+
+from _utils import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TEMPLATE,
+    MIMETYPES,
+    build_zip,
+    download_basename,
+    render_all,
+    validate_render_options
+)
+from _metrics import InstrumentedHandler
+
+
+class handler(InstrumentedHandler, BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            # Read request body
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(content_length)
+            data = json.loads(body.decode('utf-8'))
+
+            text = data.get('text', '')
+            template = data.get('template') or DEFAULT_TEMPLATE
+            page_size = data.get('page_size') or DEFAULT_PAGE_SIZE
+            formats = data.get('formats') or list(MIMETYPES)
+            basename = download_basename(data.get('name'))
+
+            if not text:
+                self.send_error_response('No text provided', 400)
+                return
+
+            error = validate_render_options(template, page_size)
+            if error:
+                self.send_error_response(error, 400)
+                return
+
+            unsupported = [name for name in formats if name not in MIMETYPES]
+            if unsupported:
+                self.send_error_response(f'Unsupported format: {unsupported[0]}', 400)
+                return
+
+            # Instances do not share the render cache, so links to cached
+            # files would miss on another instance; always answer with a ZIP
+            if (data.get('as') or 'zip') != 'zip':
+                self.send_error_response('Only ZIP output is available here', 400)
+                return
+
+            rendered = render_all(text, formats, template, page_size)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'{basename}_{timestamp}.zip'
+            content = build_zip(
+                {file_format: data for file_format, (_, data, _) in rendered.items()},
+                f'{basename}_{timestamp}'
+            )
+            cache_hit = all(hit for _, _, hit in rendered.values())
+
+            # Send file
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/zip')
+            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Length', str(len(content)))
+            self.send_header('X-Cache', 'HIT' if cache_hit else 'MISS')
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        except Exception as e:
+            self.send_error_response(str(e), 500)
+            return
+
+    def send_error_response(self, message, code):
+        response = {'error': message}
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(response).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Batch Generator CLI
+Adapts one example cover letter or resume to many job descriptions
+
+Usage:
+    python3 batch_generate.py --example my_letter.pdf jobs/*.pdf --output-dir out/
+"""
+
+import argparse
+import os
+import sys
+from functools import partial
+
+from api._utils import (
+    AI_PROVIDER,
+    extract_text_from_file,
+    generate_document
+)
+from api._batch import BATCH_CONCURRENCY, run_batch
+
+DOCUMENTS = ('cover_letter', 'resume')
+
+
+def read_document(path):
+    """Extract text from a PDF, DOCX or TXT file on disk"""
+    with open(path, 'rb') as f:
+        return extract_text_from_file(f.read(), os.path.basename(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('jobs', nargs='*', help='Job description files (PDF, DOCX or TXT)')
+    parser.add_argument('--example', required=True, help='Example cover letter or resume file')
+    parser.add_argument('--document', choices=DOCUMENTS, default='cover_letter',
+                        help='Kind of document the example is (default: cover_letter)')
+    parser.add_argument('--job-text', action='append', default=[],
+                        help='Job description text; may be given more than once')
+    parser.add_argument('--output-dir', default='.', help='Where to write the results')
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY,
+                        help=f'Generations run at once (default: {BATCH_CONCURRENCY})')
+    parser.add_argument('--provider', default=AI_PROVIDER, help='anthropic or openai')
+    args = parser.parse_args()
+
+    example_text = read_document(args.example).strip()
+    jobs = [(os.path.basename(path), read_document(path)) for path in args.jobs]
+    jobs += [(f'job_text_{number}', text) for number, text in enumerate(args.job_text, 1)]
+    if not jobs:
+        parser.error('provide at least one job description file or --job-text')
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    input_tokens = cached_tokens = 0
+    for event in run_batch(
+        example_text,
+        jobs,
+        partial(generate_document, args.document),
+        args.provider,
+        document=args.document,
+        concurrency=args.concurrency
+    ):
+        if event['type'] == 'result':
+            stem = os.path.splitext(event['job'])[0]
+            path = os.path.join(args.output_dir, f"{stem}_{args.document}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(event['text'])
+            input_tokens += event['usage'].get('input_tokens', 0)
+            cached_tokens += event['usage'].get('cached_input_tokens', 0)
+            print(f"✅ {event['job']} ({event['match_score']}% match) -> {path}")
+        elif event['type'] == 'error':
+            print(f"❌ {event['job']}: {event['error']}", file=sys.stderr)
+        else:
+            print(f"\nDone: {event['total'] - event['failed']}/{event['total']} generated")
+            if input_tokens:
+                print(f"Input tokens: {input_tokens} ({cached_tokens} read from the prompt cache)")
+            return 1 if event['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the serverless functions
+
+Imports each api/*.py endpoint in a fresh interpreter, the way a new
+serverless instance does, and reports the median import time along with the
+heavy third-party packages that the import pulled in. A package showing up
+for an endpoint that does not use it is a regression.
+
+Usage:
+    python3 benchmarks/cold_start.py --runs 5
+    python3 benchmarks/cold_start.py --endpoint download --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+# Packages that dominate import time; none of them should load at import
+HEAVY_MODULES = ('PyPDF2', 'docx', 'reportlab', 'anthropic', 'openai', 'httpx', 'numpy')
+
+# Runs in the child interpreter: import one endpoint file, print the time and
+# which heavy packages ended up in sys.modules
+_PROBE = """
+import importlib.util, json, sys, time
+path, heavy = sys.argv[1], sys.argv[2].split(',')
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('endpoint', path)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'loaded': [name for name in heavy if name in sys.modules]}))
+"""
+
+
+def list_endpoints():
+    """Names of the serverless functions, as Vercel routes them"""
+    return sorted(
+        name[:-3] for name in os.listdir(API_DIR)
+        if name.endswith('.py') and not name.startswith('_') and name != 'test-models.py'
+    )
+
+
+def measure(endpoint):
+    """Import endpoint once in a fresh interpreter; return (seconds, loaded modules)"""
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE, os.path.join(API_DIR, endpoint + '.py'), ','.join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['seconds'], result['loaded']
+
+
+def main():
+    endpoints = list_endpoints()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--endpoint', action='append', choices=endpoints,
+                        help='Endpoint to measure; may be given more than once (default: all)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per endpoint')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for endpoint in args.endpoint or endpoints:
+        samples, loaded = [], []
+        for _ in range(args.runs):
+            seconds, loaded = measure(endpoint)
+            samples.append(seconds)
+        results.append({
+            'endpoint': endpoint,
+            'median_ms': round(statistics.median(samples) * 1000, 1),
+            'max_ms': round(max(samples) * 1000, 1),
+            'heavy_modules': loaded,
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'endpoint':<18}{'median ms':>10}{'max ms':>10}  heavy modules loaded")
+    for result in results:
+        print(f"{result['endpoint']:<18}{result['median_ms']:>10}{result['max_ms']:>10}  "
+              f"{', '.join(result['heavy_modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
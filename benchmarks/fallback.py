@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Offline draft benchmark
+
+Times the offline cover letter and resume drafts used when no provider is
+configured and streamed as a preview ahead of the provider's text. Each
+case is drafted once for documents never seen before, which includes
+parsing and indexing them, and then again with the parse and keyword
+caches warm, as when the same posting is previewed and then generated.
+A warm-up draft loads the modules it uses before timing. Runs offline.
+
+Usage:
+    python3 benchmarks/fallback.py
+    python3 benchmarks/fallback.py --pages 1,5 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prompt_size import SAMPLE_COVER_LETTER, SAMPLE_POSTING  # noqa: E402
+from suite import LINES_PER_PAGE, job_lines, resume_lines  # noqa: E402
+
+from api._fallback import DRAFTS  # noqa: E402
+
+
+def timed(operation, runs=1):
+    """Median milliseconds of operation over runs"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        operation()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', default='1,5,20', help='Page counts of the synthetic job descriptions')
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs with warm caches')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    resume = '\n'.join(resume_lines(2 * LINES_PER_PAGE))
+    DRAFTS['resume']('- warm up imports', 'warm up imports')
+    cases = [('sample posting', SAMPLE_POSTING)]
+    for seed, pages in enumerate(int(size) for size in args.pages.split(',')):
+        cases.append((f'synthetic {pages}p', '\n'.join(job_lines(pages * LINES_PER_PAGE, seed=200 + seed))))
+
+    results = []
+    for name, job in cases:
+        for kind, example in (('cover_letter', SAMPLE_COVER_LETTER), ('resume', resume)):
+            draft = DRAFTS[kind]
+            # A trailing line keeps the example unseen for the cold pass
+            example = f'{example}\n{name}'
+            results.append({
+                'case': name,
+                'kind': kind,
+                'cold_ms': timed(lambda: draft(example, job)),
+                'warm_ms': timed(lambda: draft(example, job), args.runs),
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<18}{'kind':<14}{'cold ms':>9}{'warm ms':>9}")
+    for result in results:
+        print(f"{result['case']:<18}{result['kind']:<14}{result['cold_ms']:>9}{result['warm_ms']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for server.py
+
+Runs a fixed number of client threads against a running server, each on its
+own keep-alive connection, and reports throughput and latency percentiles.
+Start the server one way, run the test, then start it the other way and run
+it again to compare:
+
+    python3 server.py                                  # development server
+    gunicorn -c gunicorn.conf.py wsgi:app              # production server
+    python3 benchmarks/load_test.py --endpoint generate --concurrency 16 --duration 20
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+SAMPLE_LETTER = (
+    "Dear Hiring Manager,\n\n"
+    "I am excited to apply for the Backend Engineer role. Over five years I have built "
+    "APIs in Python, tuned PostgreSQL queries and run services on Kubernetes.\n\n"
+    "Sincerely,\nJane Doe"
+)
+SAMPLE_JOB = "Backend Engineer. Python, PostgreSQL, Kubernetes, REST APIs, on-call rotation."
+
+
+def _multipart(fields):
+    boundary = uuid.uuid4().hex
+    body = b''.join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        for name, value in fields.items()
+    ) + f'--{boundary}--\r\n'.encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def build_request(endpoint):
+    """Return (method, path, body, headers) for one request to endpoint"""
+    if endpoint == 'health':
+        return 'GET', '/health', None, {}
+    if endpoint == 'generate':
+        body, content_type = _multipart({'example_text': SAMPLE_LETTER, 'job_description_text': SAMPLE_JOB})
+        return 'POST', '/generate', body, {'Content-Type': content_type}
+    if endpoint in ('docx', 'pdf'):
+        body = json.dumps({'text': SAMPLE_LETTER * 4}).encode('utf-8')
+        return 'POST', f'/download/{endpoint}', body, {'Content-Type': 'application/json'}
+    raise ValueError(f'Unknown endpoint: {endpoint}')
+
+
+def run_client(url, request, deadline, latencies, errors, lock):
+    method, path, body, headers = request
+    parsed = urlparse(url)
+    connection = None
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        # A kept-alive connection may have been closed by the server in the
+        # meantime (idle timeout, worker restart); retry once on a fresh one
+        for attempt in range(2):
+            reused = connection is not None
+            if connection is None:
+                connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=120)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+                    connection = None
+                break
+            except (OSError, http.client.HTTPException) as e:
+                ok = False
+                connection.close()
+                connection = None
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if not (reused and stale):
+                    break
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(elapsed)
+    if connection is not None:
+        connection.close()
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8080', help='Server base URL')
+    parser.add_argument('--endpoint', choices=('health', 'generate', 'docx', 'pdf'), default='generate')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    request = build_request(args.endpoint)
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.monotonic() + args.duration
+    clients = [
+        threading.Thread(target=run_client, args=(args.url, request, deadline, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.monotonic() - started
+
+    ordered = sorted(latencies)
+    results = {
+        'endpoint': args.endpoint,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 2),
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 2),
+    }
+    if ordered:
+        results.update({
+            'mean_ms': round(statistics.mean(ordered) * 1000, 1),
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 1),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, value in results.items():
+        print(f'{name:<22}{value}')
+
+
+if __name__ == '__main__':
+    main()
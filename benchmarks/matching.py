@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Keyword match benchmark
+
+Scores one resume against batches of synthetic job descriptions from
+benchmarks/suite.py with the local matching engine. The first pass over a
+batch parses and indexes every posting; later passes, such as scoring a
+second resume against the same postings, reuse the index. Also times BM25
+ranking of the resume's bullets against one posting. Runs offline.
+
+Usage:
+    python3 benchmarks/matching.py
+    python3 benchmarks/matching.py --jobs 100,500 --pages 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import LINES_PER_PAGE, job_lines, resume_lines  # noqa: E402
+
+from api._matching import match_scores, rank_passages  # noqa: E402
+
+
+def timed(operation, runs=1):
+    """Median milliseconds of operation over runs"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        operation()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', default='10,100,300,500', help='Batch sizes to score')
+    parser.add_argument('--pages', type=int, default=1, help='Pages per job description')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs of the indexed pass')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    resume = '\n'.join(resume_lines(2 * LINES_PER_PAGE))
+    match_scores(resume, ['warm up imports', 'load numpy'])
+
+    results = []
+    first_seed = 100  # Every batch gets postings no earlier batch indexed
+    for count in (int(size) for size in args.jobs.split(',')):
+        jobs = [
+            '\n'.join(job_lines(args.pages * LINES_PER_PAGE, seed=seed))
+            for seed in range(first_seed, first_seed + count)
+        ]
+        first_seed += count
+        results.append({
+            'jobs': count,
+            'first_pass_ms': timed(lambda: match_scores(resume, jobs)),
+            'indexed_ms': timed(lambda: match_scores(resume, jobs), args.runs),
+        })
+    passages_ms = timed(lambda: rank_passages(resume, '\n'.join(job_lines(args.pages * LINES_PER_PAGE))), args.runs)
+
+    if args.json:
+        print(json.dumps({'batches': results, 'rank_passages_ms': passages_ms}, indent=2))
+        return
+    print(f"{'jobs':>6}{'first pass ms':>16}{'indexed ms':>13}{'us/job':>9}")
+    for result in results:
+        per_job = result['indexed_ms'] * 1000 / result['jobs']
+        print(f"{result['jobs']:>6}{result['first_pass_ms']:>16}{result['indexed_ms']:>13}{per_job:>9.0f}")
+    print(f"\nBM25 ranking of {len(resume.splitlines())} resume lines against one posting: {passages_ms} ms")
+
+
+if __name__ == '__main__':
+    main()
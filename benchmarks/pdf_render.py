@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+PDF render micro-benchmark
+
+Compares the per-document render time of the original generate_pdf (a new
+style sheet and one Paragraph per line on every call) with the cached
+layouts in api/_pdf_render.py.
+
+Usage:
+    python3 benchmarks/pdf_render.py --runs 50 --paragraphs 8
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from api._pdf_render import PDF_LAYOUTS, render_pdf
+
+PARAGRAPH = (
+    "In my current role I led the migration of our billing platform to a new\n"
+    "event pipeline, cutting invoice latency from hours to minutes while keeping\n"
+    "error rates under 0.1% & coordinating three teams across two time zones."
+)
+
+
+def legacy_render(text):
+    """generate_pdf as it was before layouts were cached"""
+    pdf_bytes = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_bytes, pagesize=letter, rightMargin=72,
+                            leftMargin=72, topMargin=72, bottomMargin=72)
+    styles = getSampleStyleSheet()
+    style = ParagraphStyle('CustomStyle', parent=styles['Normal'], fontName='Helvetica',
+                           fontSize=11, leading=14, spaceAfter=12)
+    story = []
+    for line in text.split('\n'):
+        if line.strip():
+            # The original did not escape; & is escaped here so it can render at all
+            story.append(Paragraph(line.strip().replace('&', '&amp;'), style))
+        else:
+            story.append(Spacer(1, 0.2 * inch))
+    doc.build(story)
+    pdf_bytes.seek(0)
+    return pdf_bytes
+
+
+def measure(render, text, runs):
+    render(text)  # Warm up imports and, for the cached path, the layout
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50, help='Renders per implementation')
+    parser.add_argument('--paragraphs', type=int, default=8, help='Paragraphs in the sample document')
+    args = parser.parse_args()
+
+    text = 'Dear Hiring Manager,\n\n' + '\n\n'.join([PARAGRAPH] * args.paragraphs) + '\n\nSincerely,\nJane Doe'
+    results = [('before', measure(legacy_render, text, args.runs))]
+    for layout in PDF_LAYOUTS:
+        results.append((f'after ({layout})', measure(lambda t: render_pdf(t, layout), text, args.runs)))
+
+    print(f"{args.runs} renders of a {len(text.splitlines())}-line document\n")
+    print(f"{'':<20}{'mean ms':>10}{'median ms':>12}{'p95 ms':>10}")
+    for name, timings in results:
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"{name:<20}{statistics.mean(timings):>10.2f}{statistics.median(timings):>12.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
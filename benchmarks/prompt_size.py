@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Prompt size benchmark for the structured job description
+
+Builds the cover letter and resume prompts for a sample posting and for the
+synthetic job descriptions of benchmarks/suite.py, three ways: the raw
+extracted text, the text trimmed by the token budget alone, and the
+structured job description from the parse index followed by the token
+budget. Reports estimated prompt tokens for each and the time to parse a
+document cold and from the parse cache. Runs offline.
+
+Usage:
+    python3 benchmarks/prompt_size.py
+    python3 benchmarks/prompt_size.py --sizes 1,5 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from suite import LINES_PER_PAGE, job_lines, resume_lines  # noqa: E402
+
+from api._parsing import _parse, parse_document, structure_job_description  # noqa: E402
+from api._prompts import DOCUMENTS  # noqa: E402
+from api._token_budget import estimate_tokens, fit_prompt  # noqa: E402
+
+# A posting as it comes out of a careers page PDF: company background,
+# the role, benefits and legal text, with the page header repeated
+SAMPLE_POSTING = """Senior Backend Engineer
+Acme Robotics - Careers
+
+About Acme Robotics
+Acme Robotics builds warehouse robots used by 300 retailers across North America and Europe. Founded in 2015, we have grown to 400 people and raised a Series C in 2023.
+
+Our mission is to make logistics safer and faster for everyone involved, from pickers on the floor to drivers on the road. We believe in ownership, candor and craft, and we write things down.
+
+Our engineering team of 80 works across robotics, cloud and data. We ship to production many times a day and run a blameless incident process.
+
+About the role
+You will join the Fleet Platform team, which runs the services every robot reports to. The team owns telemetry ingestion, the fleet data model and the APIs our customers integrate with.
+
+What you'll do
+- Design and build Python services for fleet telemetry at 2 million events per minute
+- Own the Postgres data model and the Kafka pipelines behind it
+- Lead design reviews and mentor engineers on the team
+- Improve reliability and on-call health for the platform
+
+Acme Robotics - Careers
+
+Requirements
+- 5+ years building backend systems in Python or Go
+- Experience with AWS, Kubernetes and Terraform
+- Strong knowledge of relational databases
+- Clear written communication
+
+Nice to have
+- Experience with time-series data or robotics
+
+Benefits
+- Medical, dental and vision insurance for you and your dependents
+- 401k with a 4% match
+- Flexible paid time off and 16 weeks of parental leave
+- Home office stipend
+
+Acme Robotics - Careers
+
+Acme Robotics is an equal opportunity employer. All qualified applicants will receive consideration for employment without regard to race, color, religion, sex, sexual orientation, gender identity, national origin, disability or protected veteran status. We provide reasonable accommodation to applicants with disabilities; contact us to request one.
+
+How to apply
+Submit your resume and a cover letter through our careers page. We review every application and reply within two weeks.
+"""
+
+SAMPLE_COVER_LETTER = """Dear Hiring Manager,
+
+I am writing to apply for the Backend Engineer position. For the past eight years I have built and run Python services for payments and logistics companies.
+
+At Globex I led the rebuild of our billing platform, cutting invoice latency by 40% and on-call pages by half.
+
+I would welcome the chance to bring the same focus on reliable systems to your team.
+
+Sincerely,
+Jane Doe"""
+
+
+def prompt_tokens(kind, example, job, structured):
+    build_prompt, system_prompt, _ = DOCUMENTS[kind]
+    raw = estimate_tokens(system_prompt) + sum(estimate_tokens(part) for part in build_prompt(example, job))
+    _, _, report = fit_prompt(
+        build_prompt, system_prompt, example, job,
+        structure=structure_job_description if structured else None
+    )
+    return raw, report['after']
+
+
+def measure(name, kind, example, job):
+    raw, budget_only = prompt_tokens(kind, example, job, False)
+    _, structured = prompt_tokens(kind, example, job, True)
+
+    started = time.perf_counter()
+    _parse(job)
+    parse_ms = (time.perf_counter() - started) * 1000
+    parse_document(job)
+    started = time.perf_counter()
+    parse_document(job)
+    cached_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        'case': name,
+        'kind': kind,
+        'raw_tokens': raw,
+        'budget_tokens': budget_only,
+        'structured_tokens': structured,
+        'reduction_vs_raw': round(1 - structured / raw, 3),
+        'reduction_vs_budget': round(1 - structured / budget_only, 3),
+        'parse_ms': round(parse_ms, 2),
+        'cached_parse_ms': round(cached_ms, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,5,20', help='Page counts of the synthetic job descriptions')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [
+        measure('sample posting', 'cover_letter', SAMPLE_COVER_LETTER, SAMPLE_POSTING),
+        measure('sample posting', 'resume', '\n'.join(resume_lines(2 * LINES_PER_PAGE)), SAMPLE_POSTING),
+    ]
+    for pages in (int(size) for size in args.sizes.split(',')):
+        job = '\n'.join(job_lines(pages * LINES_PER_PAGE))
+        results.append(measure(f'synthetic {pages}p', 'cover_letter', SAMPLE_COVER_LETTER, job))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<18}{'kind':<14}{'raw':>8}{'budget':>8}{'struct':>8}{'vs raw':>8}{'vs budget':>10}"
+          f"{'parse ms':>10}{'cached ms':>10}")
+    for r in results:
+        print(f"{r['case']:<18}{r['kind']:<14}{r['raw_tokens']:>8}{r['budget_tokens']:>8}"
+              f"{r['structured_tokens']:>8}{r['reduction_vs_raw']:>8.1%}{r['reduction_vs_budget']:>10.1%}"
+              f"{r['parse_ms']:>10}{r['cached_parse_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
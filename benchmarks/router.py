@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Offline provider router benchmark
+
+Routes completions between two fake providers, a primary with a slow tail
+and errors and a steady backup, first with failover only and then with
+hedging, and reports end-to-end latency percentiles, failures and the
+router's per-provider stats. Needs no network access or API keys.
+
+Usage:
+    python3 benchmarks/router.py --requests 300 --slow-rate 0.1 --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Measure routing alone: no provider rate limits unless asked for
+os.environ.setdefault('PROVIDER_RPM', '0')
+os.environ.setdefault('PROVIDER_TPM', '0')
+
+from api._fake_provider import install_fake_provider
+from api._router import ProviderRouter
+
+PROMPT = ('Example cover letter and instructions.', 'Job description: Backend Engineer.')
+
+
+def run(hedge, args):
+    install_fake_provider(
+        'fake-primary', latency=args.latency, jitter=args.latency / 2,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency, error_rate=args.error_rate, seed=1
+    )
+    install_fake_provider('fake-backup', latency=args.latency * 1.5, jitter=args.latency / 2, seed=2)
+
+    # The default complete and model_for find installed fake providers by name
+    router = ProviderRouter(order=['fake-primary', 'fake-backup'], hedge=hedge, hedge_min_samples=20)
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            router.complete(PROMPT, 'system', 'fake-primary')
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, str(e)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(one, range(args.requests)))
+    router.shutdown()
+
+    latencies = sorted(seconds for seconds, error in outcomes if error is None)
+
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 1)
+
+    return {
+        'hedge': hedge,
+        'requests': args.requests,
+        'failed': sum(1 for _, error in outcomes if error is not None),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'providers': router.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help='Primary latency in seconds')
+    parser.add_argument('--slow-rate', type=float, default=0.1, help='Share of primary calls in the slow tail')
+    parser.add_argument('--slow-latency', type=float, default=0.3, help='Latency of a slow primary call')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of primary calls returning 503')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [run(False, args), run(True, args)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(f"{'hedged' if result['hedge'] else 'failover only':<14} "
+              f"p50 {result['p50_ms']:>7} ms  p95 {result['p95_ms']:>7} ms  p99 {result['p99_ms']:>7} ms  "
+              f"failed {result['failed']}")
+        for route, stats in result['providers'].items():
+            print(f"    {route:<22} requests {stats['requests']:>4}  errors {stats['errors']:>3}  "
+                  f"hedges {stats['hedges']:>3}  hedge wins {stats['hedge_wins']:>3}  cancelled {stats['cancelled']:>3}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Offline stage benchmark suite
+
+Builds a synthetic corpus of resumes and job descriptions as PDF, DOCX and
+TXT at several page counts, then measures text extraction, DOCX and PDF
+rendering and the full /generate flow against the fake provider. Each case
+runs in a fresh interpreter with the extraction and generation caches off,
+so peak RSS is per case and every iteration does the full work. Results
+are written as JSON for comparison between commits:
+
+    python3 benchmarks/suite.py --output before.json
+    git checkout my-branch
+    python3 benchmarks/suite.py --output after.json --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+FORMATS = ('pdf', 'docx', 'txt')
+KINDS = ('resume', 'job')
+DEFAULT_SIZES = (1, 5, 20, 50)
+LINES_PER_PAGE = 18  # Lines per letter page in the classic PDF layout (each line is a paragraph)
+
+# Environment for every case: no network, no caches or rate limits, a stub provider that answers at once
+CASE_ENV = {
+    'AI_PROVIDER': 'fake',
+    'FAKE_LATENCY': '0',
+    'GENERATION_CACHE': 'off',
+    'EXTRACTION_CACHE_SIZE': '0',
+    'TIMING_LOGS': '0',
+    'PROVIDER_RPM': '0',
+    'PROVIDER_TPM': '0',
+    'ANTHROPIC_API_KEY': '',
+    'OPENAI_API_KEY': '',
+}
+
+WORDS = (
+    'designed built led migrated optimized scaled automated delivered reduced improved '
+    'platform pipeline service api latency throughput reliability customers teams data '
+    'python postgres kubernetes aws terraform kafka react observability security billing'
+).split()
+
+
+def _sentence(rng, words=14):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def resume_lines(count, seed=1):
+    """Resume-like lines: a header, then role headings with bullet points"""
+    rng = random.Random(seed)
+    lines = ['Jane Doe', 'jane@example.com | (555) 010-0000 | Remote', '', 'EXPERIENCE']
+    role = 0
+    while len(lines) < count:
+        role += 1
+        lines += ['', f'Senior Engineer, Company {role} ({2024 - role} - {2025 - role})']
+        lines += [f'- {_sentence(rng)}' for _ in range(6)]
+    return lines[:count]
+
+
+def job_lines(count, seed=2):
+    """Job-description-like lines, including the benefits and EEO boilerplate real postings carry"""
+    rng = random.Random(seed)
+    lines = ['Backend Engineer', '', 'About the role', _sentence(rng, 20), '', 'Responsibilities']
+    boilerplate = [
+        '', 'Benefits', '- Medical, dental and vision insurance.', '- Flexible paid time off.',
+        '', 'We are an equal opportunity employer and value diversity at our company.',
+    ]
+    while len(lines) < count:
+        lines += [f'- {_sentence(rng)}' for _ in range(8)]
+        lines += ['', 'Requirements'] + [f'- {_sentence(rng, 10)}' for _ in range(5)] + boilerplate
+    return lines[:count]
+
+
+def build_corpus(directory, sizes):
+    """Write every kind/size/format into directory and return the manifest"""
+    from api._extraction import extract_pdf_pages
+    from api._rendering import render_document
+
+    manifest = {}
+    for kind, make_lines in (('resume', resume_lines), ('job', job_lines)):
+        for pages in sizes:
+            text = '\n'.join(make_lines(pages * LINES_PER_PAGE))
+            for file_format in FORMATS:
+                name = f'{kind}_{pages}p.{file_format}'
+                data = render_document(text, file_format)
+                with open(os.path.join(directory, name), 'wb') as f:
+                    f.write(data)
+                entry = {'bytes': len(data), 'characters': len(text)}
+                if file_format == 'pdf':
+                    entry['pdf_pages'] = len(extract_pdf_pages(data))
+                manifest[name] = entry
+    return manifest
+
+
+def list_cases(sizes):
+    cases = []
+    for file_format in FORMATS:
+        for kind in KINDS:
+            cases += [f'extract:{file_format}:{kind}:{pages}' for pages in sizes]
+    for file_format in ('docx', 'pdf'):
+        cases += [f'render:{file_format}:{pages}' for pages in sizes]
+    for file_format in FORMATS:
+        cases += [f'generate:{file_format}:{pages}' for pages in sizes]
+    return cases
+
+
+def _read(corpus, name):
+    with open(os.path.join(corpus, name), 'rb') as f:
+        return f.read()
+
+
+def setup_case(case, corpus):
+    """Return (operation, input bytes) for one case"""
+    stage, file_format, *rest = case.split(':')
+
+    if stage == 'extract':
+        from api._utils import extract_text_from_file
+
+        kind, pages = rest
+        name = f'{kind}_{pages}p.{file_format}'
+        data = _read(corpus, name)
+        return (lambda: extract_text_from_file(data, name)), len(data)
+
+    if stage == 'render':
+        from api._utils import generate_docx, generate_pdf
+
+        text = _read(corpus, f'resume_{rest[0]}p.txt').decode('utf-8')
+        render = generate_docx if file_format == 'docx' else generate_pdf
+        return (lambda: render(text)), len(text.encode('utf-8'))
+
+    if stage == 'generate':
+        import io
+
+        import server
+
+        pages = rest[0]
+        example_name, job_name = f'resume_{pages}p.{file_format}', f'job_{pages}p.{file_format}'
+        example, job = _read(corpus, example_name), _read(corpus, job_name)
+        client = server.app.test_client()
+
+        def post():
+            response = client.post('/generate', content_type='multipart/form-data', data={
+                'example_file': (io.BytesIO(example), example_name),
+                'job_description_file': (io.BytesIO(job), job_name),
+            })
+            if response.status_code != 200:
+                raise RuntimeError(f'/generate returned {response.status_code}: {response.get_data(as_text=True)}')
+        return post, len(example) + len(job)
+
+    raise ValueError(f'Unknown case: {case}')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    # ru_maxrss survives fork and exec on Linux, so a child would report the
+    # parent's peak; VmHWM starts over with the new program
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(case, corpus, iterations):
+    """Measure one case in this process and return its result dict"""
+    operation, input_bytes = setup_case(case, corpus)
+    operation()  # Warm up imports, templates and fonts
+    rss_before = peak_rss_mb()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'case': case,
+        'iterations': iterations,
+        'input_bytes': input_bytes,
+        'ops_per_second': round(iterations / elapsed, 2),
+        'mb_per_second': round(input_bytes * iterations / elapsed / 1e6, 2),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 2),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 2),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        'rss_after_setup_mb': rss_before,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_case_subprocess(case, corpus, iterations):
+    env = dict(os.environ, **CASE_ENV)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', case,
+         '--corpus', corpus, '--iterations', str(iterations)],
+        capture_output=True, text=True, env=env, cwd=ROOT
+    )
+    if output.returncode != 0:
+        return {'case': case, 'error': output.stderr.strip().splitlines()[-1] if output.stderr else 'failed'}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    previous = {result['case']: result for result in (baseline or {}).get('results', [])}
+    header = f"{'case':<26}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'MB/s':>8}{'peak MB':>9}"
+    print(header + ('  p50 vs baseline' if baseline else ''))
+    for result in results:
+        if 'error' in result:
+            print(f"{result['case']:<26}  error: {result['error']}")
+            continue
+        line = (f"{result['case']:<26}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+                f"{result['ops_per_second']:>10}{result['mb_per_second']:>8}{result['peak_rss_mb']:>9}")
+        before = previous.get(result['case'])
+        if before and before.get('p50_ms'):
+            line += f"  {(result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100:+.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Page counts to build')
+    parser.add_argument('--iterations', type=int, default=10, help='Timed runs per case')
+    parser.add_argument('--stage', action='append', choices=('extract', 'render', 'generate'),
+                        help='Only run these stages; may be given more than once')
+    parser.add_argument('--corpus', help='Reuse or keep the corpus in this directory')
+    parser.add_argument('--output', help='Write the JSON results to this file')
+    parser.add_argument('--baseline', help='Earlier JSON results to compare p50 latency against')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.corpus, args.iterations)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    corpus = args.corpus or tempfile.mkdtemp(prefix='benchmark_corpus_')
+    os.makedirs(corpus, exist_ok=True)
+    manifest = build_corpus(corpus, sizes)
+
+    cases = [case for case in list_cases(sizes) if not args.stage or case.split(':')[0] in args.stage]
+    results = []
+    for case in cases:
+        results.append(run_case_subprocess(case, corpus, args.iterations))
+        if not args.json:
+            print(f'  {case} done', file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'iterations': args.iterations,
+        'corpus': manifest,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Gunicorn settings for running server.py in production
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden with the environment variable next to it.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '8080')}")
+
+# Worker processes, each running `threads` request threads. Generation time is
+# mostly spent waiting on the AI provider, so threads are cheap concurrency.
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv('WEB_THREADS', '8'))
+worker_class = 'gthread'
+
+# A request may wait on a full LLM call, so this must stay above LLM_TIMEOUT
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+# Seconds a worker gets after SIGTERM to finish in-flight requests and jobs
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+# Seconds an idle keep-alive connection is held open
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '100'))
+
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def worker_exit(server, worker):
+    """Let queued background jobs finish and close pooled AI clients"""
+    from wsgi import shutdown
+    shutdown()
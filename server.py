@@ -2,268 +2,311 @@
 """
 Cover Letter Generator Backend Server
 Handles file uploads, AI processing, and document generation
+
+Flask adapter over the shared core in api/: extraction, prompting, the
+provider layer and rendering are the same code the serverless functions use.
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, g, request, jsonify, send_file, Response, stream_with_context, url_for
 from flask_cors import CORS
-import os
 import io
-import tempfile
+import os
 from datetime import datetime
-from pathlib import Path
-
-# Document parsing
-import PyPDF2
-from docx import Document
-import markdown2
-
-# Document generation
-from docx import Document as DocxDocument
-from docx.shared import Pt, Inches
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
-
-# AI Integration
-import anthropic
-import openai
+from itertools import chain
+
+# Shared core: extraction, generation, rendering, caching, streaming and jobs
+from api._utils import (
+    AI_PROVIDER,
+    ANTHROPIC_API_KEY,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TEMPLATE,
+    DOCUMENTS,
+    MIMETYPES,
+    OPENAI_API_KEY,
+    RENDER_CACHE_TTL,
+    build_zip,
+    configured_model,
+    download_basename,
+    extract_text_from_file as extract_text_from_bytes,
+    generate_document,
+    generate_documents_concurrently,
+    get_rendered,
+    match_score,
+    preview_document,
+    rank_jobs,
+    rank_passages,
+    read_jobs,
+    refine_document,
+    render_all,
+    render_cached,
+    render_document,
+    stream_generation,
+    validate_render_options
+)
+from api._cache import get_generation_cache
+from api._clients import close_clients
+from api._jobs import JobQueue, QueueFull
+from api._limits import Overloaded, limiter_stats
+from api._metrics import REQUEST_SECONDS, end_request, render_prometheus, span, start_request
+from api._refine import PatchError
+from api._router import get_router
+from api._single_flight import get_single_flight
+from api._matching import MATCH_MAX_JOBS
+from api._streaming import (
+    NDJSON_CONTENT_TYPE,
+    document_events,
+    match_events,
+    merge_document_streams,
+    ndjson,
+    preview_events
+)
 
 app = Flask(__name__)
 CORS(app)
 
 # Configuration
-AI_PROVIDER = os.getenv('AI_PROVIDER', 'anthropic')  # 'anthropic' or 'openai'
-ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+DEBUG = os.getenv('FLASK_DEBUG', '0').lower() in ('1', 'true', 'yes')
 
-# Initialize AI clients
-anthropic_client = None
-openai_client = None
 
-if ANTHROPIC_API_KEY:
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-    openai_client = openai
+def extract_text_from_file(file):
+    """Extract text from an uploaded werkzeug FileStorage"""
+    return extract_text_from_bytes(file.read(), file.filename)
 
 
-def extract_text_from_pdf(file_stream):
-    """Extract text from PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(file_stream)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error reading PDF: {str(e)}")
+def read_form_text(text_field, file_field):
+    """Return the text of an uploaded file, or of the pasted text field"""
+    uploaded = request.files.get(file_field)
+    if uploaded and uploaded.filename:
+        return extract_text_from_file(uploaded)
+    return request.form.get(text_field, '')
 
 
-def extract_text_from_docx(file_stream):
-    """Extract text from DOCX file"""
-    try:
-        doc = Document(file_stream)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error reading DOCX: {str(e)}")
+def read_generation_inputs():
+    """Return (example_text, job_description_text) from the form fields or uploaded files"""
+    return (
+        read_form_text('example_text', 'example_file'),
+        read_form_text('job_description_text', 'job_description_file')
+    )
 
 
-def extract_text_from_file(file):
-    """Extract text from uploaded file based on file type"""
-    filename = file.filename.lower()
-
-    if filename.endswith('.pdf'):
-        return extract_text_from_pdf(file.stream)
-    elif filename.endswith(('.doc', '.docx')):
-        return extract_text_from_docx(file.stream)
-    elif filename.endswith('.txt'):
-        return file.read().decode('utf-8')
-    else:
-        raise Exception(f"Unsupported file type: {filename}")
+def wants_stream():
+    """True when the client asked for NDJSON streaming with ?stream=1"""
+    return request.args.get('stream', '0').lower() in ('1', 'true', 'yes')
 
 
-def generate_cover_letter_with_ai(example_cover_letter, job_description, ai_provider='anthropic'):
-    """Use AI to generate adapted cover letter"""
+def ndjson_response(events):
+    return Response(
+        stream_with_context(ndjson(event) for event in events),
+        mimetype=NDJSON_CONTENT_TYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-    prompt = f"""You are a professional career advisor. You need to adapt an existing cover letter for a new job opportunity.
 
-EXAMPLE COVER LETTER:
-{example_cover_letter}
+def overloaded_response(error):
+    """503 with Retry-After for a generation shed by the provider rate limiter"""
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def generation_response(kind, example_text, job_description_text):
+    """Generate one document and answer with NDJSON or JSON, as the client asked"""
+    match = match_score(example_text, job_description_text)
+    if wants_stream():
+        return ndjson_response(chain(
+            match_events({kind: match}),
+            preview_events({kind: preview_document(kind, example_text, job_description_text, AI_PROVIDER)}),
+            document_events(kind, stream_generation(kind, example_text, job_description_text, AI_PROVIDER))
+        ))
+
+    text, metadata = generate_document(kind, example_text, job_description_text, AI_PROVIDER)
+
+    response = jsonify({
+        'success': True,
+        kind: text,
+        'match': match,
+        'usage': metadata['usage'],
+        'prompt_tokens': metadata['prompt_tokens']
+    })
+    response.headers['X-Cache'] = 'HIT' if metadata['cache_hit'] else 'MISS'
+    response.headers['Access-Control-Expose-Headers'] = 'X-Cache'
+    return response
+
+
+def run_job(kind, payload):
+    """Job queue worker: generate the cover letter and render the requested formats"""
+    cover_letter, metadata = generate_document(
+        kind,
+        payload['example_text'],
+        payload['job_description_text'],
+        payload['ai_provider']
+    )
+    files = {
+        file_format: render_document(cover_letter, file_format, payload['template'], payload['page_size'])
+        for file_format in payload['formats']
+    }
+    result = {
+        'cover_letter': cover_letter,
+        'usage': metadata['usage'],
+        'prompt_tokens': metadata['prompt_tokens'],
+        'cache_hit': metadata['cache_hit']
+    }
+    return result, files
 
-NEW JOB DESCRIPTION:
-{job_description}
 
-Please create a new cover letter for the new job that:
-1. Maintains the tone and style of the example cover letter
-2. Highlights relevant skills and experiences that match the new job requirements
-3. Customizes the content to address the specific role and company
-4. Keeps the same general structure and format
-5. Is professional, compelling, and tailored to the new position
+job_queue = JobQueue(run_job)
 
-Please output ONLY the new cover letter text, without any preamble or explanation."""
 
-    try:
-        if ai_provider == 'anthropic' and anthropic_client:
-            message = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return message.content[0].text
-
-        elif ai_provider == 'openai' and openai_client:
-            response = openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional career advisor helping to write cover letters."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
-
-        else:
-            # Fallback: Simple template-based generation (no AI)
-            return f"""Dear Hiring Manager,
-
-I am writing to express my strong interest in the position described in your job posting. Based on my background and experience, I believe I would be an excellent fit for this role.
-
-{example_cover_letter.split('.')[-3] if '.' in example_cover_letter else 'My relevant experience'}
-
-The requirements outlined in your job description align well with my skills and career goals. I am particularly excited about the opportunity to contribute to your team.
-
-Thank you for considering my application. I look forward to discussing how I can contribute to your organization.
-
-Sincerely,
-[Your Name]
-
----
-NOTE: This is a basic template. Please configure ANTHROPIC_API_KEY or OPENAI_API_KEY in your environment for AI-generated cover letters.
-"""
-    except Exception as e:
-        raise Exception(f"Error generating cover letter: {str(e)}")
-
-
-def generate_docx(text):
-    """Generate DOCX document from text"""
-    doc = DocxDocument()
-
-    # Set document margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
-
-    # Add paragraphs
-    for line in text.split('\n'):
-        if line.strip():
-            p = doc.add_paragraph(line)
-            # Format paragraphs
-            for run in p.runs:
-                run.font.name = 'Arial'
-                run.font.size = Pt(11)
-        else:
-            doc.add_paragraph()  # Blank line
-
-    # Save to bytes
-    docx_bytes = io.BytesIO()
-    doc.save(docx_bytes)
-    docx_bytes.seek(0)
-    return docx_bytes
-
-
-def generate_pdf(text):
-    """Generate PDF document from text"""
-    pdf_bytes = io.BytesIO()
-
-    # Create PDF
-    doc = SimpleDocTemplate(
-        pdf_bytes,
-        pagesize=letter,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72
-    )
+def shutdown():
+    """Finish queued background jobs and close pooled AI clients before exit"""
+    job_queue.shutdown(wait=True)
+    get_router().shutdown()
+    close_clients()
 
-    # Styles
-    styles = getSampleStyleSheet()
-    style = ParagraphStyle(
-        'CustomStyle',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=11,
-        leading=14,
-        spaceAfter=12
-    )
 
-    # Build content
-    story = []
-    for line in text.split('\n'):
-        if line.strip():
-            para = Paragraph(line.strip(), style)
-            story.append(para)
-        else:
-            story.append(Spacer(1, 0.2 * inch))
+@app.before_request
+def start_timing():
+    g.timings, g.timing_token = start_request()
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        # Parse the body up front so upload time is its own stage
+        with span('parse'):
+            request.files
+
+
+@app.after_request
+def add_server_timing(response):
+    """Send the stage breakdown as Server-Timing; streamed bodies only include stages before the first byte"""
+    timings = g.get('timings')
+    if timings is not None:
+        response.headers['Server-Timing'] = timings.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(timings.elapsed(), endpoint, request.method, str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def end_timing(error=None):
+    token = g.pop('timing_token', None)
+    if token is not None:
+        end_request(token)
+
 
-    # Generate PDF
-    doc.build(story)
-    pdf_bytes.seek(0)
-    return pdf_bytes
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage, request, payload and token metrics in the Prometheus text format"""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/health', methods=['GET'])
+@app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'ai_provider': AI_PROVIDER,
-        'ai_configured': bool(ANTHROPIC_API_KEY or OPENAI_API_KEY)
+        'ai_configured': configured_model(AI_PROVIDER) is not None,
+        'providers': get_router().stats(),
+        'limits': limiter_stats(),
+        'cache': get_generation_cache().stats(),
+        'coalescing': get_single_flight().stats(),
+        'jobs': job_queue.stats()
     })
 
 
 @app.route('/generate', methods=['POST'])
+@app.route('/api/generate', methods=['POST'])
 def generate_cover_letter():
     """Main endpoint to generate cover letter"""
     try:
-        # Get form data
-        example_text = request.form.get('example_text', '')
-        job_description_text = request.form.get('job_description_text', '')
+        example_text, job_description_text = read_generation_inputs()
 
-        # Get uploaded files
-        example_file = request.files.get('example_file')
-        job_description_file = request.files.get('job_description_file')
+        # Validate inputs
+        if not example_text or not job_description_text:
+            return jsonify({
+                'error': 'Both example cover letter and job description are required'
+            }), 400
 
-        # Extract text from files or use provided text
-        if example_file and example_file.filename:
-            example_text = extract_text_from_file(example_file)
+        return generation_response('cover_letter', example_text, job_description_text)
 
-        if job_description_file and job_description_file.filename:
-            job_description_text = extract_text_from_file(job_description_file)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/generate-resume', methods=['POST'])
+@app.route('/api/generate-resume', methods=['POST'])
+def generate_resume():
+    """Generate an adapted resume"""
+    try:
+        example_text, job_description_text = read_generation_inputs()
 
-        # Validate inputs
         if not example_text or not job_description_text:
             return jsonify({
-                'error': 'Both example cover letter and job description are required'
+                'error': 'Both example resume and job description are required'
             }), 400
 
-        # Generate new cover letter using AI
-        new_cover_letter = generate_cover_letter_with_ai(
-            example_text,
-            job_description_text,
-            AI_PROVIDER
-        )
+        return generation_response('resume', example_text, job_description_text)
+
+    except Overloaded as e:
+        return overloaded_response(e)
 
+    except Exception as e:
         return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/generate-both', methods=['POST'])
+@app.route('/api/generate-both', methods=['POST'])
+def generate_both():
+    """Generate a cover letter and a resume for the same job, concurrently"""
+    try:
+        examples = {
+            'cover_letter': read_form_text('cover_letter_text', 'cover_letter_file'),
+            'resume': read_form_text('resume_text', 'resume_file'),
+        }
+        job_description_text = read_form_text('job_description_text', 'job_description_file')
+
+        if not all(examples.values()) or not job_description_text:
+            return jsonify({
+                'error': 'Cover letter, resume, and job description are all required'
+            }), 400
+
+        matches = {kind: match_score(example, job_description_text) for kind, example in examples.items()}
+        if wants_stream():
+            previews = {
+                kind: preview_document(kind, example, job_description_text, AI_PROVIDER)
+                for kind, example in examples.items()
+            }
+            return ndjson_response(chain(match_events(matches), preview_events(previews), merge_document_streams({
+                kind: stream_generation(kind, example, job_description_text, AI_PROVIDER)
+                for kind, example in examples.items()
+            })))
+
+        results, errors = generate_documents_concurrently(examples, job_description_text, AI_PROVIDER)
+        if len(errors) == len(examples):
+            return jsonify({'error': '; '.join(errors.values())}), 500
+
+        response = {
             'success': True,
-            'cover_letter': new_cover_letter
-        })
+            'cover_letter': results.get('cover_letter', (None, {}))[0],
+            'resume': results.get('resume', (None, {}))[0],
+            'match': matches,
+            'usage': {kind: metadata['usage'] for kind, (text, metadata) in results.items()},
+            'prompt_tokens': {kind: metadata['prompt_tokens'] for kind, (text, metadata) in results.items()}
+        }
+        if errors:
+            response['errors'] = errors
+        return jsonify(response)
+
+    except Overloaded as e:
+        return overloaded_response(e)
 
     except Exception as e:
         return jsonify({
@@ -271,55 +314,292 @@ def generate_cover_letter():
         }), 500
 
 
+@app.route('/refine', methods=['POST'])
+@app.route('/api/refine', methods=['POST'])
+def refine():
+    """Edit a generated draft, asking the model only for the paragraphs that change"""
+    try:
+        data = request.get_json()
+        kind = data.get('document') or 'cover_letter'
+        draft = data.get('draft', '')
+        instruction = (data.get('instruction') or '').strip()
+        job_description_text = (data.get('job_description') or '').strip()
+
+        if kind not in DOCUMENTS:
+            return jsonify({'error': f'Unknown document: {kind}'}), 400
+
+        if not draft.strip() or not (instruction or job_description_text):
+            return jsonify({
+                'error': 'A draft and an instruction or updated job description are required'
+            }), 400
+
+        text, metadata = refine_document(kind, draft, instruction, job_description_text, AI_PROVIDER)
+
+        response = jsonify({
+            'success': True,
+            kind: text,
+            'changed': metadata['changed'],
+            'mode': metadata['mode'],
+            'usage': metadata['usage'],
+            'prompt_tokens': metadata['prompt_tokens']
+        })
+        response.headers['X-Cache'] = 'HIT' if metadata['cache_hit'] else 'MISS'
+        response.headers['Access-Control-Expose-Headers'] = 'X-Cache'
+        return response
+
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    except PatchError as e:
+        return jsonify({'error': f'The model returned edits that do not fit the draft: {e}'}), 502
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/match', methods=['POST'])
+@app.route('/api/match', methods=['POST'])
+def match():
+    """Score an example resume or letter against one or many job descriptions, with no AI call"""
+    try:
+        data = request.get_json() or {}
+        example_text = (data.get('example_text') or '').strip()
+        jobs = read_jobs(data.get('jobs') or [])
+
+        if not example_text or not jobs:
+            return jsonify({'error': 'An example and at least one job description are required'}), 400
+
+        if len(jobs) > MATCH_MAX_JOBS:
+            return jsonify({'error': f'At most {MATCH_MAX_JOBS} job descriptions per request'}), 400
+
+        response = {'success': True, 'results': rank_jobs(example_text, jobs)}
+        if len(jobs) == 1:
+            response['passages'] = rank_passages(example_text, jobs[0][1])
+        return jsonify(response)
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/download/<format>', methods=['POST'])
+@app.route('/api/download/<format>', methods=['POST'])
 def download_cover_letter(format):
     """Download cover letter in specified format"""
     try:
         data = request.get_json()
         text = data.get('text', '')
+        template = data.get('template') or DEFAULT_TEMPLATE
+        page_size = data.get('page_size') or DEFAULT_PAGE_SIZE
 
         if not text:
             return jsonify({'error': 'No text provided'}), 400
 
+        error = validate_render_options(template, page_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if format not in MIMETYPES:
+            return jsonify({'error': 'Unsupported format'}), 400
+
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        _, content, cache_hit = render_cached(text, format, template, page_size)
+        response = send_file(
+            io.BytesIO(content),
+            mimetype=MIMETYPES[format],
+            as_attachment=True,
+            download_name=f'cover_letter_{timestamp}.{format}'
+        )
+        response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+        return response
 
-        if format == 'txt':
-            filename = f'cover_letter_{timestamp}.txt'
-            return send_file(
-                io.BytesIO(text.encode('utf-8')),
-                mimetype='text/plain',
-                as_attachment=True,
-                download_name=filename
-            )
-
-        elif format == 'docx':
-            filename = f'cover_letter_{timestamp}.docx'
-            docx_file = generate_docx(text)
-            return send_file(
-                docx_file,
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                as_attachment=True,
-                download_name=filename
-            )
-
-        elif format == 'pdf':
-            filename = f'cover_letter_{timestamp}.pdf'
-            pdf_file = generate_pdf(text)
-            return send_file(
-                pdf_file,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=filename
-            )
-
-        else:
-            return jsonify({'error': 'Unsupported format'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/render-all', methods=['POST'])
+@app.route('/api/render-all', methods=['POST'])
+def render_all_formats():
+    """Render a cover letter in every format at once, as a ZIP or as cacheable links"""
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+        template = data.get('template') or DEFAULT_TEMPLATE
+        page_size = data.get('page_size') or DEFAULT_PAGE_SIZE
+        formats = data.get('formats') or list(MIMETYPES)
+        basename = download_basename(data.get('name'))
+        output = data.get('as') or 'zip'
+
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+
+        error = validate_render_options(template, page_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        unsupported = [name for name in formats if name not in MIMETYPES]
+        if unsupported:
+            return jsonify({'error': f'Unsupported format: {unsupported[0]}'}), 400
+
+        if output not in ('zip', 'urls'):
+            return jsonify({'error': f'Unsupported output: {output}'}), 400
+
+        rendered = render_all(text, formats, template, page_size)
+
+        if output == 'urls':
+            return jsonify({
+                'files': {
+                    file_format: {
+                        'url': url_for('rendered_file', render_id=key, format=file_format),
+                        'size': len(content),
+                        'cached': cache_hit,
+                    }
+                    for file_format, (key, content, cache_hit) in rendered.items()
+                },
+                'expires_in': RENDER_CACHE_TTL,
+            })
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        archive = build_zip(
+            {file_format: content for file_format, (_, content, _) in rendered.items()},
+            f'{basename}_{timestamp}'
+        )
+        response = send_file(
+            io.BytesIO(archive),
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=f'{basename}_{timestamp}.zip'
+        )
+        response.headers['X-Cache'] = 'HIT' if all(hit for _, _, hit in rendered.values()) else 'MISS'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/rendered/<render_id>/<format>', methods=['GET'])
+@app.route('/api/rendered/<render_id>/<format>', methods=['GET'])
+def rendered_file(render_id, format):
+    """Serve a file from the render cache; its id is its content address, so it never changes"""
+    if format not in MIMETYPES:
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    content = get_rendered(render_id, format)
+    if content is None:
+        return jsonify({'error': 'Rendered file not found or expired'}), 404
+
+    etag = f'"{render_id}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=304)
+    else:
+        response = send_file(
+            io.BytesIO(content),
+            mimetype=MIMETYPES[format],
+            as_attachment=True,
+            download_name=f'cover_letter_{render_id[:8]}.{format}'
+        )
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = f'public, max-age={RENDER_CACHE_TTL}, immutable'
+    return response
+
+
+@app.route('/jobs', methods=['POST'])
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a cover letter generation and return its job id immediately"""
+    try:
+        example_text, job_description_text = read_generation_inputs()
+
+        if not example_text or not job_description_text:
+            return jsonify({
+                'error': 'Both example cover letter and job description are required'
+            }), 400
+
+        # Plain text is always available; docx and pdf are rendered only when asked for
+        formats = [name.strip() for name in request.form.get('formats', '').split(',') if name.strip()]
+        template = request.form.get('template') or DEFAULT_TEMPLATE
+        page_size = request.form.get('page_size') or DEFAULT_PAGE_SIZE
+
+        unsupported = [name for name in formats if name not in MIMETYPES]
+        if unsupported:
+            return jsonify({'error': f'Unsupported format: {unsupported[0]}'}), 400
+        formats = [name for name in formats if name != 'txt']
+
+        error = validate_render_options(template, page_size)
+        if error:
+            return jsonify({'error': error}), 400
+
+        job_id = job_queue.submit(
+            'cover_letter',
+            {
+                'example_text': example_text,
+                'job_description_text': job_description_text,
+                'ai_provider': AI_PROVIDER,
+                'formats': formats,
+                'template': template,
+                'page_size': page_size,
+            },
+            callback_url=request.form.get('callback_url') or None
+        )
+
+        status_url = url_for('job_status', job_id=job_id)
+        response = jsonify({'job_id': job_id, 'status': 'queued', 'status_url': status_url})
+        response.status_code = 202
+        response.headers['Location'] = status_url
+        return response
+
+    except QueueFull as e:
+        return jsonify({'error': f'Job queue is full: {e}'}), 503
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a queued job; finished jobs include the cover letter and download links"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    job['downloads'] = {
+        file_format: url_for('job_download', job_id=job_id, format=file_format)
+        for file_format in ['txt'] + job['formats']
+    } if job['status'] == 'done' else {}
+    return jsonify(job)
+
+
+@app.route('/jobs/<job_id>/download/<format>', methods=['GET'])
+@app.route('/api/jobs/<job_id>/download/<format>', methods=['GET'])
+def job_download(job_id, format):
+    """Download a finished job's cover letter in one of its rendered formats"""
+    if format == 'txt':
+        job = job_queue.get(job_id)
+        content = job['result']['cover_letter'].encode('utf-8') if job and 'result' in job else None
+    else:
+        content = job_queue.get_file(job_id, format)
+
+    if content is None:
+        return jsonify({'error': 'File not found'}), 404
+
+    return send_file(
+        io.BytesIO(content),
+        mimetype=MIMETYPES.get(format, 'application/octet-stream'),
+        as_attachment=True,
+        download_name=f'cover_letter_{job_id[:8]}.{format}'
+    )
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🎯 Cover Letter Generator Server")
@@ -329,8 +609,12 @@ if __name__ == '__main__':
     if not (ANTHROPIC_API_KEY or OPENAI_API_KEY):
         print("\n⚠️  WARNING: No AI API key configured!")
         print("Set ANTHROPIC_API_KEY or OPENAI_API_KEY environment variable")
-        print("The tool will use basic templates without AI")
+        print("The tool will draft documents offline without AI")
     print("\n🚀 Server starting on http://localhost:8080")
+    print("For production use: gunicorn -c gunicorn.conf.py wsgi:app")
     print("=" * 60)
 
-    app.run(host='0.0.0.0', port=8080, debug=True)
+    try:
+        app.run(host='0.0.0.0', port=8080, debug=DEBUG, threaded=True)
+    finally:
+        shutdown()
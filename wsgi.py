@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    waitress-serve --listen=0.0.0.0:8080 --threads=16 wsgi:app   (Windows)
+"""
+
+from server import app, shutdown
+
+__all__ = ['app', 'shutdown']